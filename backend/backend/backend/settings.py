@@ -10,11 +10,16 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# manage.py test 로 실행 중인지 (Mongo를 mongomock 으로, 시작 시 인덱스 생성 생략)
+TESTING = sys.argv[1:2] == ['test']
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -41,6 +46,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -121,3 +127,223 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# OCR
+# EasyOCR Reader는 언어 조합별로 프로세스당 한 번만 로드해서 풀로 공유한다.
+
+OCR_LANGUAGES = os.environ.get('OCR_LANGUAGES', 'ko,en').split(',')
+
+OCR_USE_GPU = os.environ.get('OCR_USE_GPU', '0') == '1'
+
+# 언어 조합별 최대 Reader 수 (= 동시에 OCR을 돌릴 수 있는 요청 수)
+OCR_READER_POOL_SIZE = int(os.environ.get('OCR_READER_POOL_SIZE', '1'))
+
+# 풀이 모두 사용 중일 때 요청 하나가 Reader를 기다리는 최대 시간(초)
+OCR_READER_TIMEOUT = float(os.environ.get('OCR_READER_TIMEOUT', '30'))
+
+# True면 앱 시작(AppConfig.ready) 시점에 백그라운드로 Reader 로드 + 더미 추론 (끝날 때까지 /readyz 는 503)
+OCR_PRELOAD = os.environ.get('OCR_PRELOAD', '0') == '1'
+
+# 업로드된 명함을 처리하는 OCR 작업 워커 스레드 수 (기본: Reader 풀 크기와 동일)
+OCR_JOB_WORKERS = int(os.environ.get('OCR_JOB_WORKERS', str(OCR_READER_POOL_SIZE)))
+
+# 일괄 업로드: readtext_batched 한 번에 넣는 이미지 수 / 인식기 배치 크기 / 묶음 처리 시 맞추는 이미지 크기
+# (비율을 유지한 채 줄이고 남는 부분은 배경색으로 채움, 세로 명함은 가로/세로를 바꾼 크기로 따로 묶음)
+OCR_BATCH_SIZE = int(os.environ.get('OCR_BATCH_SIZE', '8'))
+OCR_RECOGNIZER_BATCH_SIZE = int(os.environ.get('OCR_RECOGNIZER_BATCH_SIZE', '16'))
+OCR_BATCH_IMAGE_SIZE = (1280, 720)
+
+# 일괄 업로드 시 병렬 전처리 스레드 수 / 요청 하나에 허용하는 최대 이미지 수
+OCR_PREPROCESS_WORKERS = int(os.environ.get('OCR_PREPROCESS_WORKERS', '4'))
+OCR_BATCH_MAX_IMAGES = int(os.environ.get('OCR_BATCH_MAX_IMAGES', '500'))
+
+# 작업을 실행하는 프로세스는 끝나지 않은 작업에 OCR_JOB_HEARTBEAT_SECONDS 마다 heartbeat 를 남긴다.
+# heartbeat 가 OCR_JOB_STALE_SECONDS 이상 끊긴 queued/running 작업은 (프로세스 종료/재시작) 다른 프로세스가 넘겨받아
+# 디스크에 남은 이미지면 다시 실행하고, 메모리로 받은 이미지면 실패 처리
+OCR_JOB_HEARTBEAT_SECONDS = int(os.environ.get('OCR_JOB_HEARTBEAT_SECONDS', '30'))
+OCR_JOB_STALE_SECONDS = int(os.environ.get('OCR_JOB_STALE_SECONDS', '120'))
+
+# 이 크기 이하의 업로드는 메모리에서 바로 디코딩하고, 더 큰 파일만 임시 파일로 받는다
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.environ.get('FILE_UPLOAD_MAX_MEMORY_SIZE', str(20 * 1024 * 1024)))
+
+# OCR 결과 캐시 (원본 이미지 SHA-256 기준, 같은 명함 재업로드 시 OCR 생략)
+OCR_CACHE_ENABLED = os.environ.get('OCR_CACHE_ENABLED', '1') == '1'
+OCR_CACHE_MAX_ENTRIES = int(os.environ.get('OCR_CACHE_MAX_ENTRIES', '1024'))
+# True면 Mongo(ocr_cache 컬렉션)에도 저장해서 재시작 후에도 유지
+OCR_CACHE_PERSISTENT = os.environ.get('OCR_CACHE_PERSISTENT', '0') == '1'
+# True면 지각 해시(dHash)로 재압축/크기 조정된 거의 같은 이미지도 찾음 (해밍 거리 기준)
+# 같은 양식으로 인쇄한 다른 사람 명함도 9x8 해시는 거의 같으므로, 후보는 384x192 흑백 축소 이미지를
+# 6px 블록으로 비교해 블록 평균 밝기 차이가 모두 OCR_CACHE_PERCEPTUAL_VERIFY_DIFFERENCE 이하일 때만 결과로 쓴다
+# (글자 한 자가 달라도 50 안팎, 재압축/크기 조정은 10 안팎) 기본 꺼짐
+OCR_CACHE_PERCEPTUAL = os.environ.get('OCR_CACHE_PERCEPTUAL', '0') == '1'
+OCR_CACHE_PERCEPTUAL_DISTANCE = int(os.environ.get('OCR_CACHE_PERCEPTUAL_DISTANCE', '4'))
+OCR_CACHE_PERCEPTUAL_VERIFY_DIFFERENCE = float(os.environ.get('OCR_CACHE_PERCEPTUAL_VERIFY_DIFFERENCE', '24'))
+
+# 전처리: 명함 외곽선을 찾아 원근 보정 후 긴 변을 OCR_TARGET_LONG_EDGE(px)로 축소
+# (90mm 명함 기준 1280px ≈ 360dpi, 0이면 축소하지 않음)
+OCR_CARD_DETECTION = os.environ.get('OCR_CARD_DETECTION', '1') == '1'
+OCR_TARGET_LONG_EDGE = int(os.environ.get('OCR_TARGET_LONG_EDGE', '1280'))
+# 외곽선 검출용 축소본의 긴 변(px), Canny 임계값, 명함으로 인정할 최소 면적 비율
+OCR_DETECT_LONG_EDGE = int(os.environ.get('OCR_DETECT_LONG_EDGE', '640'))
+OCR_CARD_CANNY_THRESHOLDS = (50, 150)
+OCR_CARD_MIN_AREA_RATIO = float(os.environ.get('OCR_CARD_MIN_AREA_RATIO', '0.2'))
+
+# 인식 모드: 'full' 은 검출된 모든 글자 박스를 인식, 'fast' 는 2단계 인식
+# (1단계: 검출 후 큰 박스 OCR_FAST_FIRST_BOXES개만 인식 → 필수 필드가 비어 있을 때만 2단계로 나머지 인식)
+# 요청마다 mode=fast|full (form 필드 또는 쿼리 파라미터)로 바꿀 수 있다.
+OCR_DEFAULT_MODE = os.environ.get('OCR_DEFAULT_MODE', 'full')
+OCR_FAST_FIRST_BOXES = int(os.environ.get('OCR_FAST_FIRST_BOXES', '8'))
+OCR_FAST_REQUIRED_FIELDS = ('name', 'phone', 'email', 'company')
+
+
+# Logging
+# core 앱은 단계별 로거(core.decode / core.preprocess / core.ocr / core.parse / core.store)를 사용한다.
+# 단계별 레벨은 CORE_LOG_LEVEL_<단계> 환경변수로 조정하고, 기본은 작업마다 단계별 소요 시간을
+# 담은 요약 로그(core.request) 한 건만 남긴다. 출력은 별도 스레드에서 처리된다.
+
+CORE_LOG_LEVEL = os.environ.get('CORE_LOG_LEVEL', 'INFO')
+
+# 'json' 또는 'text'
+CORE_LOG_FORMAT = os.environ.get('CORE_LOG_FORMAT', 'json')
+
+# 작업(요청) 하나가 끝날 때 단계별 소요 시간 요약 로그를 남길지 여부
+CORE_LOG_REQUEST_SUMMARY = os.environ.get('CORE_LOG_REQUEST_SUMMARY', '1') == '1'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'core.log.JsonFormatter'},
+        'text': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'core_console': {
+            'class': 'core.log.BackgroundStreamHandler',
+            'formatter': CORE_LOG_FORMAT,
+        },
+    },
+    'loggers': {
+        'core': {
+            'handlers': ['core_console'],
+            'level': CORE_LOG_LEVEL,
+            'propagate': False,
+        },
+        **{
+            f'core.{stage}': {'level': os.environ.get(f'CORE_LOG_LEVEL_{stage.upper()}', CORE_LOG_LEVEL)}
+            for stage in ('decode', 'preprocess', 'ocr', 'parse', 'store')
+        },
+    },
+}
+
+# 고객 목록 API 페이지 크기 (기본값 / 요청으로 지정할 수 있는 최대값)
+CUSTOMER_LIST_DEFAULT_LIMIT = int(os.environ.get('CUSTOMER_LIST_DEFAULT_LIMIT', '50'))
+CUSTOMER_LIST_MAX_LIMIT = int(os.environ.get('CUSTOMER_LIST_MAX_LIMIT', '500'))
+
+# 내보내기(CSV/JSONL/vCard) 시 한 번에 읽는 페이지 크기 / 가져오기 시 insert_many 한 번에 저장하는 건수
+CUSTOMER_EXPORT_PAGE_SIZE = int(os.environ.get('CUSTOMER_EXPORT_PAGE_SIZE', '1000'))
+CUSTOMER_IMPORT_BATCH_SIZE = int(os.environ.get('CUSTOMER_IMPORT_BATCH_SIZE', '1000'))
+
+# 개인정보(이메일/전화번호) 필드 암호화
+# FIELD_ENCRYPTION_KEYS: 쉼표로 구분한 Fernet 키 목록 (첫 번째 키로 암호화, 나머지는 이전 키로 복호화만 함)
+# 키를 교체할 때는 새 키를 맨 앞에 추가하고 manage.py rotate_encryption_keys 실행 후 이전 키를 제거한다.
+# 비어 있으면 SECRET_KEY에서 유도한 고정 키를 사용 (개발용)
+FIELD_ENCRYPTION_KEYS = [key for key in os.environ.get('FIELD_ENCRYPTION_KEYS', '').split(',') if key]
+# 블라인드 인덱스(정규화한 이메일/전화번호의 HMAC) 키: 바꾸면 rotate_encryption_keys 로 다시 계산해야 함
+BLIND_INDEX_KEY = os.environ.get('BLIND_INDEX_KEY', '')
+# 목록/내보내기 응답 복호화: 커서에서 묶음 크기만큼 모아 복호화, 임계값 이상이면 스레드 풀로 나눠 처리
+FIELD_DECRYPT_BATCH_SIZE = int(os.environ.get('FIELD_DECRYPT_BATCH_SIZE', '256'))
+FIELD_DECRYPT_WORKERS = int(os.environ.get('FIELD_DECRYPT_WORKERS', '4'))
+FIELD_DECRYPT_PARALLEL_THRESHOLD = int(os.environ.get('FIELD_DECRYPT_PARALLEL_THRESHOLD', '256'))
+
+# 중복 연락처: 정규화한 이메일/전화번호가 같은 고객이 있을 때 업로드 기본 동작
+# (False: 저장하지 않고 기존 고객 id 반환 / True: 기존 고객을 새 인식 결과로 갱신, 요청마다 upsert=0|1로 변경 가능)
+CUSTOMER_UPSERT_DEFAULT = os.environ.get('CUSTOMER_UPSERT_DEFAULT', '0') == '1'
+# manage.py dedup_customers 가 중복 후보를 묶는 블로킹 키 (email / phone / name_company)
+# 후보 쌍은 이메일/전화번호가 같거나, 이름+회사가 같고 연락처가 서로 다르지 않을 때만 병합한다.
+# name_company 는 동명이인 후보가 많으므로 기본값에서 제외 (필요하면 --keys 로 지정)
+CUSTOMER_DEDUP_KEYS = os.environ.get('CUSTOMER_DEDUP_KEYS', 'email,phone').split(',')
+
+# 앱 시작 시 Mongo 인덱스 생성 여부 (manage.py ensure_indexes 로도 실행 가능)
+MONGO_ENSURE_INDEXES = os.environ.get('MONGO_ENSURE_INDEXES', '1') == '1' and not TESTING
+
+# 회사별 고객 수 집계 캐시 유지 시간(초) (같은 프로세스의 저장/삭제 시에는 즉시 무효화)
+COMPANY_FACET_CACHE_SECONDS = int(os.environ.get('COMPANY_FACET_CACHE_SECONDS', '30'))
+
+# 대시보드 실시간 반영 (GET /api/business-card/events/ SSE, ASGI에서는 계속 열린 스트림 / WSGI에서는 폴링)
+# local: 이 프로세스의 저장/삭제만 전달 / mongo: change stream 으로 모든 프로세스의 변경 전달 (복제셋 필요)
+CUSTOMER_EVENTS_SOURCE = os.environ.get('CUSTOMER_EVENTS_SOURCE', 'local')
+# 재접속(Last-Event-ID) 시 다시 보내줄 최근 이벤트 수, 구독자별 대기 이벤트 수 (넘치면 resync)
+CUSTOMER_EVENTS_BACKLOG = int(os.environ.get('CUSTOMER_EVENTS_BACKLOG', '1000'))
+CUSTOMER_EVENTS_QUEUE_SIZE = int(os.environ.get('CUSTOMER_EVENTS_QUEUE_SIZE', '256'))
+CUSTOMER_EVENTS_MAX_SUBSCRIBERS = int(os.environ.get('CUSTOMER_EVENTS_MAX_SUBSCRIBERS', '100'))
+CUSTOMER_EVENTS_KEEPALIVE_SECONDS = int(os.environ.get('CUSTOMER_EVENTS_KEEPALIVE_SECONDS', '15'))
+CUSTOMER_EVENTS_RETRY_MS = 3000
+# WSGI(CORE_ASYNC_VIEWS=0)에서는 스트림을 열어두지 않고 폴링: 요청마다 밀린 이벤트를 이 시간(초)까지만 기다렸다가 닫고
+# 클라이언트는 CUSTOMER_EVENTS_RETRY_MS 뒤에 다시 요청 (0이면 기다리지 않음, 늘리면 그만큼 워커 스레드를 잡음)
+CUSTOMER_EVENTS_SYNC_WAIT_SECONDS = float(os.environ.get('CUSTOMER_EVENTS_SYNC_WAIT_SECONDS', '0'))
+
+# 고객 검색 (GET /api/business-card/search/?q=)
+# tokens: search 토큰 배열의 멀티키 인덱스 + 겹치는 토큰 수로 순위 / text: 같은 토큰 배열에 Mongo 텍스트 인덱스
+# (엔진을 바꾸면 ensure_indexes 가 해당 인덱스를 만든다, 토큰이 없는 기존 문서는 manage.py reindex_search)
+SEARCH_ENGINE = os.environ.get('SEARCH_ENGINE', 'tokens')
+# 질의 토큰 중 이 비율 이상이 겹치는 고객만 결과에 포함 / 순위를 매길 후보 수 상한
+# (조건에 맞는 고객이 상한을 넘으면 일부만으로 순위를 매기고 응답에 truncated: true)
+SEARCH_MIN_MATCH = float(os.environ.get('SEARCH_MIN_MATCH', '0.3'))
+SEARCH_MAX_CANDIDATES = int(os.environ.get('SEARCH_MAX_CANDIDATES', '5000'))
+SEARCH_PAGE_LIMIT = int(os.environ.get('SEARCH_PAGE_LIMIT', '20'))
+
+
+# MongoDB
+# 고객 정보/작업/캐시는 Mongo에 저장한다. 연결 정보와 커넥션 풀은 환경변수로 조정한다.
+
+MONGO_URI = os.environ.get('MONGO_URI', 'mongodb://localhost:27017')
+
+MONGO_DB_NAME = os.environ.get('MONGO_DB_NAME', 'business_card_db')
+
+# manage.py test 는 기본으로 mongomock 을 써서 mongod 없이 실행 (MONGO_CLIENT_CLASS 로 바꿀 수 있음)
+MONGO_CLIENT_CLASS = os.environ.get('MONGO_CLIENT_CLASS', 'mongomock.MongoClient' if TESTING else 'pymongo.MongoClient')
+
+# 비동기 뷰에서 사용하는 클라이언트 (비우면 동기 클라이언트를 스레드에서 실행)
+MONGO_ASYNC_CLIENT_CLASS = os.environ.get('MONGO_ASYNC_CLIENT_CLASS', 'pymongo.AsyncMongoClient')
+
+_write_concern = os.environ.get('MONGO_WRITE_CONCERN', '1')
+
+MONGO_OPTIONS = {
+    'maxPoolSize': int(os.environ.get('MONGO_MAX_POOL_SIZE', '100')),
+    'minPoolSize': int(os.environ.get('MONGO_MIN_POOL_SIZE', '0')),
+    'maxIdleTimeMS': int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', '60000')),
+    'serverSelectionTimeoutMS': int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000')),
+    'connectTimeoutMS': int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '5000')),
+    'socketTimeoutMS': int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', '30000')),
+    'w': int(_write_concern) if _write_concern.isdigit() else _write_concern,
+    'readPreference': os.environ.get('MONGO_READ_PREFERENCE', 'primary'),
+}
+
+
+# ASGI
+# asgi.py 로 서비스할 때 CORE_ASYNC_VIEWS=1 이면 업로드/목록/삭제 API가 비동기 뷰로 연결된다.
+# 비동기 업로드는 OCR을 프로세스 풀에서 실행하고 결과를 바로 응답한다(201).
+
+CORE_ASYNC_VIEWS = os.environ.get('CORE_ASYNC_VIEWS', '0') == '1'
+
+# OCR 워커 프로세스 수 (0이면 CPU 코어 수)
+OCR_PROCESS_WORKERS = int(os.environ.get('OCR_PROCESS_WORKERS', '0'))
+
+# 워커 하나가 쓰는 torch/OpenCV 스레드 수 (0이면 CPU 코어 수 / 워커 수)
+OCR_WORKER_THREADS = int(os.environ.get('OCR_WORKER_THREADS', '0'))
+
+# 워커 시작 시 Reader 로드 + 더미 추론으로 미리 준비
+OCR_WORKER_WARMUP = os.environ.get('OCR_WORKER_WARMUP', '1') == '1'
+
+# 요청 처리 스레드가 있는 프로세스에서 fork하지 않도록 기본은 spawn
+OCR_WORKER_START_METHOD = os.environ.get('OCR_WORKER_START_METHOD', 'spawn')
+
+# 작업 큐(동기 업로드)의 단건 OCR도 워커 프로세스 풀에서 실행
+OCR_JOB_USE_WORKER_POOL = os.environ.get('OCR_JOB_USE_WORKER_POOL', '0') == '1'
+
+# 워커가 모두 바쁠 때 추가로 대기시킬 수 있는 요청 수 (넘으면 429)
+OCR_PROCESS_QUEUE_SIZE = int(os.environ.get('OCR_PROCESS_QUEUE_SIZE', '4'))
+
+# 429 응답의 Retry-After(초)
+OCR_RETRY_AFTER_SECONDS = int(os.environ.get('OCR_RETRY_AFTER_SECONDS', '5'))
@@ -1,6 +1,32 @@
+import logging
+import threading
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _ensure_indexes():
+    from .models import ensure_indexes
+    try:
+        ensure_indexes()
+    except Exception:
+        logger.exception("Failed to ensure Mongo indexes")
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Mongo 인덱스 생성 (Mongo 연결을 기다리느라 시작이 늦어지지 않도록 백그라운드에서)
+        if getattr(settings, 'MONGO_ENSURE_INDEXES', True):
+            threading.Thread(target=_ensure_indexes, name='ensure-indexes', daemon=True).start()
+
+        from . import startup
+        startup.mark_booted()
+
+        # OCR 모델을 첫 요청이 아니라 앱 시작 시점에 로드 + 더미 추론 (끝날 때까지 /readyz 는 503)
+        if getattr(settings, 'OCR_PRELOAD', False):
+            startup.warm_up_in_background()
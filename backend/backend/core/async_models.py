@@ -0,0 +1,115 @@
+# models.py 의 비동기 버전 (ASGI 비동기 뷰에서 이벤트 루프를 막지 않고 Mongo 접근)
+# settings.MONGO_ASYNC_CLIENT_CLASS(기본: pymongo.AsyncMongoClient)를 이벤트 루프마다 하나씩 만들어 쓰고,
+# 비어 있거나 mongomock 같은 동기 클라이언트로 설정된 경우에는 models.py 함수를 스레드에서 실행한다.
+import asyncio
+import weakref
+
+from asgiref.sync import sync_to_async
+from bson import ObjectId
+from django.conf import settings
+from django.utils import timezone
+from pymongo.errors import DuplicateKeyError
+
+from . import events, models
+from .crypto import decrypt_documents
+from .normalize import annotate, match_query
+from .mongo import create_client
+
+# AsyncMongoClient는 처음 사용한 이벤트 루프에 묶이므로 루프별로 하나씩 유지
+_clients = weakref.WeakKeyDictionary()
+
+
+def _use_async_client():
+    return bool(getattr(settings, 'MONGO_ASYNC_CLIENT_CLASS', None)) and \
+        'mongomock' not in getattr(settings, 'MONGO_CLIENT_CLASS', '')
+
+
+def get_async_db():
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = create_client(settings.MONGO_ASYNC_CLIENT_CLASS)
+    return client[getattr(settings, 'MONGO_DB_NAME', 'business_card_db')]
+
+
+def _in_thread(func):
+    return sync_to_async(func, thread_sensitive=False)
+
+
+async def insert_customer(data):
+    if not _use_async_client():
+        return await _in_thread(models.insert_customer)(data)
+    annotate(data)
+    data.setdefault('created_at', timezone.now())
+    result = await get_async_db().customers.insert_one(models.stored_document(data))
+    data['_id'] = result.inserted_id
+    models.invalidate_company_facets()
+    events.customer_inserted(data)
+    models.logger.debug("Inserted customer %s", result.inserted_id)
+    return result
+
+
+async def save_customer(data, upsert=False):
+    """models.save_customer 의 비동기 버전: (고객 _id, 'inserted' | 'updated' | 'duplicate')"""
+    if not _use_async_client():
+        return await _in_thread(models.save_customer)(data, upsert)
+    annotate(data)
+    query = match_query(data['norm'])
+    if query is not None:
+        existing = await get_async_db().customers.find_one(query, models.CUSTOMER_PROJECTION)
+        if existing is not None:
+            if not upsert:
+                return existing['_id'], 'duplicate'
+            existing = decrypt_documents([existing])[0]
+            await get_async_db().customers.update_one(
+                {'_id': existing['_id']}, {'$set': models.customer_update(data, existing)}
+            )
+            models.invalidate_company_facets()
+            events.customer_updated(existing['_id'], models.changed_fields(data))
+            return existing['_id'], 'updated'
+    try:
+        return (await insert_customer(data)).inserted_id, 'inserted'
+    except DuplicateKeyError:
+        data.pop('_id', None)
+        return await save_customer(data, upsert)
+
+
+async def iter_customers(company=None, after=None, limit=None, fields=None, email=None, phone=None):
+    """find_customers 와 같은 조건으로 문서를 하나씩 비동기로 반환 (복호화는 묶음 단위로 스레드에서)"""
+    if not _use_async_client():
+        documents = await _in_thread(
+            lambda: list(models.find_customers(company, after, limit, fields, email, phone))
+        )()
+        for document in documents:
+            yield document
+        return
+
+    query, projection = models.customer_query(company, after, fields, email, phone)
+    cursor = get_async_db().customers.find(query, projection).sort('_id', 1)
+    if limit:
+        cursor = cursor.limit(limit)
+    batch_size = getattr(settings, 'FIELD_DECRYPT_BATCH_SIZE', 256)
+    batch = []
+    async for document in cursor:
+        batch.append(document)
+        if len(batch) >= batch_size:
+            for decrypted in await _in_thread(decrypt_documents)(batch):
+                yield decrypted
+            batch = []
+    if batch:
+        for decrypted in await _in_thread(decrypt_documents)(batch):
+            yield decrypted
+
+
+async def delete_customer(customer_id):
+    if not _use_async_client():
+        return await _in_thread(models.delete_customer)(customer_id)
+    customers = get_async_db().customers
+    deleted = await customers.find_one_and_delete({'_id': ObjectId(customer_id)}, {'company': 1})
+    if deleted is None:
+        return 0
+    models.invalidate_company_facets()
+    company = deleted.get('company')
+    empty = bool(company) and await customers.find_one({'company': company}, {'_id': 1}) is None
+    events.customer_deleted(deleted['_id'], company, empty)
+    return 1
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import os
+
+from asgiref.sync import sync_to_async
+from bson.errors import InvalidId
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from . import async_models, cache, events, metrics
+from .views import EventStreamResponse, encode_cursor, event_params, list_params, ocr_mode, upload_source, upsert_mode
+from .workers import PoolSaturated, get_pool
+
+# ASGI(asgi.py)로 서비스할 때 쓰는 비동기 버전 API (settings.CORE_ASYNC_VIEWS=True 일 때 urls.py에서 연결)
+# OCR은 프로세스 풀에서 실행하고, 풀이 가득 차면 429 + Retry-After로 응답한다.
+
+
+def _error(message, status, **headers):
+    response = JsonResponse({'error': message}, status=status, json_dumps_params={'ensure_ascii': False})
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncBusinessCardUploadView(View):
+    async def post(self, request):
+        image_file = request.FILES.get('image')
+        if not image_file:
+            return _error('이미지 파일이 필요합니다.', 400)
+        try:
+            mode = ocr_mode(request.GET, request.POST)
+        except ValueError as e:
+            return _error(str(e), 400)
+        source = await sync_to_async(upload_source, thread_sensitive=False)(image_file)
+        bypass = str(request.POST.get('no_cache') or request.GET.get('no_cache')).lower() in ('1', 'true', 'yes')
+
+        try:
+            customer_data, ocr_stats = await self.recognize(source, bypass, mode)
+        except PoolSaturated:
+            return _error(
+                'OCR 처리 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.', 429,
+                **{'Retry-After': str(getattr(settings, 'OCR_RETRY_AFTER_SECONDS', 5))},
+            )
+        except Exception as e:
+            metrics.observe_failure()
+            return _error(f'명함 인식 실패: {e}', 422)
+        finally:
+            if isinstance(source, str):
+                await sync_to_async(_remove, thread_sensitive=False)(source)
+
+        metrics.observe_card(customer_data)
+        metrics.observe_boxes(ocr_stats)
+        customer_id, action = await async_models.save_customer(customer_data, upsert=upsert_mode(request.GET, request.POST))
+        customer_data.pop('norm', None)
+        customer_data['_id'] = str(customer_id)
+        customer_data['action'] = action
+        if ocr_stats:
+            customer_data['ocr_stats'] = ocr_stats
+        return JsonResponse(
+            customer_data, status=201 if action == 'inserted' else 200, encoder=DjangoJSONEncoder, json_dumps_params={'ensure_ascii': False},
+        )
+
+    async def recognize(self, source, bypass, mode=None):
+        """(고객 정보, fast 모드의 박스 통계 또는 None) 반환 (캐시에는 박스 통계를 넣지 않음)"""
+        if bypass or not getattr(settings, 'OCR_CACHE_ENABLED', True):
+            cache.get_cache().note_bypass()
+            result = await get_pool().arecognize(source, mode)
+            return result, result.pop('ocr_stats', None)
+        result, key, source, fingerprint = await sync_to_async(cache.lookup, thread_sensitive=False)(source)
+        if result is not None:
+            return result, None
+        result = await get_pool().arecognize(source, mode)
+        ocr_stats = result.pop('ocr_stats', None)
+        cache.get_cache().put(key, result, fingerprint)
+        return result, ocr_stats
+
+
+def _remove(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class AsyncCustomerListView(View):
+    async def get(self, request):
+        try:
+            company, after, limit, fields, contact = list_params(request.GET)
+        except ValueError:
+            return _error('잘못된 limit 또는 cursor 값입니다.', 400)
+        documents = async_models.iter_customers(company, after=after, limit=limit + 1, fields=fields, **contact)
+        return StreamingHttpResponse(_stream_page(documents, limit), content_type='application/json')
+
+
+async def _stream_page(documents, limit):
+    yield '{"results":['
+    last_id = None
+    count = 0
+    async for customer in documents:
+        if count == limit:
+            yield '],"next":' + json.dumps(encode_cursor(last_id)) + '}'
+            return
+        last_id = customer['_id']
+        customer['_id'] = str(last_id)
+        yield (',' if count else '') + json.dumps(customer, ensure_ascii=False, default=str)
+        count += 1
+    yield '],"next":null}'
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncCustomerDeleteView(View):
+    async def delete(self, request, customer_id):
+        try:
+            deleted_count = await async_models.delete_customer(customer_id)
+        except InvalidId:
+            deleted_count = 0
+        if deleted_count == 1:
+            return JsonResponse({'message': '삭제 성공'}, status=204, json_dumps_params={'ensure_ascii': False})
+        return _error('해당 고객을 찾을 수 없습니다.', 404)
+
+
+async def async_customer_events_view(request):
+    """views.customer_events_view 의 비동기 버전 (구독자마다 스레드를 잡지 않음)"""
+    company, last_event_id = event_params(request)
+    try:
+        subscription = events.subscribe(company, last_event_id, loop=asyncio.get_running_loop())
+    except events.TooManySubscribers:
+        return _error('실시간 구독자 수가 너무 많습니다.', 503)
+
+    async def stream():
+        keepalive = getattr(settings, 'CUSTOMER_EVENTS_KEEPALIVE_SECONDS', 15)
+        yield f'retry: {getattr(settings, "CUSTOMER_EVENTS_RETRY_MS", 3000)}\n\n'
+        while True:
+            event = await subscription.aget(timeout=keepalive)
+            yield events.format_sse(event) if event else ': keepalive\n\n'
+
+    return EventStreamResponse(stream(), subscription)
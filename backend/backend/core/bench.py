@@ -0,0 +1,184 @@
+import json
+import os
+import random
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .normalize import normalize_email, normalize_phone
+
+FIELDS = ('name', 'phone', 'email', 'company')
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+def percentile(samples, q):
+    """선형 보간 백분위수 (q: 0~100)"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples):
+    """초 단위 측정값 목록 → ms 단위 요약"""
+    if not samples:
+        return {'count': 0}
+    return {
+        'count': len(samples),
+        'mean_ms': round(sum(samples) / len(samples) * 1000, 3),
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p95_ms': round(percentile(samples, 95) * 1000, 3),
+        'max_ms': round(max(samples) * 1000, 3),
+    }
+
+
+def timed(func, *args, repeat=1, **kwargs):
+    """func를 repeat번 실행하고 (마지막 결과, 각 실행 시간 목록) 반환"""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        samples.append(time.perf_counter() - started)
+    return result, samples
+
+
+def collect_images(paths):
+    """파일/디렉터리 경로 목록에서 명함 이미지 파일 목록을 만든다"""
+    images = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    images.append(os.path.join(path, name))
+        else:
+            images.append(path)
+    return images
+
+
+def load_labels(path):
+    """{파일명: {name, phone, email, company}} 형태의 정답 JSON"""
+    if not path:
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def field_accuracy(predictions, labels):
+    """필드별 정답 일치율 (정답이 있는 이미지만 집계) = field_scores 의 재현율
+
+    predictions 키는 이미지 경로, labels 키는 파일명
+    """
+    predictions = {os.path.basename(filename): predicted for filename, predicted in predictions.items()}
+    labeled = {filename: labels[filename] for filename in predictions if filename in labels}
+    return {field: score['recall'] for field, score in field_scores(predictions, labeled).items()}
+
+
+def load_corpus(paths):
+    """정답 JSON 파일 목록 → [{'file', 'name', 'phone', 'email', 'company', 'lines'}, ...]
+
+    JSON 형식은 load_labels와 같고, 파일명은 JSON 파일 위치 기준 상대 경로로 해석한다.
+    'lines'(명함에 적힌 텍스트 줄 목록)가 있으면 OCR 없이 파서만 측정할 때 가짜 OCR 결과로 쓴다.
+    """
+    corpus = []
+    for path in paths:
+        base = os.path.dirname(os.path.abspath(path))
+        for filename, label in load_labels(path).items():
+            corpus.append({**label, 'file': os.path.normpath(os.path.join(base, filename))})
+    return corpus
+
+
+def comparable(field, value):
+    """표기 차이(하이픈, 공백, 대소문자)는 무시하고 비교"""
+    if not value:
+        return None
+    if field == 'phone':
+        return normalize_phone(value)
+    if field == 'email':
+        return normalize_email(value)
+    return ''.join(value.split()).casefold()
+
+
+def field_scores(predictions, labels):
+    """필드별 정밀도/재현율/F1
+
+    predictions, labels: 같은 키의 {키: {필드: 값}} (정답에 필드 키가 없는 명함은 해당 필드 집계에서 제외)
+    - 정답과 같은 값을 추출: TP
+    - 값을 추출했지만 틀림: FP + FN (정답이 비어 있으면 FP만)
+    - 정답이 있는데 추출하지 못함: FN
+    """
+    scores = {}
+    for field in FIELDS:
+        tp = fp = fn = 0
+        for key, label in labels.items():
+            if field not in label:
+                continue
+            expected = comparable(field, label[field])
+            predicted = comparable(field, (predictions.get(key) or {}).get(field))
+            if predicted and predicted == expected:
+                tp += 1
+                continue
+            fp += int(bool(predicted))
+            fn += int(bool(expected))
+        precision = tp / (tp + fp) if tp + fp else None
+        recall = tp / (tp + fn) if tp + fn else None
+        if precision is None or recall is None:
+            f1 = None
+        else:
+            f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        scores[field] = {
+            'tp': tp, 'fp': fp, 'fn': fn,
+            'precision': round(precision, 4) if precision is not None else None,
+            'recall': round(recall, 4) if recall is not None else None,
+            'f1': round(f1, 4) if f1 is not None else None,
+        }
+    return scores
+
+
+def peak_rss_mb():
+    """현재 프로세스의 최대 상주 메모리(MB), 알 수 없으면 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # 리눅스는 KB, macOS는 바이트 단위
+    return round(peak / (1024 * 1024 if os.uname().sysname == 'Darwin' else 1024), 1)
+
+
+class StubReader:
+    """EasyOCR Reader 대신 정답 텍스트 줄을 readtext 결과 형식으로 돌려주는 가짜 OCR
+
+    noise(0~1): 글자마다 이 확률로 자주 틀리는 글자(교정 사전의 역방향)나 비슷한 글자로 바꿔서
+    파서의 오류 교정/패턴이 얼마나 버티는지 본다.
+    """
+
+    CONFUSIONS = {'0': 'O', '1': 'l', '5': 'S', '8': 'B', '-': '~', '.': ',', '@': '&'}
+
+    def __init__(self, noise=0.0, seed=0):
+        from .parser import COMMON_OCR_ERRORS
+        self.noise = noise
+        self.random = random.Random(seed)
+        self.confusions = dict(self.CONFUSIONS)
+        for wrong, right in COMMON_OCR_ERRORS.items():
+            self.confusions.setdefault(right, wrong)
+
+    def _garble(self, text):
+        if not self.noise:
+            return text
+        return ''.join(
+            self.confusions[char] if char in self.confusions and self.random.random() < self.noise else char
+            for char in text
+        )
+
+    def readtext(self, lines):
+        results = []
+        for index, text in enumerate(lines):
+            top, bottom = index * 40, index * 40 + 30
+            box = [[0, top], [20 * len(text), top], [20 * len(text), bottom], [0, bottom]]
+            results.append((box, self._garble(text), 1.0))
+        return results
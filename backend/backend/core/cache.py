@@ -0,0 +1,226 @@
+import copy
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .metrics import CACHE_LOOKUPS
+from .models import get_cached_candidates, get_cached_result, save_cached_result
+
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_key(source):
+    """원본 이미지 바이트의 SHA-256 키와, 다시 읽지 않도록 정리한 source를 반환
+
+    디스크에 받은 큰 업로드(경로, 임시 파일)는 메모리에 올리지 않고 나눠 읽어 해시하고 경로를 그대로 넘긴다.
+    """
+    import numpy as np  # URLconf 로드 시점에 NumPy/OpenCV를 읽지 않도록 사용 시점에 import
+
+    if hasattr(source, 'temporary_file_path'):
+        source = source.temporary_file_path()
+    if isinstance(source, (str, os.PathLike)):
+        return _hash_file(source), source
+    if isinstance(source, np.ndarray):
+        data = np.ascontiguousarray(source)
+    elif hasattr(source, 'read'):
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        data = source = source.read()
+    else:
+        data = source
+    return hashlib.sha256(memoryview(data)).hexdigest(), source
+
+
+def perceptual_hash(image):
+    """dHash(64비트): 재촬영/재압축된 같은 명함을 찾기 위한 지각 해시 (Mongo 저장을 위해 signed int64)"""
+    import cv2
+    import numpy as np
+
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(np.packbits(bits).view('>i8')[0])
+
+
+VERIFY_SIZE = (384, 192)
+VERIFY_BLOCK = 6
+
+
+def detail_image(image):
+    """지각 해시 후보 검증용 384x192 흑백 축소 이미지 (PNG bytes)
+
+    9x8 dHash는 같은 양식으로 인쇄한 다른 사람 명함도 거의 같으므로, 후보는 이 이미지를
+    작은 블록 단위로 비교해서 글자 하나라도 다른 블록이 없을 때만 결과로 쓴다.
+    """
+    import cv2
+
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image, VERIFY_SIZE, interpolation=cv2.INTER_AREA)
+    return cv2.imencode('.png', small)[1].tobytes()
+
+
+def detail_difference(first, second):
+    """두 검증 이미지의 블록별 평균 밝기 차이 중 최댓값 (0~255)"""
+    import cv2
+    import numpy as np
+
+    width, height = VERIFY_SIZE
+    first, second = (
+        cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE).astype(np.int16)
+        for data in (first, second)
+    )
+    blocks = np.abs(first - second).reshape(height // VERIFY_BLOCK, VERIFY_BLOCK, width // VERIFY_BLOCK, VERIFY_BLOCK)
+    return float(blocks.mean(axis=(1, 3)).max())
+
+
+class ResultCache:
+    """명함 OCR 결과 캐시 (메모리 LRU + 선택적으로 Mongo에 영구 저장)
+
+    fingerprint: 지각 해시를 쓸 때 (phash, detail) — phash로 후보를 찾고 detail로 검증
+    """
+
+    def __init__(self, max_entries=1024, persistent=False, perceptual=False, max_distance=4, verify_difference=24):
+        self.max_entries = max_entries
+        self.persistent = persistent
+        self.perceptual = perceptual
+        self.max_distance = max_distance
+        self.verify_difference = verify_difference
+        self._entries = OrderedDict()  # key -> (result, fingerprint)
+        self._lock = threading.Lock()
+        self.hits = {'memory': 0, 'perceptual': 0, 'persistent': 0}
+        self.misses = 0
+        self.bypassed = 0
+
+    def _hit(self, tier):
+        self.hits[tier] += 1
+        CACHE_LOOKUPS.inc(result=f'hit_{tier}')
+
+    def _similar(self, fingerprint, other):
+        """지각 해시가 가깝고 검증 이미지도 모든 블록이 거의 같을 때만 같은 명함으로 봄"""
+        if fingerprint is None or other is None or other[1] is None:
+            return False
+        if bin((fingerprint[0] ^ other[0]) & 0xFFFFFFFFFFFFFFFF).count('1') > self.max_distance:
+            return False
+        return detail_difference(fingerprint[1], other[1]) <= self.verify_difference
+
+    def get(self, key, fingerprint=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hit('memory')
+                return copy.deepcopy(entry[0])
+            if fingerprint is not None:
+                for other_key, (result, other) in reversed(self._entries.items()):
+                    if self._similar(fingerprint, other):
+                        self._entries.move_to_end(other_key)
+                        self._hit('perceptual')
+                        return copy.deepcopy(result)
+
+        if self.persistent:
+            stored = get_cached_result(key)
+            if stored is None and fingerprint is not None:
+                stored = next(
+                    (candidate for candidate in get_cached_candidates(fingerprint[0])
+                     if self._similar(fingerprint, (candidate['phash'], candidate.get('detail')))),
+                    None,
+                )
+            if stored is not None:
+                with self._lock:
+                    self._hit('persistent')
+                other = (stored['phash'], stored.get('detail')) if stored.get('phash') is not None else None
+                self._remember(key, stored['result'], other)
+                return copy.deepcopy(stored['result'])
+
+        with self._lock:
+            self.misses += 1
+        CACHE_LOOKUPS.inc(result='miss')
+        return None
+
+    def put(self, key, result, fingerprint=None):
+        result = copy.deepcopy(result)
+        self._remember(key, result, fingerprint)
+        if self.persistent:
+            save_cached_result(key, result, *(fingerprint or (None, None)))
+
+    def _remember(self, key, result, fingerprint):
+        with self._lock:
+            self._entries[key] = (result, fingerprint)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def note_bypass(self):
+        with self._lock:
+            self.bypassed += 1
+        CACHE_LOOKUPS.inc(result='bypass')
+
+    def stats(self):
+        with self._lock:
+            hits = sum(self.hits.values())
+            lookups = hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': dict(self.hits),
+                'misses': self.misses,
+                'bypassed': self.bypassed,
+                'hit_rate': round(hits / lookups, 4) if lookups else None,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResultCache(
+                    max_entries=getattr(settings, 'OCR_CACHE_MAX_ENTRIES', 1024),
+                    persistent=getattr(settings, 'OCR_CACHE_PERSISTENT', False),
+                    perceptual=getattr(settings, 'OCR_CACHE_PERCEPTUAL', False),
+                    max_distance=getattr(settings, 'OCR_CACHE_PERCEPTUAL_DISTANCE', 4),
+                    verify_difference=getattr(settings, 'OCR_CACHE_PERCEPTUAL_VERIFY_DIFFERENCE', 24),
+                )
+    return _cache
+
+
+def lookup(source):
+    """캐시 조회: (결과 또는 None, 저장용 키, 정리된 source, 지각 해시 (phash, detail) 또는 None)"""
+    cache = get_cache()
+    key, source = content_key(source)
+    fingerprint = None
+    if cache.perceptual:
+        from .ocr import load_image
+        image = load_image(source)
+        fingerprint = (perceptual_hash(image), detail_image(image))
+    return cache.get(key, fingerprint), key, source, fingerprint
+
+
+def cached_process(source, compute, bypass=False):
+    """process_business_card 앞단 캐시: 같은 이미지면 OCR 없이 이전 결과 반환"""
+    if bypass or not getattr(settings, 'OCR_CACHE_ENABLED', True):
+        get_cache().note_bypass()
+        return compute(source)
+    result, key, source, fingerprint = lookup(source)
+    if result is None:
+        result = compute(source)
+        get_cache().put(key, result, fingerprint)
+    return result
@@ -1,23 +1,165 @@
-from cryptography.fernet import Fernet
+import base64
+import hashlib
+import hmac
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 from django.conf import settings
 
-# 1. 암호화 키를 settings에서 가져오거나 없으면 새로 생성
-SECRET_KEY = getattr(settings, 'ENCRYPTION_KEY', None)
-if not SECRET_KEY:
-    SECRET_KEY = Fernet.generate_key()
-    setattr(settings, 'ENCRYPTION_KEY', SECRET_KEY)
-fernet = Fernet(SECRET_KEY)
+logger = logging.getLogger(__name__)
+
+# 개인정보 필드 암호화 (Mongo 데이터 계층 models.py 에서 저장/조회 시 적용)
+# - 암호화 키: settings.FIELD_ENCRYPTION_KEYS (첫 번째 키로 암호화, 나머지는 이전 키로 복호화만)
+# - 블라인드 인덱스: 정규화한 값의 HMAC (norm.email / norm.phone) → 복호화 없이 검색/중복 판별
+ENCRYPTED_FIELDS = ('email', 'phone')
+# Fernet 토큰은 버전 바이트(0x80) 때문에 항상 'gAAAAA'로 시작 (암호화 이전에 저장된 평문과 구분)
+TOKEN_PREFIX = 'gAAAAA'
+
+_fernet = None
+_index_key = None
+_lock = threading.Lock()
+_executor = None
+
+
+def _derive(purpose):
+    """키가 설정되지 않은 개발 환경용: SECRET_KEY에서 용도별 고정 키를 유도 (재시작해도 같은 키)"""
+    return hashlib.sha256(f'{purpose}:{settings.SECRET_KEY}'.encode()).digest()
+
+
+# 1. 암호화 키 (프로세스당 한 번만 만들어서 재사용)
+def get_fernet():
+    global _fernet
+    if _fernet is None:
+        with _lock:
+            if _fernet is None:
+                keys = list(getattr(settings, 'FIELD_ENCRYPTION_KEYS', None) or [])
+                legacy = getattr(settings, 'ENCRYPTION_KEY', None)
+                if legacy:
+                    keys.append(legacy)
+                if not keys:
+                    logger.warning("FIELD_ENCRYPTION_KEYS가 없어 SECRET_KEY에서 유도한 키를 사용합니다.")
+                    keys = [base64.urlsafe_b64encode(_derive('field-encryption'))]
+                _fernet = MultiFernet([Fernet(key) for key in keys])
+    return _fernet
+
+
+def get_index_key():
+    global _index_key
+    if _index_key is None:
+        key = getattr(settings, 'BLIND_INDEX_KEY', None)
+        _index_key = key.encode() if key else _derive('blind-index')
+    return _index_key
+
+
+def reset_keys():
+    """설정을 바꾼 뒤 (키 교체 등) 캐시된 키를 다시 읽게 함"""
+    global _fernet, _index_key
+    with _lock:
+        _fernet = None
+        _index_key = None
+
+
+def is_encrypted(value):
+    return isinstance(value, str) and value.startswith(TOKEN_PREFIX)
+
 
 # 2. 암호화 함수
 def encrypt(text: str) -> str:
     """문자열 암호화"""
     if not text:
         return ''
-    return fernet.encrypt(text.encode()).decode()
+    return get_fernet().encrypt(text.encode()).decode()
+
 
 # 3. 복호화 함수
 def decrypt(token: str) -> str:
-    """문자열 복호화"""
+    """문자열 복호화 (암호화 이전에 저장된 평문은 그대로 반환)"""
     if not token:
         return ''
-    return fernet.decrypt(token.encode()).decode()
\ No newline at end of file
+    if not is_encrypted(token):
+        return token
+    return get_fernet().decrypt(token.encode()).decode()
+
+
+def rotate(token: str) -> str:
+    """이전 키로 암호화된 값을 현재(첫 번째) 키로 다시 암호화 (평문이면 암호화)"""
+    if not token:
+        return token
+    if not is_encrypted(token):
+        return encrypt(token)
+    return get_fernet().rotate(token.encode()).decode()
+
+
+# 4. 블라인드 인덱스
+def blind_index(value, field):
+    """정규화된 값의 HMAC-SHA256 (필드마다 다른 값이 나오도록 필드명을 섞음)"""
+    if not value:
+        return None
+    digest = hmac.new(get_index_key(), f'{field}:{value}'.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:20]).decode()
+
+
+# 5. 문서 단위 암호화/복호화
+def encrypt_document(document):
+    """저장용 사본: 개인정보 필드를 암호화"""
+    stored = dict(document)
+    for field in ENCRYPTED_FIELDS:
+        if stored.get(field) and not is_encrypted(stored[field]):
+            stored[field] = encrypt(stored[field])
+    return stored
+
+
+def decrypt_document(document):
+    for field in ENCRYPTED_FIELDS:
+        if document.get(field):
+            try:
+                document[field] = decrypt(document[field])
+            except InvalidToken:
+                logger.error("Failed to decrypt %s of customer %s", field, document.get('_id'))
+                document[field] = None
+    return document
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'FIELD_DECRYPT_WORKERS', 4),
+                    thread_name_prefix='decrypt',
+                )
+    return _executor
+
+
+def _decrypt_chunk(documents):
+    for document in documents:
+        decrypt_document(document)
+    return documents
+
+
+def decrypt_documents(documents):
+    """여러 문서를 한 번에 복호화 (많으면 묶음으로 나눠 스레드 풀에서 처리, 제자리 변경)"""
+    workers = getattr(settings, 'FIELD_DECRYPT_WORKERS', 4)
+    threshold = getattr(settings, 'FIELD_DECRYPT_PARALLEL_THRESHOLD', 256)
+    if workers <= 1 or len(documents) < threshold:
+        return _decrypt_chunk(documents)
+    size = -(-len(documents) // workers)
+    chunks = [documents[start:start + size] for start in range(0, len(documents), size)]
+    list(_get_executor().map(_decrypt_chunk, chunks))
+    return documents
+
+
+def iter_decrypted(cursor, batch_size=None):
+    """커서에서 batch_size개씩 모아 한 번에 복호화하면서 문서를 하나씩 반환"""
+    batch_size = batch_size or getattr(settings, 'FIELD_DECRYPT_BATCH_SIZE', 256)
+    batch = []
+    for document in cursor:
+        batch.append(document)
+        if len(batch) >= batch_size:
+            yield from decrypt_documents(batch)
+            batch = []
+    if batch:
+        yield from decrypt_documents(batch)
@@ -0,0 +1,165 @@
+from django.conf import settings
+from django.utils import timezone
+from pymongo import UpdateOne
+
+from . import events
+from .models import CUSTOMER_FIELDS, company_is_empty, invalidate_company_facets
+from .mongo import db
+from .crypto import decrypt_document
+from .normalize import index_fields
+from .search import search_tokens
+
+# 저장된 고객 중 같은 사람으로 보이는 문서를 찾아 하나로 합치는 일괄 작업 (manage.py dedup_customers)
+# 모든 문서 쌍을 비교(O(n²))하지 않고, 블로킹 키(정규화 값)별로 Mongo에서 $group 해서
+# 두 건 이상 모인 묶음만 후보로 가져온 뒤, 묶음 안의 쌍 중 같은 사람으로 확인된 쌍만 union-find로 합친다.
+
+BLOCKING_KEYS = {
+    'email': ('email',),
+    'phone': ('phone',),
+    'name_company': ('name', 'company'),
+}
+# 자동 병합 기본 키: 이름+회사는 동명이인이 흔하므로 명시적으로 지정할 때만 (--keys name_company)
+DEFAULT_KEYS = ('email', 'phone')
+CONTACT_FIELDS = ('email', 'phone')
+
+
+def backfill_normalized(batch_size=1000):
+    """norm 필드가 없는 (정규화 도입 전에 저장된) 문서를 채움, 채운 건수 반환"""
+    updated = 0
+    operations = []
+    projection = {field: 1 for field in CUSTOMER_FIELDS}
+    for customer in db.customers.find({'norm': {'$exists': False}}, projection):
+        operations.append(UpdateOne({'_id': customer['_id']}, {'$set': {'norm': index_fields(decrypt_document(customer))}}))
+        if len(operations) >= batch_size:
+            updated += db.customers.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated += db.customers.bulk_write(operations, ordered=False).modified_count
+    return updated
+
+
+def candidate_groups(key):
+    """블로킹 키 값이 같은 문서가 두 건 이상인 묶음의 [{'_id', 'norm'}] 목록을 하나씩 반환"""
+    fields = BLOCKING_KEYS[key]
+    pipeline = [
+        {'$match': {f'norm.{field}': {'$type': 'string'} for field in fields}},
+        {'$group': {
+            '_id': {field: f'$norm.{field}' for field in fields},
+            'docs': {'$push': {'_id': '$_id', 'norm': '$norm'}},
+            'count': {'$sum': 1},
+        }},
+        {'$match': {'count': {'$gt': 1}}},
+    ]
+    for group in db.customers.aggregate(pipeline, allowDiskUse=True):
+        yield group['docs']
+
+
+def same_person(first, second):
+    """블로킹 키로 묶인 두 문서(norm)가 실제로 같은 사람인지
+
+    이메일이나 전화번호 블라인드 인덱스가 같으면 같은 사람, 이름+회사만 같으면
+    이메일/전화번호가 서로 다르지 않을 때만 (동명이인을 합치지 않도록)
+    """
+    if any(first.get(field) and first.get(field) == second.get(field) for field in CONTACT_FIELDS):
+        return True
+    if not first.get('name') or first.get('name') != second.get('name') or first.get('company') != second.get('company'):
+        return False
+    # 여기까지 왔으면 양쪽에 모두 있는 이메일/전화번호는 서로 다른 값
+    return not any(first.get(field) and second.get(field) for field in CONTACT_FIELDS)
+
+
+def find_clusters(keys=None):
+    """블로킹 키로 찾은 후보 쌍 중 같은 사람으로 확인된 쌍만 합쳐서 _id 묶음 목록 반환"""
+    keys = keys or getattr(settings, 'CUSTOMER_DEDUP_KEYS', list(DEFAULT_KEYS))
+    parent = {}
+    # 묶음(루트)별 이메일/전화번호 값 집합: 이름+회사로만 확인된 쌍이 다른 연락처를 가진 묶음을 잇지 않도록
+    contacts = {}
+
+    def find(item):
+        root = parent.setdefault(item, item)
+        while root != parent[root]:
+            root = parent[root]
+        while item != root:
+            parent[item], item = root, parent[item]
+        return root
+
+    for key in keys:
+        for docs in candidate_groups(key):
+            for doc in docs:
+                norm = doc.get('norm') or {}
+                root = find(doc['_id'])
+                contacts.setdefault(root, {field: {norm[field]} if norm.get(field) else set() for field in CONTACT_FIELDS})
+            for index, doc in enumerate(docs):
+                for other in docs[index + 1:]:
+                    first, second = doc.get('norm') or {}, other.get('norm') or {}
+                    if not same_person(first, second):
+                        continue
+                    a, b = find(doc['_id']), find(other['_id'])
+                    if a == b:
+                        continue
+                    matched = any(first.get(field) and first.get(field) == second.get(field) for field in CONTACT_FIELDS)
+                    merged = {field: contacts[a][field] | contacts[b][field] for field in CONTACT_FIELDS}
+                    if not matched and any(len(values) > 1 for values in merged.values()):
+                        continue
+                    parent[b] = a
+                    contacts[a] = merged
+                    del contacts[b]
+
+    clusters = {}
+    for item in parent:
+        clusters.setdefault(find(item), []).append(item)
+    return [sorted(ids) for ids in clusters.values() if len(ids) > 1]
+
+
+def merge_cluster(ids):
+    """가장 먼저 저장된 문서를 남기고, 비어 있는 필드는 나머지 문서 값으로 채운 뒤 나머지 삭제
+
+    반환: 삭제한 문서 수
+    """
+    documents = list(db.customers.find({'_id': {'$in': ids}}).sort('_id', 1))
+    if len(documents) < 2:
+        return 0
+    keep, others = documents[0], documents[1:]
+    merged = {field: keep.get(field) for field in CUSTOMER_FIELDS}
+    for other in others:
+        for field in CUSTOMER_FIELDS:
+            if not merged[field] and other.get(field):
+                merged[field] = other[field]
+
+    # 유일 인덱스에 걸리지 않도록 나머지를 먼저 삭제한 뒤 남길 문서를 갱신
+    removed = db.customers.delete_many({'_id': {'$in': [other['_id'] for other in others]}}).deleted_count
+    plain = decrypt_document(dict(merged))
+    db.customers.update_one({'_id': keep['_id']}, {'$set': {
+        **merged,
+        # 이메일/전화번호는 암호화된 값을 그대로 옮기고, norm은 복호화한 값으로 다시 계산
+        'norm': index_fields(plain),
+        'search': search_tokens(plain),
+        'merged_ids': [other['_id'] for other in others] + keep.get('merged_ids', []),
+        'updated_at': timezone.now(),
+    }})
+    for other in others:
+        events.customer_deleted(other['_id'], other.get('company'), company_is_empty(other.get('company')))
+    events.customer_updated(keep['_id'], plain)
+    return removed
+
+
+def deduplicate(keys=None, dry_run=False):
+    """정규화 값 채우기 → 후보 묶음 찾기 → (dry_run이 아니면) 묶음마다 병합
+
+    정규화 값 채우기는 기존 필드를 바꾸지 않으므로 dry_run이어도 실행한다.
+    반환: {'backfilled', 'clusters', 'duplicates', 'removed'}
+    """
+    backfilled = backfill_normalized()
+    clusters = find_clusters(keys)
+    removed = 0
+    if not dry_run:
+        for ids in clusters:
+            removed += merge_cluster(ids)
+        if removed:
+            invalidate_company_facets()
+    return {
+        'backfilled': backfilled,
+        'clusters': len(clusters),
+        'duplicates': sum(len(ids) - 1 for ids in clusters),
+        'removed': removed,
+    }
@@ -0,0 +1,233 @@
+import asyncio
+import itertools
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# 고객 저장/삭제 이벤트 (대시보드가 전체 목록을 다시 받지 않고 변경분만 반영하도록 SSE로 전달)
+# - local: 이 프로세스에서 일어난 저장/삭제를 models.py 가 직접 발행 (개발/단일 프로세스용)
+# - mongo: customers 컬렉션 change stream 을 구독해서 발행 (여러 프로세스/서버에서 쓴 변경도 전달, 복제셋 필요)
+# 구독자 큐가 가득 차면 (대량 가져오기 등) 이벤트를 버리고 'resync' 를 보내서 클라이언트가 목록을 새로 받게 한다.
+EVENT_TYPES = ('insert', 'update', 'delete', 'resync')
+PUBLIC_FIELDS = ('name', 'company', 'email', 'phone')
+
+_lock = threading.Lock()
+_subscribers = set()
+# 이벤트 id는 프로세스 시작 시각(마이크로초)부터 1씩 증가: 재시작한 프로세스의 id가 항상 이전 프로세스보다 커서
+# 클라이언트가 이전 프로세스에서 받은 id로 재접속하면 보관 범위 밖이므로 resync 된다.
+_epoch = time.time_ns() // 1000
+_sequence = itertools.count(_epoch + 1)
+_backlog = deque(maxlen=getattr(settings, 'CUSTOMER_EVENTS_BACKLOG', 1000))
+_watcher = None
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+class Subscription:
+    """구독자 한 명의 이벤트 큐 (loop를 주면 asyncio 큐, 아니면 스레드 큐)"""
+
+    def __init__(self, company=None, loop=None):
+        self.company = company if company and company != "전체" else None
+        self.loop = loop
+        size = getattr(settings, 'CUSTOMER_EVENTS_QUEUE_SIZE', 256)
+        self._queue = asyncio.Queue(maxsize=size) if loop else queue.Queue(maxsize=size)
+        self.overflowed = False
+        # 구독 시점의 마지막 이벤트 id (받은 이벤트가 없어도 클라이언트가 다음 재접속 때 이어받을 위치)
+        self.start_id = 0
+
+    def _wants(self, event):
+        if self.company is None or event['type'] == 'resync':
+            return True
+        # 다른 회사로 바뀐 경우에도 목록에서 빠지도록 update는 회사와 관계없이 전달
+        return event['type'] == 'update' or event.get('company') in (None, self.company)
+
+    def _put(self, event):
+        if self.overflowed:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except (queue.Full, asyncio.QueueFull):
+            # 밀린 이벤트는 버리고 다음 읽기에서 resync 한 건만 전달
+            self.overflowed = True
+
+    def deliver(self, event):
+        if not self._wants(event):
+            return
+        if self.loop:
+            self.loop.call_soon_threadsafe(self._put, event)
+        else:
+            self._put(event)
+
+    def _next_overflow(self):
+        if self.overflowed:
+            self.overflowed = False
+            self._drain()
+            return {'id': _last_id(), 'type': 'resync'}
+        return None
+
+    def _drain(self):
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+    def get(self, timeout=None):
+        """다음 이벤트 (timeout 동안 없으면 None)"""
+        event = self._next_overflow()
+        if event:
+            return event
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return self._next_overflow()
+
+    async def aget(self, timeout=None):
+        event = self._next_overflow()
+        if event:
+            return event
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return self._next_overflow()
+
+
+def _last_id():
+    return _backlog[-1]['id'] if _backlog else _epoch
+
+
+def _can_replay(last_event_id):
+    """last_event_id 이후 이벤트를 모두 보관하고 있는지
+
+    보관 중인 가장 오래된 이벤트보다 오래됐거나 (밀려남 / 재시작 전 프로세스의 id),
+    마지막 이벤트보다 크면 (다른 프로세스의 id) 빠진 이벤트가 있을 수 있다.
+    """
+    oldest = _backlog[0]['id'] if _backlog else _epoch + 1
+    return oldest - 1 <= last_event_id <= _last_id()
+
+
+def subscribe(company=None, last_event_id=None, loop=None):
+    """구독 시작: last_event_id(재접속 시 마지막으로 받은 id) 이후의 이벤트를 먼저 채워줌
+
+    이어받을 수 없는 id(_can_replay)면 빠진 이벤트가 있으므로 resync 부터 보낸다.
+    """
+    _ensure_watcher()
+    subscription = Subscription(company, loop)
+    with _lock:
+        if len(_subscribers) >= getattr(settings, 'CUSTOMER_EVENTS_MAX_SUBSCRIBERS', 100):
+            raise TooManySubscribers()
+        subscription.start_id = _last_id()
+        if last_event_id is not None:
+            if not _can_replay(last_event_id):
+                subscription.overflowed = True
+            else:
+                for event in _backlog:
+                    if event['id'] > last_event_id:
+                        subscription._put(event)
+        _subscribers.add(subscription)
+    return subscription
+
+
+def unsubscribe(subscription):
+    with _lock:
+        _subscribers.discard(subscription)
+
+
+def subscriber_count():
+    return len(_subscribers)
+
+
+def publish(event_type, customer_id, customer=None, **fields):
+    """이벤트 하나를 모든 구독자에게 전달 (구독자가 없어도 재접속용으로 보관)"""
+    event = {'type': event_type, '_id': str(customer_id), **fields}
+    if customer is not None:
+        event['customer'] = {'_id': str(customer_id), **{
+            field: customer[field] for field in PUBLIC_FIELDS if field in customer
+        }}
+        event.setdefault('company', customer.get('company'))
+    with _lock:
+        event['id'] = next(_sequence)
+        _backlog.append(event)
+        subscribers = list(_subscribers)
+    for subscription in subscribers:
+        subscription.deliver(event)
+    return event
+
+
+def _local():
+    return getattr(settings, 'CUSTOMER_EVENTS_SOURCE', 'local') == 'local'
+
+
+# models.py / async_models.py 에서 저장/삭제 직후 호출 (평문 고객 정보 기준)
+def customer_inserted(customer):
+    if _local():
+        publish('insert', customer['_id'], customer)
+
+
+def customer_updated(customer_id, customer):
+    """customer: 갱신한 필드만 (upsert는 값이 있는 필드만 덮어씀)"""
+    if _local():
+        publish('update', customer_id, customer)
+
+
+def customer_deleted(customer_id, company=None, company_empty=False):
+    """company_empty: 삭제로 해당 회사의 고객이 하나도 남지 않음 (드롭다운에서 제거)"""
+    if _local():
+        publish('delete', customer_id, company=company, company_empty=company_empty)
+
+
+def format_sse(event):
+    """SSE 메시지 한 건 (id는 재접속 시 Last-Event-ID 헤더로 돌아옴)"""
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+
+
+# change stream 구독 (CUSTOMER_EVENTS_SOURCE='mongo')
+def _ensure_watcher():
+    global _watcher
+    if _local() or (_watcher is not None and _watcher.is_alive()):
+        return
+    with _lock:
+        if _watcher is None or not _watcher.is_alive():
+            _watcher = threading.Thread(target=_watch, name='customer-events', daemon=True)
+            _watcher.start()
+
+
+def _watch():
+    from .crypto import decrypt_document
+    from .mongo import db
+
+    resume_token = None
+    while True:
+        try:
+            with db.customers.watch(
+                [{'$match': {'operationType': {'$in': ['insert', 'update', 'replace', 'delete']}}}],
+                full_document='updateLookup',
+                resume_after=resume_token,
+            ) as stream:
+                for change in stream:
+                    resume_token = stream.resume_token
+                    _publish_change(change, decrypt_document)
+        except Exception:
+            logger.exception("Customer change stream failed, retrying")
+            # 재시도 사이에 놓친 변경이 있을 수 있으므로 구독자에게 다시 받으라고 알림
+            publish('resync', 0)
+            time.sleep(getattr(settings, 'CUSTOMER_EVENTS_RETRY_SECONDS', 5))
+
+
+def _publish_change(change, decrypt_document):
+    operation = change['operationType']
+    customer_id = change['documentKey']['_id']
+    if operation == 'delete':
+        # 삭제 이벤트에는 문서 내용이 없으므로 회사 드롭다운은 갱신하지 않음
+        publish('delete', customer_id)
+        return
+    document = change.get('fullDocument')
+    if document is None:
+        return  # updateLookup 전에 삭제됨
+    publish('insert' if operation == 'insert' else 'update', customer_id, decrypt_document(dict(document)))
@@ -0,0 +1,264 @@
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import (
+    save_customer, save_customers, create_job, claim_job, finish_job, fail_job, get_stale_jobs, heartbeat_jobs,
+    take_over_job,
+)
+from . import cache, metrics
+from .log import request_summary, stage
+
+# OCR 스택(cv2, easyocr/torch)은 작업을 처음 실행할 때 import (views → jobs 를 읽는 URLconf/관리 명령 시작을 가볍게)
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = 0
+_pending_lock = threading.Lock()
+_owner = None
+
+
+def owner_id():
+    """작업 문서에 남기는 이 프로세스의 id (PID는 재사용되므로 임의 값을 붙이고, fork 후에는 새로 만듦)"""
+    global _owner
+    if _owner is None or _owner[0] != os.getpid():
+        _owner = (os.getpid(), f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}')
+    return _owner[1]
+
+
+def get_executor():
+    """OCR 작업용 워커 스레드 풀 (처음 호출 시 생성 + 남아있는 작업 복구 + heartbeat 시작)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'OCR_JOB_WORKERS', 1),
+                    thread_name_prefix='ocr-job',
+                )
+                _recover(_executor)
+                threading.Thread(target=_heartbeat, args=(_executor,), name='ocr-job-heartbeat', daemon=True).start()
+    return _executor
+
+
+def _heartbeat(executor):
+    """OCR_JOB_HEARTBEAT_SECONDS 마다 이 프로세스의 작업에 heartbeat 를 남기고, 죽은 프로세스의 작업을 넘겨받음"""
+    while True:
+        time.sleep(getattr(settings, 'OCR_JOB_HEARTBEAT_SECONDS', 30))
+        try:
+            if _pending:
+                heartbeat_jobs(owner_id())
+            _recover(executor)
+        except Exception:
+            logger.exception("OCR job heartbeat failed")
+
+
+def _recover(executor):
+    """heartbeat 가 OCR_JOB_STALE_SECONDS 이상 끊긴 (프로세스가 죽은) queued/running 작업 처리
+
+    살아 있는 다른 프로세스의 작업은 heartbeat 가 계속 갱신되므로 건드리지 않는다.
+    넘겨받은 작업 중 디스크 경로로 받은 이미지가 이 서버에 남아 있으면 다시 실행하고, 메모리로 받은 이미지는
+    프로세스와 함께 사라졌으므로 실패 처리한다.
+    """
+    stale_before = timezone.now() - timedelta(seconds=getattr(settings, 'OCR_JOB_STALE_SECONDS', 120))
+    for job in get_stale_jobs(stale_before):
+        job = take_over_job(job['_id'], owner_id(), stale_before)
+        if job is None:
+            # 다른 프로세스가 먼저 넘겨받음
+            continue
+        if all(path and os.path.exists(path) for path in job.get('image_paths') or [None]):
+            logger.warning("Re-running OCR job %s left by a stopped process", job['_id'])
+            _dispatch(executor, job['_id'])
+        else:
+            fail_job(job['_id'], '서버 재시작으로 작업이 중단되었습니다. 다시 업로드해주세요.')
+
+
+def _dispatch(executor, job_id, sources=None):
+    global _pending
+    with _pending_lock:
+        _pending += 1
+    executor.submit(_run, job_id, sources)
+
+
+def _enqueue(kind, sources, filenames, use_cache, mode, upsert):
+    job_id = uuid.uuid4().hex
+    image_paths = [source if isinstance(source, str) else None for source in sources]
+    create_job(job_id, kind, filenames, image_paths, use_cache, mode, upsert, owner=owner_id())
+    _dispatch(get_executor(), job_id, sources)
+    return job_id
+
+
+def submit(source, filename, use_cache=True, mode=None, upsert=False):
+    """명함 이미지 한 장(bytes 또는 디스크 경로)을 작업 큐에 넣고 job id 반환
+
+    upsert=True면 이메일/전화번호가 같은 기존 고객을 새 인식 결과로 갱신한다.
+    """
+    return _enqueue('single', [source], [filename], use_cache, mode, upsert)
+
+
+def submit_batch(sources, filenames, use_cache=True, mode=None, upsert=False):
+    """여러 이미지를 하나의 일괄 작업으로 등록하고 job id 반환"""
+    return _enqueue('batch', sources, filenames, use_cache, mode, upsert)
+
+
+def queue_depth():
+    """아직 끝나지 않은(대기 + 실행 중) 작업 수"""
+    return _pending
+
+
+metrics.QUEUE_DEPTH.set_function(queue_depth)
+
+
+def _run(job_id, sources=None):
+    global _pending
+    try:
+        job = claim_job(job_id, owner_id())
+        if job is None:
+            # 이미 실행 중이거나 (이 프로세스가 멈춘 줄 알고) 다른 프로세스가 넘겨받음
+            return
+        if sources is None:
+            sources = job['image_paths']
+        try:
+            use_cache = job.get('use_cache', True)
+            mode = job.get('mode')
+            upsert = job.get('upsert', False)
+            fields = {}
+            with request_summary(job_id=job_id, kind=job['kind'], images=len(sources), mode=mode):
+                if job['kind'] == 'batch':
+                    result = _run_batch(sources, job['filenames'], use_cache, mode, upsert)
+                else:
+                    result, fields = _run_single(sources[0], use_cache, mode, upsert)
+            finish_job(job_id, result, **fields)
+        except Exception as e:
+            logger.exception("OCR job %s failed", job_id)
+            fail_job(job_id, str(e))
+        finally:
+            # 디스크로 받은 큰 업로드는 처리 후 삭제
+            for image_path in job['image_paths']:
+                if image_path and os.path.exists(image_path):
+                    os.remove(image_path)
+    finally:
+        with _pending_lock:
+            _pending -= 1
+
+
+def _run_single(source, use_cache, mode=None, upsert=False):
+    """(저장된 고객 정보, 작업 문서에 남길 값 {'action', 'ocr_stats'}) 반환"""
+    # 워커 프로세스 풀을 쓰면 OCR/파싱은 다른 프로세스에서 실행 (작업 스레드 간 GIL 경합 방지)
+    if getattr(settings, 'OCR_JOB_USE_WORKER_POOL', False):
+        from .workers import get_pool
+        recognize = get_pool().recognize
+    else:
+        from .ocr import process_business_card as recognize
+
+    ocr_stats = {}
+
+    def compute(source):
+        # 박스 통계는 캐시에 넣지 않고 작업 결과로만 남김
+        info = recognize(source, mode=mode)
+        ocr_stats.update(info.pop('ocr_stats', None) or {})
+        return info
+
+    try:
+        customer_data = cache.cached_process(source, compute, bypass=not use_cache)
+    except Exception:
+        metrics.observe_failure()
+        raise
+    metrics.observe_card(customer_data)
+    metrics.observe_boxes(ocr_stats)
+    with stage('store'):
+        customer_id, action = save_customer(customer_data, upsert=upsert)
+    customer_data.pop('norm', None)
+    customer_data['_id'] = str(customer_id)
+    return customer_data, {'action': action, 'ocr_stats': ocr_stats or None}
+
+
+def _run_batch(sources, filenames, use_cache, mode=None, upsert=False):
+    from .ocr import process_business_cards
+
+    started = time.perf_counter()
+    if use_cache and getattr(settings, 'OCR_CACHE_ENABLED', True):
+        outcomes = _process_batch_cached(sources, mode)
+    else:
+        for _ in sources:
+            cache.get_cache().note_bypass()
+        outcomes = process_business_cards(sources, mode=mode)
+
+    items = []
+    documents = []
+    saved_items = []
+    boxes_skipped = 0
+    for index, (filename, outcome) in enumerate(zip(filenames, outcomes)):
+        if isinstance(outcome, Exception):
+            metrics.observe_failure()
+            items.append({'index': index, 'filename': filename, 'status': 'failed', 'error': str(outcome)})
+        else:
+            ocr_stats = outcome.pop('ocr_stats', None)
+            metrics.observe_card(outcome)
+            metrics.observe_boxes(ocr_stats)
+            item = {'index': index, 'filename': filename, 'status': 'ok', 'customer': outcome}
+            if ocr_stats:
+                item['ocr_stats'] = ocr_stats
+                boxes_skipped += ocr_stats['boxes_skipped']
+            items.append(item)
+            documents.append(outcome)
+            saved_items.append(item)
+
+    # 성공한 명함은 기존 연락처 조회 1회 + bulk_write 1회로 저장 (각 문서에 _id가 채워짐)
+    with stage('store'):
+        actions = save_customers(documents, upsert=upsert)
+    for item, document, action in zip(saved_items, documents, actions):
+        document.pop('norm', None)
+        document['_id'] = str(document['_id'])
+        item['action'] = action
+
+    elapsed = time.perf_counter() - started
+    return {
+        'total': len(items),
+        'succeeded': len(documents),
+        'failed': len(items) - len(documents),
+        'elapsed_seconds': round(elapsed, 3),
+        'images_per_sec': round(len(items) / elapsed, 2) if elapsed else None,
+        'boxes_skipped': boxes_skipped,
+        'duplicates': actions.count('duplicate'),
+        'updated': actions.count('updated'),
+        'items': items,
+    }
+
+
+def _process_batch_cached(sources, mode=None):
+    """캐시에 있는 이미지는 건너뛰고 나머지만 묶어서 OCR"""
+    from .ocr import process_business_cards
+
+    outcomes = [None] * len(sources)
+    misses = []  # (index, key, source, fingerprint)
+    for index, source in enumerate(sources):
+        try:
+            result, key, source, fingerprint = cache.lookup(source)
+        except Exception as e:
+            outcomes[index] = e
+            continue
+        if result is None:
+            misses.append((index, key, source, fingerprint))
+        else:
+            outcomes[index] = result
+
+    computed = process_business_cards([source for _, _, source, _ in misses], mode=mode)
+    for (index, key, _, fingerprint), outcome in zip(misses, computed):
+        if not isinstance(outcome, Exception):
+            ocr_stats = outcome.pop('ocr_stats', None)
+            cache.get_cache().put(key, outcome, fingerprint)
+            if ocr_stats:
+                outcome['ocr_stats'] = ocr_stats
+        outcomes[index] = outcome
+    return outcomes
@@ -0,0 +1,109 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from .metrics import STAGE_SECONDS
+
+# 명함 처리 단계별 로거: core.decode / core.preprocess / core.ocr / core.parse / core.store
+STAGES = ('decode', 'preprocess', 'ocr', 'parse', 'store')
+
+summary_logger = logging.getLogger('core.request')
+
+_current_summary = contextvars.ContextVar('core_request_summary', default=None)
+
+# LogRecord 기본 속성 (이외의 속성은 extra로 넘긴 구조화 필드로 취급)
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def get_logger(stage):
+    return logging.getLogger(f'core.{stage}')
+
+
+class RequestSummary:
+    """요청(작업) 하나의 단계별 소요 시간 집계"""
+
+    def __init__(self, **fields):
+        self.fields = fields
+        self.timings = {}
+        self.counts = {}
+        self.started = time.perf_counter()
+
+    def add(self, stage, elapsed):
+        self.timings[stage] = self.timings.get(stage, 0.0) + elapsed
+        self.counts[stage] = self.counts.get(stage, 0) + 1
+
+    def as_dict(self):
+        return {
+            **self.fields,
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 3),
+            'stages_ms': {stage: round(elapsed * 1000, 3) for stage, elapsed in self.timings.items()},
+            'stage_calls': dict(self.counts),
+        }
+
+
+@contextmanager
+def request_summary(**fields):
+    """블록 안에서 측정된 stage() 시간을 모아 끝날 때 요약 로그 한 건으로 남김"""
+    summary = RequestSummary(**fields)
+    token = _current_summary.set(summary)
+    try:
+        yield summary
+    except Exception:
+        summary.fields['status'] = 'error'
+        raise
+    finally:
+        _current_summary.reset(token)
+        summary.fields.setdefault('status', 'ok')
+        if getattr(settings, 'CORE_LOG_REQUEST_SUMMARY', True) and summary_logger.isEnabledFor(logging.INFO):
+            summary_logger.info("request summary", extra={'summary': summary.as_dict()})
+
+
+@contextmanager
+def stage(name):
+    """단계 하나의 소요 시간 측정 (지표 + 현재 요청 요약에 합산, 해당 단계 로거로 DEBUG 기록)"""
+    logger = get_logger(name)
+    started = time.perf_counter()
+    try:
+        yield logger
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        summary = _current_summary.get()
+        if summary is not None:
+            summary.add(name, elapsed)
+        logger.debug("%s finished in %.1fms", name, elapsed * 1000)
+
+
+class JsonFormatter(logging.Formatter):
+    """로그 한 건을 JSON 한 줄로 출력 (extra로 넘긴 필드 포함)"""
+
+    def format(self, record):
+        payload = {
+            'ts': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                payload[key] = value
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class BackgroundStreamHandler(logging.handlers.QueueHandler):
+    """stdout 쓰기를 별도 스레드에서 처리해서 요청 스레드가 출력 I/O를 기다리지 않게 함"""
+
+    def __init__(self, stream=None):
+        super().__init__(queue.SimpleQueue())
+        self._listener = logging.handlers.QueueListener(self.queue, logging.StreamHandler(stream))
+        self._listener.start()
+        atexit.register(self._listener.stop)
@@ -0,0 +1,102 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.bench import StubReader, comparable, field_scores, load_corpus, peak_rss_mb, summarize
+
+SEED_LABELS = os.path.join(os.path.dirname(__file__), '..', '..', 'bench_data', 'seed.json')
+STAGES = ('decode', 'preprocess', 'ocr', 'parse')
+
+
+class Command(BaseCommand):
+    help = "정답이 있는 명함 모음으로 단계별 지연시간, 처리량(장/초), 최대 메모리, 필드별 정밀도/재현율 측정 (오프라인)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--labels', action='append', help='정답 JSON (여러 번 지정 가능, 기본: 내장 시드 명함)')
+        parser.add_argument('--backend', choices=('easyocr', 'stub'), default='easyocr',
+                            help="stub: OCR 대신 정답의 텍스트 줄(lines)을 그대로 사용")
+        parser.add_argument('--parser-only', action='store_true', help='이미지 디코딩/전처리도 생략 (stub 백엔드 전용)')
+        parser.add_argument('--mode', choices=('full', 'fast'), help='EasyOCR 인식 모드 (기본: OCR_DEFAULT_MODE)')
+        parser.add_argument('--noise', type=float, default=0.0, help='stub 백엔드 글자 오인식 확률 (0~1)')
+        parser.add_argument('--repeat', type=int, default=1, help='명함 모음을 몇 번 반복할지')
+        parser.add_argument('--errors', type=int, default=5, help='틀린 필드 예시를 몇 개까지 보여줄지')
+
+    def handle(self, *args, **options):
+        if options['parser_only'] and options['backend'] != 'stub':
+            raise CommandError("--parser-only 는 --backend stub 과 함께 써야 합니다.")
+        corpus = load_corpus(options['labels'] or [SEED_LABELS])
+        stub = options['backend'] == 'stub'
+        if stub:
+            corpus = [card for card in corpus if card.get('lines')]
+        if not options['parser_only']:
+            corpus = [card for card in corpus if os.path.exists(card['file'])]
+        if not corpus:
+            raise CommandError("측정할 명함이 없습니다 (stub 백엔드는 lines, 이미지 측정은 이미지 파일이 필요합니다).")
+
+        from core.parser import extract_info
+        if not options['parser_only']:
+            from core.ocr import load_image, preprocess_image, resolve_mode
+        if stub:
+            reader = StubReader(noise=options['noise'])
+        else:
+            from core import startup
+            from core.ocr import extract_texts_two_phase, extract_texts_with_boxes
+            mode = resolve_mode(options['mode'])
+            # 모델 로드/첫 추론 시간은 처리량에서 뺌
+            startup.warm_up()
+
+        samples = {stage: [] for stage in STAGES}
+        predictions = {}
+        started = time.perf_counter()
+        for _ in range(options['repeat']):
+            for card in corpus:
+                img = None
+                if not options['parser_only']:
+                    tick = time.perf_counter()
+                    img = load_image(card['file'])
+                    samples['decode'].append(time.perf_counter() - tick)
+                    tick = time.perf_counter()
+                    img = preprocess_image(img)
+                    samples['preprocess'].append(time.perf_counter() - tick)
+
+                tick = time.perf_counter()
+                if stub:
+                    results = reader.readtext(card['lines'])
+                elif mode == 'fast':
+                    results, _ = extract_texts_two_phase(img)
+                else:
+                    results = extract_texts_with_boxes(img)
+                samples['ocr'].append(time.perf_counter() - tick)
+
+                tick = time.perf_counter()
+                predictions[card['file']] = extract_info(results)
+                samples['parse'].append(time.perf_counter() - tick)
+        elapsed = time.perf_counter() - started
+
+        labels = {card['file']: {field: card[field] for field in ('name', 'phone', 'email', 'company') if field in card}
+                  for card in corpus}
+        cards = len(corpus) * options['repeat']
+        report = {
+            'backend': options['backend'] if stub else f"easyocr/{mode}",
+            'cards': cards,
+            'seconds': round(elapsed, 3),
+            'cards_per_sec': round(cards / elapsed, 2) if elapsed else None,
+            'peak_rss_mb': peak_rss_mb(),
+            'stages': {stage: summarize(values) for stage, values in samples.items() if values},
+            'fields': field_scores(predictions, labels),
+            'errors': _errors(predictions, labels, options['errors']),
+        }
+        self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+def _errors(predictions, labels, limit):
+    """정답과 다르게 추출된 필드 예시 (어떤 명함에서 틀리는지 바로 볼 수 있게)"""
+    errors = []
+    for key, label in labels.items():
+        for field, expected in label.items():
+            predicted = predictions[key].get(field)
+            if comparable(field, predicted) != comparable(field, expected) and len(errors) < limit:
+                errors.append({'file': os.path.basename(key), 'field': field, 'expected': expected, 'predicted': predicted})
+    return errors
@@ -0,0 +1,40 @@
+import json
+import random
+
+from django.core.management.base import BaseCommand
+
+from core.bench import summarize, timed
+from core.parser import extract_info
+
+SAMPLE_CARDS = [
+    ['(주)한빛소프트', '홍길동', 'Gildong Hong', '영업팀 과장', '010-1234-5678', 'gildong@hanbit.co.kr', '서울특별시 강남구 테헤란로 123'],
+    ['주식회사 가나다', '이름: 김철수', 'Tel 02-123-4567', 'Fax 02-123-4568', 'cs.kim@ganada.com'],
+    ['ABC Inc', 'John Smith', 'Sales Manager', '010-9876-5432', 'john.smith@abc-inc.com', 'www.abc-inc.com'],
+    ['대표이사', '박영희 Park', '유한회사 테스트', '031-555-1234', 'park@test.kr', '경기도 성남시 분당구'],
+]
+
+
+class Command(BaseCommand):
+    help = "extract_info(필드 파싱) 명함 1장당 처리 시간 측정"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cards', type=int, default=10000, help='측정할 명함 수')
+        parser.add_argument('--results', help='OCR 줄 목록의 목록이 담긴 JSON 파일 (없으면 내장 샘플 사용)')
+
+    def handle(self, *args, **options):
+        if options['results']:
+            with open(options['results'], encoding='utf-8') as f:
+                cards = json.load(f)
+        else:
+            cards = SAMPLE_CARDS
+        # readtext 결과와 같은 (box, text, confidence) 형태로 변환
+        samples_input = [[(None, text, 1.0) for text in random.choice(cards)] for _ in range(options['cards'])]
+
+        samples = []
+        for results in samples_input:
+            _, elapsed = timed(extract_info, results)
+            samples.extend(elapsed)
+
+        report = summarize(samples)
+        report['cards_per_sec'] = round(len(samples) / sum(samples), 1)
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,40 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core.bench import collect_images, load_labels, summarize, timed, field_accuracy
+from core.ocr import load_image, preprocess_image, extract_texts_with_boxes, extract_info
+
+
+class Command(BaseCommand):
+    help = "명함 영역 검출/축소 전처리 전후의 지연시간과 (선택) 필드 정확도 비교"
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='명함 이미지 파일 또는 디렉터리')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--labels', help='{파일명: {name, phone, email, company}} 정답 JSON')
+        parser.add_argument('--ocr', action='store_true', help='OCR까지 실행해서 지연시간/정확도 측정')
+
+    def handle(self, *args, **options):
+        images = collect_images(options['paths'])
+        labels = load_labels(options['labels'])
+        report = {}
+        for mode, normalize in (('full_resolution', False), ('card_normalized', True)):
+            preprocess_samples, ocr_samples, predictions = [], [], {}
+            for path in images:
+                img = load_image(path)
+                processed, samples = timed(preprocess_image, img, normalize=normalize, repeat=options['repeat'])
+                preprocess_samples.extend(samples)
+                if options['ocr']:
+                    results, samples = timed(extract_texts_with_boxes, processed)
+                    ocr_samples.extend(samples)
+                    predictions[path] = extract_info(results)
+            report[mode] = {
+                'images': len(images),
+                'preprocess': summarize(preprocess_samples),
+            }
+            if options['ocr']:
+                report[mode]['ocr'] = summarize(ocr_samples)
+                report[mode]['field_accuracy'] = field_accuracy(predictions, labels)
+
+        self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
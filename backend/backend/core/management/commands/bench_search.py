@@ -0,0 +1,76 @@
+import json
+import random
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from pymongo import ASCENDING, TEXT
+
+from core.bench import summarize, timed
+from core.models import CUSTOMER_FIELDS, stored_document
+from core.mongo import db
+from core.normalize import annotate
+from core.search import search_customers
+from core.synthetic import generate_cards
+
+
+class Command(BaseCommand):
+    help = "고객 검색 지연시간 측정 (가상 고객을 임시 컬렉션에 저장하고 이름 일부/회사명/전화번호 뒷자리로 검색, 끝나면 컬렉션 삭제)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=100000, help='저장할 가상 고객 수')
+        parser.add_argument('--queries', type=int, default=200, help='종류별 검색 횟수')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000, help='insert_many 한 번에 저장하는 건수')
+        parser.add_argument('--collection', default='bench_search_customers', help='임시 컬렉션 이름 (측정 후 삭제)')
+        parser.add_argument('--keep', action='store_true', help='측정 후 임시 컬렉션을 지우지 않음 (다시 측정할 때 저장 생략)')
+
+    def handle(self, *args, **options):
+        collection = db[options['collection']]
+        cards = generate_cards(options['customers'], seed=options['seed'])
+        report = {'customers': len(cards)}
+
+        if collection.estimated_document_count() < len(cards):
+            collection.drop()
+            started = time.perf_counter()
+            for start in range(0, len(cards), options['batch_size']):
+                batch = cards[start:start + options['batch_size']]
+                collection.insert_many(
+                    [stored_document(annotate({field: card[field] for field in CUSTOMER_FIELDS}))
+                     for card in batch],
+                    ordered=False,
+                )
+            report['insert_sec'] = round(time.perf_counter() - started, 2)
+        # ensure_indexes 와 같은 인덱스
+        if getattr(settings, 'SEARCH_ENGINE', 'tokens') == 'text':
+            collection.create_index([('search', TEXT)], name='search_text', default_language='none')
+        else:
+            collection.create_index([('search', ASCENDING), ('_id', ASCENDING)], name='search_tokens')
+
+        rng = random.Random(options['seed'])
+        queries = {
+            # 이름 전체 / 이름 앞 두 글자 (성 + 이름 첫 글자) / 회사명 (표기 그대로) / 휴대폰 뒷자리 4자리
+            'full_name': lambda card: card['name'],
+            'name_prefix': lambda card: card['name'][:2],
+            'company': lambda card: card['company'],
+            'phone_suffix': lambda card: card['phone'][-4:],
+        }
+        try:
+            for kind, make_query in queries.items():
+                samples = []
+                hits = truncated = 0
+                for card in rng.sample(cards, min(options['queries'], len(cards))):
+                    (results, capped), elapsed = timed(search_customers, collection, make_query(card))
+                    samples.extend(elapsed)
+                    hits += any(result['phone'] == card['phone'] for result in results)
+                    truncated += capped
+                report[kind] = {
+                    **summarize(samples),
+                    'found_in_first_page': round(hits / len(samples), 3),
+                    # SEARCH_MAX_CANDIDATES 를 넘어 일부 후보만으로 순위를 매긴 비율
+                    'truncated': round(truncated / len(samples), 3),
+                }
+        finally:
+            if not options['keep']:
+                collection.drop()
+        self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
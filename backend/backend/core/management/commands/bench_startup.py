@@ -0,0 +1,67 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.bench import summarize
+
+HEAVY_MODULES = ('numpy', 'cv2', 'torch', 'easyocr')
+
+# 새 프로세스에서 실행: Django 설정 → URLconf 로드 → (선택) OCR 워밍업 단계별 시간을 JSON으로 출력
+PROBE = '''
+import json, os, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+urlconf_done = time.perf_counter()
+result = {
+    'django_setup': setup_done - started,
+    'urlconf': urlconf_done - setup_done,
+    'heavy_modules_at_urlconf': [name for name in %(heavy)r if name in sys.modules],
+}
+if %(warmup)r:
+    from core import startup
+    started = time.perf_counter()
+    startup.warm_up()
+    result['warmup'] = time.perf_counter() - started
+    result['warmup_phases'] = startup.timings
+print(json.dumps(result))
+'''
+
+
+class Command(BaseCommand):
+    help = "서버 프로세스 시작 시간 측정 (Django 설정, URLconf 로드, 선택적으로 OCR 워밍업)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='새 프로세스를 띄워 측정할 횟수')
+        parser.add_argument('--warmup', action='store_true', help='OCR 모델 로드 + 첫 추론까지 측정')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE, OCR_PRELOAD='0', MONGO_ENSURE_INDEXES='0')
+        probe = PROBE % {'heavy': HEAVY_MODULES, 'warmup': options['warmup']}
+        samples = {'process_total': [], 'django_setup': [], 'urlconf': [], 'warmup': []}
+        heavy = set()
+        for _ in range(options['repeat']):
+            started = time.perf_counter()
+            completed = subprocess.run(
+                [sys.executable, '-c', probe], env=env, cwd=settings.BASE_DIR, capture_output=True, text=True,
+            )
+            samples['process_total'].append(time.perf_counter() - started)
+            if completed.returncode != 0:
+                raise CommandError(completed.stderr.strip().splitlines()[-1] if completed.stderr else '측정 프로세스 실패')
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            for key in ('django_setup', 'urlconf', 'warmup'):
+                if key in result:
+                    samples[key].append(result[key])
+            heavy.update(result['heavy_modules_at_urlconf'])
+
+        report = {key: summarize(values) for key, values in samples.items() if values}
+        report['heavy_modules_at_urlconf'] = sorted(heavy)
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,65 @@
+import json
+import os
+import time
+from concurrent.futures import wait
+
+from django.core.management.base import BaseCommand
+
+from core.bench import collect_images
+from core.workers import create_pool
+
+
+def _worker_counts(max_workers):
+    counts, n = [], 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    counts.append(max_workers)
+    return counts
+
+
+class Command(BaseCommand):
+    help = "OCR 워커 프로세스 수(1 → N)에 따른 처리량(장/초) 측정"
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='명함 이미지 파일 또는 디렉터리')
+        parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--threads', type=int, default=0, help='워커당 스레드 수 (0이면 코어 수 / 워커 수)')
+        parser.add_argument('--repeat', type=int, default=4, help='이미지 목록을 몇 번 반복해서 넣을지')
+
+    def handle(self, *args, **options):
+        images = []
+        for path in collect_images(options['paths']):
+            with open(path, 'rb') as f:
+                images.append(f.read())
+        sources = images * options['repeat']
+
+        report = []
+        baseline = None
+        for workers in _worker_counts(options['max_workers']):
+            pool = create_pool(workers=workers, threads_per_worker=options['threads'] or None)
+            try:
+                # 모델 로드 시간은 빼고 처리량만 측정
+                pool.warmup()
+                started = time.perf_counter()
+                futures = [pool.submit(source, check_capacity=False) for source in sources]
+                wait(futures)
+                elapsed = time.perf_counter() - started
+            finally:
+                pool.shutdown()
+
+            failed = sum(1 for future in futures if future.exception() is not None)
+            throughput = len(sources) / elapsed
+            baseline = baseline or throughput
+            report.append({
+                'workers': workers,
+                'threads_per_worker': pool.threads_per_worker,
+                'cards': len(sources),
+                'failed': failed,
+                'seconds': round(elapsed, 3),
+                'cards_per_sec': round(throughput, 2),
+                'speedup': round(throughput / baseline, 2),
+                'efficiency': round(throughput / baseline / workers, 2),
+            })
+
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,25 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.dedup import BLOCKING_KEYS, deduplicate
+from core.models import ensure_indexes
+
+
+class Command(BaseCommand):
+    help = "정규화한 이메일/전화번호/이름+회사가 같은 고객 문서를 하나로 병합 (병합 후 유일 인덱스 생성)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keys', help=f"블로킹 키 (쉼표 구분: {', '.join(BLOCKING_KEYS)}, 기본: CUSTOMER_DEDUP_KEYS)")
+        parser.add_argument('--dry-run', action='store_true', help='병합하지 않고 중복 후보 수만 출력')
+
+    def handle(self, *args, **options):
+        keys = options['keys'].split(',') if options['keys'] else None
+        unknown = set(keys or ()) - set(BLOCKING_KEYS)
+        if unknown:
+            raise CommandError(f"알 수 없는 블로킹 키: {', '.join(sorted(unknown))}")
+
+        result = deduplicate(keys, dry_run=options['dry_run'])
+        if not options['dry_run']:
+            ensure_indexes()
+        self.stdout.write(json.dumps(result, ensure_ascii=False))
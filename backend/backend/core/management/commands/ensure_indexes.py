@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.models import ensure_indexes
+
+
+class Command(BaseCommand):
+    help = "고객/작업/캐시 컬렉션의 Mongo 인덱스 생성"
+
+    def handle(self, *args, **options):
+        ensure_indexes()
+        self.stdout.write(self.style.SUCCESS("Mongo 인덱스를 확인했습니다."))
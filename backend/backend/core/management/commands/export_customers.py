@@ -0,0 +1,29 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.transfer import FORMATS, export_rows, format_from_filename
+
+
+class Command(BaseCommand):
+    help = "고객 정보를 CSV / JSONL / vCard 파일로 내보내기 (페이지 단위로 읽어서 바로 기록)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', nargs='?', default='-', help="출력 파일 경로 ('-'이면 표준 출력)")
+        parser.add_argument('--format', choices=FORMATS, help='출력 형식 (없으면 파일 확장자로 판단)')
+        parser.add_argument('--company', help='회사명 필터')
+
+    def handle(self, *args, **options):
+        output = options['output']
+        export_format = options['format'] or format_from_filename(output, default='csv' if output == '-' else None)
+        if export_format is None:
+            raise CommandError("--format 을 지정하거나 .csv/.jsonl/.vcf 확장자를 사용해주세요.")
+
+        if output == '-':
+            for chunk in export_rows(export_format, options['company']):
+                sys.stdout.write(chunk)
+            return
+        with open(output, 'w', encoding='utf-8', newline='') as f:
+            for chunk in export_rows(export_format, options['company']):
+                f.write(chunk)
+        self.stderr.write(self.style.SUCCESS(f"{output} 에 내보냈습니다."))
@@ -0,0 +1,23 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.transfer import FORMATS, format_from_filename, import_records, parse_records
+
+
+class Command(BaseCommand):
+    help = "CSV / JSONL / vCard 파일에서 고객 정보 가져오기 (정규화한 이메일/전화번호 중복은 건너뜀)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='가져올 파일 경로')
+        parser.add_argument('--format', choices=FORMATS, help='입력 형식 (없으면 파일 확장자로 판단)')
+        parser.add_argument('--batch-size', type=int, help='한 번에 저장할 건수')
+        parser.add_argument('--upsert', action='store_true', help='이메일/전화번호가 같은 기존 고객을 갱신')
+
+    def handle(self, *args, **options):
+        import_format = options['format'] or format_from_filename(options['path'])
+        if import_format is None:
+            raise CommandError("--format 을 지정하거나 .csv/.jsonl/.vcf 확장자를 사용해주세요.")
+        with open(options['path'], 'rb') as f:
+            result = import_records(parse_records(f, import_format), batch_size=options['batch_size'], upsert=options['upsert'])
+        self.stdout.write(json.dumps(result, ensure_ascii=False))
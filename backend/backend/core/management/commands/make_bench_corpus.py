@@ -0,0 +1,39 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.synthetic import find_font, generate_cards, render_card
+
+
+class Command(BaseCommand):
+    help = "벤치마크용 가상 명함 이미지 + 정답 JSON(labels.json) 생성"
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='명함 이미지와 labels.json 을 저장할 디렉터리')
+        parser.add_argument('--count', type=int, default=100)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--languages', default='ko,en', help='만들 명함 언어 (ko, en)')
+        parser.add_argument('--font', help='한글 글꼴 파일 (없으면 자주 쓰이는 위치에서 찾음)')
+        parser.add_argument('--no-images', action='store_true', help='이미지 없이 정답/텍스트 줄만 생성 (파서 전용 측정)')
+
+    def handle(self, *args, **options):
+        languages = tuple(options['languages'].split(','))
+        font = None
+        if not options['no_images']:
+            font = find_font(options['font'])
+            if font is None and 'ko' in languages:
+                raise CommandError("한글 명함을 그릴 글꼴이 없습니다. --font 로 지정하거나 --languages en 을 사용하세요.")
+
+        os.makedirs(options['output'], exist_ok=True)
+        labels = {}
+        for index, card in enumerate(generate_cards(options['count'], seed=options['seed'], languages=languages)):
+            filename = f'card_{index:05d}.png'
+            if not options['no_images']:
+                with open(os.path.join(options['output'], filename), 'wb') as f:
+                    f.write(render_card(card['lines'], font_path=font, seed=options['seed'] + index))
+            labels[filename] = card
+
+        with open(os.path.join(options['output'], 'labels.json'), 'w', encoding='utf-8') as f:
+            json.dump(labels, f, ensure_ascii=False, indent=2)
+        self.stdout.write(f"{len(labels)}장 생성: {options['output']}")
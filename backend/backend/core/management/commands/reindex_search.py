@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.models import ensure_indexes, reindex_search
+
+
+class Command(BaseCommand):
+    help = "고객 검색 토큰(search 필드)을 다시 계산 (검색 도입 전에 저장된 고객, 토큰 규칙을 바꾼 뒤 실행)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--missing-only', action='store_true', help='search 필드가 없는 문서만 계산')
+        parser.add_argument('--batch-size', type=int, default=1000, help='bulk_write 한 번에 갱신할 문서 수')
+
+    def handle(self, *args, **options):
+        ensure_indexes()
+        updated = reindex_search(batch_size=options['batch_size'], missing_only=options['missing_only'])
+        self.stdout.write(self.style.SUCCESS(f"{updated}건의 검색 토큰을 갱신했습니다."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.models import rotate_customer_keys
+
+
+class Command(BaseCommand):
+    help = "고객 개인정보를 FIELD_ENCRYPTION_KEYS 첫 번째 키로 다시 암호화하고 블라인드 인덱스를 다시 계산"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='bulk_write 한 번에 갱신할 문서 수')
+
+    def handle(self, *args, **options):
+        updated = rotate_customer_keys(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{updated}건을 현재 키로 다시 암호화했습니다. 이제 이전 키를 제거해도 됩니다."))
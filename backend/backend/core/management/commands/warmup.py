@@ -0,0 +1,16 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import startup
+
+
+class Command(BaseCommand):
+    help = "OCR 모델 로드 + 더미 추론을 미리 실행 (컨테이너 시작 전 단계 등에서 모델 다운로드/캐시 확인용)"
+
+    def handle(self, *args, **options):
+        try:
+            timings = startup.warm_up()
+        except Exception as e:
+            raise CommandError(f"OCR 워밍업 실패: {e}")
+        self.stdout.write(json.dumps(timings, indent=2))
@@ -0,0 +1,196 @@
+import bisect
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry = []
+_registry_lock = threading.Lock()
+
+
+def _register(metric):
+    with _registry_lock:
+        _registry.append(metric)
+    return metric
+
+
+def _label_key(labelnames, labels):
+    return tuple(str(labels.get(name, '')) for name in labelnames)
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames, key, extra=()):
+    pairs = list(zip(labelnames, key)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """단조 증가 카운터"""
+    type = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _register(self)
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in values.items():
+            yield self.name, key, (), value
+
+
+class Gauge(Counter):
+    """현재 값 (직접 set하거나 조회 시점에 함수로 계산)"""
+    type = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        super().__init__(name, documentation, labelnames)
+        self._function = function
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[_label_key(self.labelnames, labels)] = value
+
+    def set_function(self, function):
+        """function() -> 숫자, 또는 [(labels dict, 값), ...]"""
+        self._function = function
+
+    def samples(self):
+        if self._function is None:
+            yield from super().samples()
+            return
+        value = self._function()
+        if isinstance(value, (int, float)):
+            yield self.name, (), (), value
+            return
+        for labels, sample in value:
+            yield self.name, _label_key(self.labelnames, labels), (), sample
+
+
+class Histogram:
+    """누적 버킷 히스토그램 (p95 등은 Prometheus에서 histogram_quantile로 계산)"""
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        _register(self)
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+        for key, series in snapshot.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f'{self.name}_bucket', key, (('le', _format_value(float(bound))),), cumulative
+            yield f'{self.name}_bucket', key, (('le', '+Inf'),), series[-1]
+            yield f'{self.name}_sum', key, (), series[-2]
+            yield f'{self.name}_count', key, (), series[-1]
+
+
+def render():
+    """등록된 모든 지표를 Prometheus 텍스트 형식(0.0.4)으로 출력"""
+    lines = []
+    with _registry_lock:
+        metrics = list(_registry)
+    for metric in metrics:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.type}')
+        for name, key, extra, value in metric.samples():
+            lines.append(f'{name}{_format_labels(metric.labelnames, key, extra)} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+# === 명함 처리 지표 ===
+STAGE_SECONDS = Histogram(
+    'business_card_stage_seconds', '명함 처리 단계별 소요 시간(초)', ['stage'],
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    'business_card_http_request_seconds', 'API 요청 처리 시간(초)', ['route', 'method', 'status'],
+)
+CARDS_PROCESSED = Counter(
+    'business_card_cards_processed_total', '처리한 명함 수', ['result'],
+)
+FIELDS_MISSING = Counter(
+    'business_card_fields_missing_total', '인식하지 못한 필드 수', ['field'],
+)
+OCR_FAILURES = Counter(
+    'business_card_ocr_failures_total', 'OCR/파싱 단계에서 실패한 명함 수',
+)
+QUEUE_DEPTH = Gauge(
+    'business_card_job_queue_depth', '대기 중이거나 실행 중인 OCR 작업 수',
+)
+WORKER_PENDING = Gauge(
+    'business_card_ocr_worker_pending', 'OCR 워커 프로세스 풀에서 실행 중이거나 대기 중인 이미지 수',
+)
+CACHE_LOOKUPS = Counter(
+    'business_card_ocr_cache_lookups_total', 'OCR 결과 캐시 조회 수', ['result'],
+)
+OCR_BOXES = Counter(
+    'business_card_ocr_boxes_total', '2단계(fast) 인식에서 인식하거나 건너뛴 글자 박스 수', ['result'],
+)
+STARTUP_SECONDS = Gauge(
+    'business_card_startup_seconds', '프로세스 시작 후 단계별 소요 시간(초)', ['phase'],
+)
+READER_POOL = Gauge(
+    'business_card_ocr_reader_pool', 'EasyOCR Reader 풀 상태', ['languages', 'stat'],
+)
+
+
+def observe_card(info):
+    """파싱 결과 하나를 집계 (빠진 필드 포함)"""
+    CARDS_PROCESSED.inc(result='ok')
+    for field in ('name', 'phone', 'email', 'company'):
+        if not info.get(field):
+            FIELDS_MISSING.inc(field=field)
+
+
+def observe_boxes(ocr_stats):
+    """fast 모드 결과의 박스 통계 집계"""
+    if ocr_stats:
+        OCR_BOXES.inc(ocr_stats['boxes_recognized'], result='recognized')
+        OCR_BOXES.inc(ocr_stats['boxes_skipped'], result='skipped')
+
+
+def observe_failure():
+    CARDS_PROCESSED.inc(result='failed')
+    OCR_FAILURES.inc()
@@ -0,0 +1,42 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .metrics import HTTP_REQUEST_SECONDS
+
+
+class RequestMetricsMiddleware:
+    """API 요청별 처리 시간을 URL 패턴(route) 기준으로 집계
+
+    ASGI에서 비동기 뷰가 스레드로 바뀌어 실행되지 않도록 동기/비동기 모두 지원
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self._observe(request, response, started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self._observe(request, response, started)
+        return response
+
+    def _observe(self, request, response, started):
+        match = getattr(request, 'resolver_match', None)
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            route=match.route if match else 'unmatched',
+            method=request.method,
+            status=response.status_code,
+        )
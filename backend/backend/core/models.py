@@ -1,19 +1,438 @@
+import threading
+import time
+
+from . import events
+from .log import get_logger
 from .mongo import db
+from .crypto import ENCRYPTED_FIELDS, decrypt_documents, encrypt, encrypt_document, iter_decrypted, rotate
+from .normalize import annotate, email_key, index_fields, match_query, phone_key
+from . import search
+from .search import search_tokens
 from bson import ObjectId
+from django.conf import settings
+from django.utils import timezone
+from pymongo import ASCENDING, DESCENDING, TEXT, InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+
+logger = get_logger('store')
+
+def ensure_indexes():
+    """조회/필터에 쓰는 인덱스 생성 (이미 있으면 아무 일도 하지 않음)"""
+    # 회사 필터 + _id 기준 페이지네이션을 인덱스 하나로 처리
+    db.customers.create_index([('company', ASCENDING), ('_id', ASCENDING)], name='company_id')
+    # email/phone 원문은 암호화되어 저장되므로 검색은 norm.email / norm.phone(블라인드 인덱스)로 한다
+    db.customers.create_index([('created_at', DESCENDING)], name='created_at')
+    # 중복 연락처 판별: 정규화된 이메일/전화번호는 유일, 이름+회사는 dedup 작업의 블로킹 키
+    db.customers.create_index([('norm.name', ASCENDING), ('norm.company', ASCENDING)], name='norm_name_company')
+    for field in ('email', 'phone'):
+        try:
+            db.customers.create_index(
+                [(f'norm.{field}', ASCENDING)], name=f'norm_{field}', unique=True,
+                partialFilterExpression={f'norm.{field}': {'$type': 'string'}},
+            )
+        except (DuplicateKeyError, OperationFailure) as e:
+            # 이미 중복 문서가 있으면 유일 인덱스를 만들 수 없음
+            logger.warning("norm_%s 유일 인덱스 생성 실패 (manage.py dedup_customers 실행 필요): %s", field, e)
+    # 검색 토큰 (search.py): 토큰 배열 멀티키 인덱스, SEARCH_ENGINE='text'면 같은 배열에 텍스트 인덱스
+    if getattr(settings, 'SEARCH_ENGINE', 'tokens') == 'text':
+        db.customers.create_index([('search', TEXT)], name='search_text', default_language='none')
+    else:
+        db.customers.create_index([('search', ASCENDING), ('_id', ASCENDING)], name='search_tokens')
+    db.ocr_jobs.create_index([('status', ASCENDING), ('heartbeat_at', ASCENDING)], name='status_heartbeat_at')
+    db.ocr_cache.create_index([('phash', ASCENDING)], name='phash', sparse=True)
+
+def stored_document(document):
+    """저장용 사본: 개인정보 필드 암호화 + 검색 토큰 (평문 document 기준)"""
+    stored = encrypt_document(document)
+    stored['search'] = search_tokens(document)
+    return stored
 
 def insert_customer(data):
-    result = db.customers.insert_one(data)
-    print(f"[insert_customer] Inserted ID: {result.inserted_id}, Data: {data}")
+    """data(평문)에 norm/_id를 채우고, 개인정보 필드는 암호화한 사본을 저장"""
+    annotate(data)
+    data.setdefault('created_at', timezone.now())
+    result = db.customers.insert_one(stored_document(data))
+    data['_id'] = result.inserted_id
+    invalidate_company_facets()
+    events.customer_inserted(data)
+    logger.debug("Inserted customer %s", result.inserted_id)
     return result
 
+def insert_customers(documents):
+    """여러 고객 정보를 한 번의 insert_many로 저장 (ordered=False: 일부 실패해도 나머지 저장)"""
+    if not documents:
+        return []
+    now = timezone.now()
+    for document in documents:
+        annotate(document)
+        document.setdefault('created_at', now)
+    result = db.customers.insert_many([stored_document(document) for document in documents], ordered=False)
+    for document, inserted_id in zip(documents, result.inserted_ids):
+        document['_id'] = inserted_id
+        events.customer_inserted(document)
+    invalidate_company_facets()
+    logger.debug("Inserted %d customers", len(result.inserted_ids))
+    return result.inserted_ids
+
+CUSTOMER_FIELDS = ('name', 'company', 'email', 'phone')
+
+def changed_fields(data):
+    """upsert로 덮어쓰는 (값이 있는) 필드만 평문으로 (변경 이벤트용)"""
+    return {field: data[field] for field in CUSTOMER_FIELDS if data.get(field)}
+
+def customer_update(data, existing):
+    """upsert 시 덮어쓸 필드: 새로 인식된 값이 있는 필드만 (정규화 값 포함, 개인정보는 암호화)
+
+    existing: 갱신할 기존 문서 (복호화된 평문), 검색 토큰은 합친 결과로 다시 계산
+    """
+    fields = {'updated_at': timezone.now()}
+    for field in CUSTOMER_FIELDS:
+        if data.get(field):
+            fields[field] = encrypt(data[field]) if field in ENCRYPTED_FIELDS else data[field]
+            fields[f'norm.{field}'] = data['norm'][field]
+    fields['search'] = search_tokens({**existing, **changed_fields(data)})
+    return fields
+
+CUSTOMER_PROJECTION = {field: 1 for field in CUSTOMER_FIELDS}
+
+def save_customer(data, upsert=False):
+    """정규화된 이메일/전화번호가 같은 고객이 있으면 upsert=True일 때 그 문서를 갱신하고,
+    아니면 저장하지 않음. 반환: (고객 _id, 'inserted' | 'updated' | 'duplicate')
+    """
+    annotate(data)
+    query = match_query(data['norm'])
+    if query is not None:
+        existing = db.customers.find_one(query, CUSTOMER_PROJECTION)
+        if existing is not None:
+            if not upsert:
+                return existing['_id'], 'duplicate'
+            existing = decrypt_documents([existing])[0]
+            db.customers.update_one({'_id': existing['_id']}, {'$set': customer_update(data, existing)})
+            invalidate_company_facets()
+            events.customer_updated(existing['_id'], changed_fields(data))
+            return existing['_id'], 'updated'
+    try:
+        return insert_customer(data).inserted_id, 'inserted'
+    except DuplicateKeyError:
+        # 조회와 저장 사이에 다른 요청이 같은 연락처를 저장한 경우
+        data.pop('_id', None)
+        return save_customer(data, upsert)
+
+def save_customers(documents, upsert=False):
+    """save_customer의 일괄 버전: 기존 문서 조회 1회 + bulk_write 1회 (파일/배치 안의 중복도 처리)
+
+    각 문서의 _id를 채우고, 문서별 'inserted' | 'updated' | 'duplicate' 목록을 반환
+    """
+    if not documents:
+        return []
+    for document in documents:
+        annotate(document)
+    known = {'email': {}, 'phone': {}}  # 블라인드 인덱스 -> _id
+    existing_documents = {}  # _id -> 기존 문서 (upsert 시 검색 토큰 계산용)
+    conditions = [
+        {f'norm.{field}': {'$in': values}} for field, values in (
+            (field, list({d['norm'][field] for d in documents if d['norm'][field]})) for field in known
+        ) if values
+    ]
+    if conditions:
+        projection = {'norm.email': 1, 'norm.phone': 1, **(CUSTOMER_PROJECTION if upsert else {})}
+        for existing in db.customers.find({'$or': conditions}, projection):
+            existing_documents[existing['_id']] = existing
+            for field in known:
+                value = (existing.get('norm') or {}).get(field)
+                if value:
+                    known[field][value] = existing['_id']
+        if upsert:
+            decrypt_documents(list(existing_documents.values()))
+
+    now = timezone.now()
+    actions = []
+    operations = []  # (문서 index, 연산)
+    pending = {}  # 이번 배치에서 새로 저장할 문서 _id -> 문서
+    for index, document in enumerate(documents):
+        norm = document['norm']
+        match = known['email'].get(norm['email']) or known['phone'].get(norm['phone'])
+        if match is not None:
+            document['_id'] = match
+            if not upsert:
+                actions.append('duplicate')
+            elif match in pending:
+                # 순서 없는 bulk_write에서는 같은 배치의 insert보다 update가 먼저 실행될 수 있으므로
+                # 아직 저장 전인 문서에 직접 반영
+                pending[match].update({field: document[field] for field in CUSTOMER_FIELDS if document.get(field)})
+                annotate(pending[match])
+                actions.append('updated')
+            else:
+                existing = existing_documents[match]
+                operations.append((index, UpdateOne({'_id': match}, {'$set': customer_update(document, existing)})))
+                # 같은 기존 문서를 다시 갱신하면 이번 갱신 결과를 기준으로
+                existing.update(changed_fields(document))
+                actions.append('updated')
+            continue
+        document.setdefault('created_at', now)
+        document['_id'] = ObjectId()
+        pending[document['_id']] = document
+        for field in known:
+            if norm[field]:
+                known[field][norm[field]] = document['_id']
+        operations.append((index, None))
+        actions.append('inserted')
+
+    if operations:
+        # 같은 배치의 갱신이 모두 반영된 뒤에 암호화한 사본으로 insert
+        requests = [
+            operation or InsertOne(stored_document(documents[index])) for index, operation in operations
+        ]
+        try:
+            db.customers.bulk_write(requests, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get('writeErrors', [])
+            if any(error.get('code') != 11000 for error in errors):
+                raise
+            # 동시에 저장된 같은 연락처: 이번 배치에서는 저장하지 않은 것으로 처리
+            for error in errors:
+                actions[operations[error['index']][0]] = 'duplicate'
+        invalidate_company_facets()
+        for index, operation in operations:
+            if actions[index] == 'duplicate':
+                continue
+            document = documents[index]
+            if operation is None:
+                events.customer_inserted(document)
+            else:
+                events.customer_updated(document['_id'], changed_fields(document))
+    logger.debug("Saved %d customers (%s)", len(documents), upsert and 'upsert' or 'insert')
+    return actions
+
+def rotate_customer_keys(batch_size=1000):
+    """모든 고객의 개인정보 필드를 현재 키로 다시 암호화하고 블라인드 인덱스를 다시 계산
+
+    (암호화 도입 전에 평문으로 저장된 문서도 이때 암호화된다) 갱신한 문서 수 반환
+    """
+    updated = 0
+    operations = []
+    projection = {field: 1 for field in CUSTOMER_FIELDS}
+    for customer in db.customers.find({}, projection).sort('_id', 1).batch_size(batch_size):
+        changes = {field: rotate(customer[field]) for field in ENCRYPTED_FIELDS if customer.get(field)}
+        plain = decrypt_documents([dict(customer)])[0]
+        # 블라인드 인덱스 키가 바뀌었을 수 있으므로 정규화 값과 검색 토큰도 다시 계산
+        changes['norm'] = index_fields(plain)
+        changes['search'] = search_tokens(plain)
+        operations.append(UpdateOne({'_id': customer['_id']}, {'$set': changes}))
+        if len(operations) >= batch_size:
+            updated += db.customers.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated += db.customers.bulk_write(operations, ordered=False).modified_count
+    return updated
+
+def reindex_search(batch_size=1000, missing_only=False):
+    """고객 검색 토큰(search 필드)을 다시 계산, 갱신한 문서 수 반환"""
+    return search.reindex(db.customers, batch_size=batch_size, missing_only=missing_only)
+
+def search_customers(query, company=None, offset=0, limit=20):
+    """이름/회사명 부분 일치, 전화번호 뒷자리, 이메일로 고객 검색 (점수 높은 순, limit + 1개까지)
+
+    반환: (고객 목록, truncated: 후보가 SEARCH_MAX_CANDIDATES 를 넘어 일부만으로 순위를 매겼는지)
+    """
+    return search.search_customers(db.customers, query, company=company, offset=offset, limit=limit)
+
 def get_customers(company=None):
     query = {}
     if company and company != "전체":
         query['company'] = company
-    return list(db.customers.find(query))
+    return decrypt_documents(list(db.customers.find(query)))
+
+def customer_query(company=None, after=None, fields=None, email=None, phone=None):
+    """고객 목록 조회 조건과 projection (이메일/전화번호는 복호화 없이 블라인드 인덱스로 검색)"""
+    query = {}
+    if company and company != "전체":
+        query['company'] = company
+    if email:
+        query['norm.email'] = email_key(email)
+    if phone:
+        query['norm.phone'] = phone_key(phone)
+    if after is not None:
+        query['_id'] = {'$gt': after}
+    # norm(정규화 값)과 search(검색 토큰)는 내부용이므로 응답에서 제외
+    projection = {field: 1 for field in fields} if fields else {'norm': 0, 'search': 0}
+    return query, projection
+
+def find_customers(company=None, after=None, limit=None, fields=None, email=None, phone=None):
+    """_id 기준 keyset 페이지네이션 (after: 이전 페이지 마지막 _id)
+
+    커서에서 묶음 단위로 복호화하면서 문서를 하나씩 반환하는 iterator
+    """
+    query, projection = customer_query(company, after, fields, email, phone)
+    cursor = db.customers.find(query, projection).sort('_id', 1)
+    if limit:
+        cursor = cursor.limit(limit)
+    return iter_decrypted(cursor)
+
+def company_is_empty(company):
+    """해당 회사의 고객이 더 이상 없는지 (company_id 인덱스로 한 건만 확인)"""
+    return bool(company) and db.customers.find_one({'company': company}, {'_id': 1}) is None
 
 def delete_customer(customer_id):
-    result = db.customers.delete_one({'_id': ObjectId(customer_id)})
-    return result.deleted_count
+    deleted = db.customers.find_one_and_delete({'_id': ObjectId(customer_id)}, {'company': 1})
+    if deleted is None:
+        return 0
+    invalidate_company_facets()
+    company = deleted.get('company')
+    events.customer_deleted(deleted['_id'], company, company_is_empty(company))
+    return 1
+
+
+# 회사별 고객 수 (대시보드 회사 드롭다운용)
+_company_facets = None  # (계산 시각, 결과)
+_company_facets_generation = 0
+_company_facets_lock = threading.Lock()
+
+def get_company_facets():
+    """회사명별 고객 수를 집계 (프로세스 내 캐시, 저장/삭제 시 무효화)"""
+    global _company_facets
+    ttl = getattr(settings, 'COMPANY_FACET_CACHE_SECONDS', 30)
+    cached = _company_facets
+    if cached is not None and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+    generation = _company_facets_generation
+    facets = [
+        {'company': row['_id'], 'count': row['count']}
+        for row in db.customers.aggregate([
+            {'$match': {'company': {'$nin': [None, '']}}},
+            {'$group': {'_id': '$company', 'count': {'$sum': 1}}},
+            {'$sort': {'_id': 1}},
+        ])
+    ]
+    with _company_facets_lock:
+        # 집계 중에 저장/삭제가 있었으면 캐시하지 않음
+        if generation == _company_facets_generation:
+            _company_facets = (time.monotonic(), facets)
+    return facets
+
+def invalidate_company_facets():
+    global _company_facets, _company_facets_generation
+    with _company_facets_lock:
+        _company_facets = None
+        _company_facets_generation += 1
+
+
+# OCR 작업 큐 (jobs.py 에서 사용)
+def create_job(job_id, kind, filenames, image_paths, use_cache=True, mode=None, upsert=False, owner=None):
+    """image_paths: 디스크에 있는 이미지는 경로, 메모리로 전달된 이미지는 None
+
+    owner: 작업을 실행할 프로세스 (jobs.owner_id), 끝날 때까지 heartbeat_at 을 주기적으로 갱신한다
+    """
+    now = timezone.now()
+    db.ocr_jobs.insert_one({
+        '_id': job_id,
+        'kind': kind,
+        'status': 'queued',
+        'filenames': filenames,
+        'image_paths': image_paths,
+        'use_cache': use_cache,
+        'mode': mode,
+        'upsert': upsert,
+        'owner': owner,
+        'heartbeat_at': now,
+        'created_at': now,
+    })
+
+def claim_job(job_id, owner=None):
+    """owner 의 queued 작업을 running으로 원자적으로 변경 (이미 실행 중이거나 다른 프로세스가 넘겨받았으면 None)"""
+    now = timezone.now()
+    return db.ocr_jobs.find_one_and_update(
+        {'_id': job_id, 'status': 'queued', 'owner': owner},
+        {'$set': {'status': 'running', 'started_at': now, 'heartbeat_at': now}},
+    )
+
+def heartbeat_jobs(owner):
+    """owner 프로세스가 살아 있음을 표시 (끝나지 않은 작업의 heartbeat_at 갱신)"""
+    db.ocr_jobs.update_many(
+        {'owner': owner, 'status': {'$in': ['queued', 'running']}},
+        {'$set': {'heartbeat_at': timezone.now()}},
+    )
+
+def _stale_job_query(stale_before):
+    """끝나지 않았는데 stale_before 이후로 heartbeat 가 없는 (소유 프로세스가 죽은) 작업
+
+    heartbeat_at 도입 전에 만든 작업은 created_at 기준
+    """
+    return {
+        'status': {'$in': ['queued', 'running']},
+        '$or': [
+            {'heartbeat_at': {'$lt': stale_before}},
+            {'heartbeat_at': {'$exists': False}, 'created_at': {'$lt': stale_before}},
+        ],
+    }
+
+def _job_customers(result):
+    """작업 결과 안의 고객 정보 dict 목록 (단건: 결과 자체, 일괄: 성공한 항목의 customer)"""
+    if not isinstance(result, dict):
+        return []
+    if 'items' in result:
+        return [item['customer'] for item in result['items'] if item.get('customer')]
+    return [result]
+
+def _map_job_customers(result, function):
+    if isinstance(result, dict) and 'items' in result:
+        items = [dict(item, customer=function(item['customer'])) if item.get('customer') else item for item in result['items']]
+        return dict(result, items=items)
+    return function(result) if isinstance(result, dict) else result
+
+def finish_job(job_id, result, **fields):
+    """fields: 작업 문서에 함께 남길 값 (ocr_stats, action 등), 결과의 개인정보 필드는 암호화해서 저장"""
+    db.ocr_jobs.update_one(
+        {'_id': job_id},
+        {'$set': {
+            **fields,
+            'status': 'done',
+            'result': _map_job_customers(result, encrypt_document),
+            'finished_at': timezone.now(),
+        }},
+    )
+
+def fail_job(job_id, error):
+    db.ocr_jobs.update_one(
+        {'_id': job_id},
+        {'$set': {'status': 'failed', 'error': error, 'finished_at': timezone.now()}},
+    )
+
+def get_job(job_id):
+    job = db.ocr_jobs.find_one({'_id': job_id}, {'image_paths': 0})
+    if job is not None and job.get('result'):
+        decrypt_documents(_job_customers(job['result']))
+    return job
+
+def get_stale_jobs(stale_before):
+    return list(db.ocr_jobs.find(_stale_job_query(stale_before), {'_id': 1}).sort('created_at', 1))
+
+def take_over_job(job_id, owner, stale_before):
+    """죽은 프로세스의 작업을 owner 의 queued 작업으로 원자적으로 넘겨받음 (다른 프로세스가 먼저 가져갔으면 None)"""
+    return db.ocr_jobs.find_one_and_update(
+        {'_id': job_id, **_stale_job_query(stale_before)},
+        {'$set': {'status': 'queued', 'owner': owner, 'heartbeat_at': timezone.now()}},
+        {'image_paths': 1},
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+# OCR 결과 캐시 영구 저장소 (cache.py 에서 사용)
+def get_cached_result(key):
+    stored = db.ocr_cache.find_one({'_id': key})
+    if stored is not None:
+        decrypt_documents([stored['result']])
+    return stored
 
+def get_cached_candidates(phash, limit=10):
+    """지각 해시가 같은 캐시 문서 (같은 양식의 다른 명함일 수 있으므로 호출하는 쪽에서 검증)"""
+    candidates = list(db.ocr_cache.find({'phash': phash}).sort('created_at', DESCENDING).limit(limit))
+    decrypt_documents([stored['result'] for stored in candidates])
+    return candidates
 
+def save_cached_result(key, result, phash=None, detail=None):
+    db.ocr_cache.replace_one(
+        {'_id': key},
+        {'result': encrypt_document(result), 'phash': phash, 'detail': detail, 'created_at': timezone.now()},
+        upsert=True,
+    )
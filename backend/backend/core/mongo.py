@@ -1,4 +1,17 @@
-from pymongo import MongoClient
+from django.conf import settings
+from django.utils.module_loading import import_string
 
-client = MongoClient('mongodb://localhost:27017')
-db = client['business_card_db']
\ No newline at end of file
+
+def client_options():
+    """settings.MONGO_OPTIONS (커넥션 풀 크기, 타임아웃, write concern, read preference 등)"""
+    return dict(getattr(settings, 'MONGO_OPTIONS', {}))
+
+
+def create_client(class_path=None):
+    client_class = import_string(class_path or getattr(settings, 'MONGO_CLIENT_CLASS', 'pymongo.MongoClient'))
+    return client_class(getattr(settings, 'MONGO_URI', 'mongodb://localhost:27017'), **client_options())
+
+
+# MongoClient는 내부에 커넥션 풀을 가지고 있고 스레드 간 공유가 안전하므로 프로세스당 하나만 생성
+client = create_client()
+db = client[getattr(settings, 'MONGO_DB_NAME', 'business_card_db')]
@@ -0,0 +1,84 @@
+import re
+
+from .crypto import blind_index
+from .parser import correct_name, clean_company_text
+
+# 중복 연락처 판별용 정규화 (고객 문서의 norm 하위 필드로 저장되어 인덱스로 쓰임)
+# 같은 사람을 여러 번 스캔해도 OCR 결과의 표기 차이(하이픈, 대소문자, 공백, 자주 틀리는 글자)와
+# 관계없이 같은 키가 나오도록 한다. 암호화되는 이메일/전화번호는 정규화 값 대신 HMAC(블라인드 인덱스)를 저장한다.
+
+_NON_DIGIT = re.compile(r'\D')
+_SPACES = re.compile(r'\s+')
+# 회사명 비교 시 무시하는 법인 표기
+_COMPANY_SUFFIXES = re.compile(r'\(주\)|주식회사|유한회사|\b(?:inc|co|ltd|llc|corp)\b\.?', re.IGNORECASE)
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+def normalize_phone(phone):
+    """숫자만 남기고 국가번호(+82)는 0으로 바꿈: '+82 10-1234-5678' → '01012345678'"""
+    if not phone:
+        return None
+    digits = _NON_DIGIT.sub('', phone)
+    if digits.startswith('82') and len(digits) >= 11:
+        digits = '0' + digits[2:]
+    return digits or None
+
+
+def normalize_email(email):
+    if not email:
+        return None
+    return email.strip().lower() or None
+
+
+def normalize_name(name):
+    """공백 제거 + 자주 틀리는 한글 교정(COMMON_OCR_ERRORS) + 영문 소문자"""
+    if not name:
+        return None
+    return correct_name(_SPACES.sub('', name)).lower() or None
+
+
+def normalize_company(company):
+    if not company:
+        return None
+    company = _COMPANY_SUFFIXES.sub('', clean_company_text(company))
+    return _NON_WORD.sub('', company).lower() or None
+
+
+def normalized_fields(customer):
+    """고객 정보 → {'email', 'phone', 'name', 'company'} (값이 없으면 None)"""
+    return {
+        'email': normalize_email(customer.get('email')),
+        'phone': normalize_phone(customer.get('phone')),
+        'name': normalize_name(customer.get('name')),
+        'company': normalize_company(customer.get('company')),
+    }
+
+
+def index_fields(customer):
+    """norm 필드로 저장할 값: 정규화 값 (이메일/전화번호는 블라인드 인덱스)"""
+    norm = normalized_fields(customer)
+    for field in ('email', 'phone'):
+        norm[field] = blind_index(norm[field], field)
+    return norm
+
+
+def email_key(email):
+    return blind_index(normalize_email(email), 'email')
+
+
+def phone_key(phone):
+    return blind_index(normalize_phone(phone), 'phone')
+
+
+def annotate(customer):
+    """저장 직전에 (평문 고객 정보로) norm 필드를 채워서 그대로 반환"""
+    customer['norm'] = index_fields(customer)
+    return customer
+
+
+def match_query(norm):
+    """정규화된 이메일 또는 전화번호(블라인드 인덱스)가 같은 고객을 찾는 조건 (둘 다 없으면 None)"""
+    conditions = [{f'norm.{field}': norm[field]} for field in ('email', 'phone') if norm.get(field)]
+    if not conditions:
+        return None
+    return {'$or': conditions} if len(conditions) > 1 else conditions[0]
@@ -1,19 +1,113 @@
 import cv2
-import easyocr
-import re
-
-# === 0️⃣ 공통 교정 사전 ===
-COMMON_OCR_ERRORS = {
-    '콩': '홍',
-    '훙': '홍',
-    '굉': '홍',
-    '곡': '홍'
-    # 필요시 추가 확장 가능
-}
+import numpy as np
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from . import readers
+from .log import stage
+from .parser import (  # noqa: F401  (기존 import 경로 호환)
+    COMMON_OCR_ERRORS,
+    clean_company_text,
+    extract_company_from_email,
+    extract_company_from_patterns,
+    extract_name_from_patterns,
+    extract_info,
+)
+
+# 1️⃣-0 이미지 로드 (bytes / 파일 객체 / NumPy 배열 / 경로)
+def load_image(source):
+    """업로드 데이터를 임시 파일 없이 메모리에서 바로 BGR 이미지로 디코딩
+
+    경로(str, PathLike)는 큰 업로드를 디스크로 받은 경우의 대체 경로로만 사용한다.
+    """
+    if isinstance(source, np.ndarray):
+        if source.ndim == 1:
+            # 인코딩된 이미지 바이트가 담긴 버퍼
+            return _decode(source)
+        return source
+    if isinstance(source, (str, os.PathLike)):
+        img = cv2.imread(os.fspath(source))
+        if img is None:
+            raise ValueError(f"이미지를 읽을 수 없습니다: {source}")
+        return img
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return _decode(np.frombuffer(source, dtype=np.uint8))
+    if hasattr(source, 'temporary_file_path'):
+        # Django가 디스크에 받아둔 큰 업로드
+        return load_image(source.temporary_file_path())
+    if hasattr(source, 'read'):
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return _decode(np.frombuffer(source.read(), dtype=np.uint8))
+    raise TypeError(f"지원하지 않는 이미지 입력 형식입니다: {type(source).__name__}")
+
+def _decode(buffer):
+    img = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("이미지를 디코딩할 수 없습니다.")
+    return img
+
+# 1️⃣-1 명함 영역 검출 (축소본에서 외곽선 검출 → 원본 좌표로 환산)
+def find_card_region(img):
+    """명함으로 보이는 가장 큰 사각형 외곽선의 네 꼭짓점 (못 찾으면 None)"""
+    height, width = img.shape[:2]
+    scale = min(1.0, getattr(settings, 'OCR_DETECT_LONG_EDGE', 640) / max(height, width))
+    small = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else img
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+    gray = cv2.GaussianBlur(gray, (5, 5), 0)
+    low, high = getattr(settings, 'OCR_CARD_CANNY_THRESHOLDS', (50, 150))
+    edges = cv2.dilate(cv2.Canny(gray, low, high), None)
+
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    min_area = getattr(settings, 'OCR_CARD_MIN_AREA_RATIO', 0.2) * gray.shape[0] * gray.shape[1]
+    for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:5]:
+        if cv2.contourArea(contour) < min_area:
+            break
+        approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+        if len(approx) == 4 and cv2.isContourConvex(approx):
+            return approx.reshape(4, 2).astype(np.float32) / scale
+    return None
+
+def _order_corners(quad):
+    # 좌상, 우상, 우하, 좌하 순서
+    s = quad.sum(axis=1)
+    d = np.diff(quad, axis=1).ravel()
+    return np.array([quad[np.argmin(s)], quad[np.argmin(d)], quad[np.argmax(s)], quad[np.argmax(d)]], dtype=np.float32)
+
+def _target_size(width, height, long_edge):
+    if long_edge and max(width, height) > long_edge:
+        ratio = long_edge / max(width, height)
+        return max(1, int(round(width * ratio))), max(1, int(round(height * ratio)))
+    return max(1, int(round(width))), max(1, int(round(height)))
+
+# 1️⃣-2 명함 영역만 펴서 잘라내고 긴 변 기준으로 축소
+def normalize_card(img):
+    long_edge = getattr(settings, 'OCR_TARGET_LONG_EDGE', 1280)
+    quad = find_card_region(img) if getattr(settings, 'OCR_CARD_DETECTION', True) else None
+    if quad is not None:
+        tl, tr, br, bl = _order_corners(quad)
+        card_width = max(np.linalg.norm(tr - tl), np.linalg.norm(br - bl))
+        card_height = max(np.linalg.norm(bl - tl), np.linalg.norm(br - tr))
+        # 원근 보정과 축소를 warpPerspective 한 번으로 처리
+        width, height = _target_size(card_width, card_height, long_edge)
+        dst = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+        matrix = cv2.getPerspectiveTransform(np.array([tl, tr, br, bl]), dst)
+        return cv2.warpPerspective(img, matrix, (width, height), flags=cv2.INTER_AREA)
+
+    height, width = img.shape[:2]
+    target = _target_size(width, height, long_edge)
+    if target != (width, height):
+        img = cv2.resize(img, target, interpolation=cv2.INTER_AREA)
+    return img
 
 # 1️⃣ 이미지 전처리 (한글 인식률 개선)
-def preprocess_image(image_path):
-    img = cv2.imread(image_path)
+def preprocess_image(source, normalize=True):
+    img = load_image(source)
+    if normalize:
+        # 필터링 전에 명함 영역만 목표 해상도로 줄여서 이후 단계 비용을 줄임
+        img = normalize_card(img)
     # Convert to grayscale
     gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
     # Noise reduction + edge preserving
@@ -27,160 +121,190 @@ def preprocess_image(image_path):
     )
     return thresh
 
-# 2️⃣ EasyOCR 추출
-def extract_texts_with_boxes(image):
-    reader = easyocr.Reader(['ko', 'en'])  # 한글 + 영어
-    results = reader.readtext(image)
+# 2️⃣ EasyOCR 추출 (프로세스 전역 Reader 풀에서 빌려 사용)
+def extract_texts_with_boxes(image, languages=None):
+    with readers.checkout(languages) as reader:  # 기본: 한글 + 영어
+        results = reader.readtext(image)
     return results
 
-# 3️⃣ 이메일 기반 회사명 추출
-def extract_company_from_email(email):
-    match = re.search(r'@([A-Za-z0-9\-]+)\.', email)
-    if match:
-        company_candidate = match.group(1)
-        company_candidate = company_candidate.replace('-', '').upper()
-        return company_candidate
-    return None
+# 2️⃣-1 여러 장을 묶어서 EasyOCR 추출 (readtext_batched)
+def batch_canvas(image):
+    """묶음 처리 시 맞출 크기: 가로 명함은 OCR_BATCH_IMAGE_SIZE, 세로 명함은 가로/세로를 바꾼 크기"""
+    width, height = getattr(settings, 'OCR_BATCH_IMAGE_SIZE', (1280, 720))
+    if image.shape[0] > image.shape[1]:
+        return height, width
+    return width, height
 
-# 💡 OCR 오류 교정 + 괄호 정규화
-def clean_company_text(text):
-    # 작은 따옴표 제거
-    text = text.replace("'", "").replace("'", "").replace("'", "")
-    # 괄호 정규화 (유니코드 괄호 → ASCII 괄호)
-    text = text.replace("（", "(").replace("）", ")").replace("【", "(").replace("】", ")")
-    # OCR 오류 교정
-    text = text.replace('(쥐', '(주)').replace('(주', '(주)').replace('(쥬', '(주)').replace('쥐식회사', '주식회사').replace('쥬식회사', '주식회사')
-    return text.strip()
-
-# 4️⃣ 패턴 기반 회사명 추출
-def extract_company_from_patterns(results):
-    company_patterns = [
-        r'\(주\).*',
-        r'주식회사.*',
-        r'\bInc\b\s*\S+',
-        r'\bInc\.\b\s*\S+',
-        r'\bCo\.\b\s*\S+',
-        r'\bLtd\b\s*\S+',
-        r'\bLLC\b\s*\S+',
-        r'유한회사.*'
-    ]
-
-    # 1️⃣ line 기반 확인
-    for _, text, _ in results:
-        clean_text = clean_company_text(text)
-        print(f"[DEBUG CLEAN TEXT] {clean_text}")  # 디버그 확인
-
-        for pattern in company_patterns:
-            match = re.search(pattern, clean_text, re.IGNORECASE)
-            if match:
-                company = match.group().strip()
-                print(f"[DEBUG MATCH] {company}")  # 디버그 확인
-                return company
-
-    # 2️⃣ full_text 기반 확인
-    full_text = " ".join([clean_company_text(text) for _, text, _ in results])
-    for pattern in company_patterns:
-        match = re.search(pattern, full_text, re.IGNORECASE)
-        if match:
-            company = match.group().strip()
-            print(f"[DEBUG MATCH - FULL TEXT] {company}")  # 디버그 확인
-            return company
+def letterbox(image, size):
+    """비율을 유지한 채 size 안에 맞게 줄이고 오른쪽/아래를 배경색으로 채움
 
-    return None
+    왼쪽 위에 붙이므로 글자 박스 좌표는 배율만 달라지고 읽는 순서는 그대로다.
+    """
+    width, height = size
+    scale = min(width / image.shape[1], height / image.shape[0])
+    resized = cv2.resize(
+        image,
+        (min(width, round(image.shape[1] * scale)), min(height, round(image.shape[0] * scale))),
+        interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC,
+    )
+    # 가장자리 픽셀의 중앙값을 배경색으로 (흰 명함은 흰색, 어두운 명함은 어두운 색)
+    border = np.concatenate([resized[0], resized[-1], resized[:, 0], resized[:, -1]])
+    background = np.median(border, axis=0).tolist()
+    return cv2.copyMakeBorder(
+        resized, 0, height - resized.shape[0], 0, width - resized.shape[1], cv2.BORDER_CONSTANT, value=background,
+    )
+
+def extract_texts_batched(images, languages=None):
+    """같은 방향(batch_canvas)의 이미지 묶음을 비율을 유지한 채 한 크기로 맞춰 인식"""
+    width, height = batch_canvas(images[0])
+    images = [letterbox(image, (width, height)) for image in images]
+    with readers.checkout(languages) as reader:
+        return reader.readtext_batched(
+            images,
+            n_width=width,
+            n_height=height,
+            batch_size=getattr(settings, 'OCR_RECOGNIZER_BATCH_SIZE', 16),
+        )
+
+# 2️⃣-2 2단계 추출 (검출만 먼저 하고 큰 글자 박스부터 인식)
+MODES = ('full', 'fast')
 
-# 5️⃣ 이름 추출 (한글 우선 + 교정 적용)
-def extract_name_from_patterns(results, exclude_texts):
-    hangul_name_patterns = [
-        r'이름[:：]?\s*([가-힣\s]{2,8})',
-        r'^([가-힣\s]{2,8})$',
-        r'([가-힣]{2,4})\s+[A-Za-z]{2,}'
-    ]
-
-    english_name_patterns = [
-        r'Name[:：]?\s*([A-Za-z]{2,}\s+[A-Za-z]{2,})',
-        r'^([A-Za-z]{2,}\s+[A-Za-z]{2,})$'
-    ]
-
-    # 1️⃣ 한글 이름 패턴 우선
-    for _, text, _ in results:
-        for pattern in hangul_name_patterns:
-            match = re.search(pattern, text)
-            if match:
-                corrected_name = match.group(1).replace(" ", "").strip()
-                # 교정 사전 적용
-                for wrong, correct in COMMON_OCR_ERRORS.items():
-                    corrected_name = corrected_name.replace(wrong, correct)
-                return corrected_name
-
-    # 2️⃣ 영문 이름 패턴
-    for _, text, _ in results:
-        for pattern in english_name_patterns:
-            match = re.search(pattern, text)
-            if match:
-                corrected_name = match.group(1).strip()
-                return corrected_name
-
-    # 3️⃣ fallback 휴리스틱
-    candidate_names = []
-    for _, text, _ in results:
-        stripped_text = text.strip()
-        no_space_text = stripped_text.replace(" ", "")
-
-        if (
-            stripped_text not in exclude_texts
-            and 2 <= len(no_space_text) <= 10
-            and not re.search(r'\d', stripped_text)
-            and '@' not in stripped_text
-            and re.search(r'[가-힣A-Za-z]', stripped_text)
-        ):
-            # 교정 사전 적용
-            corrected_text = no_space_text
-            for wrong, correct in COMMON_OCR_ERRORS.items():
-                corrected_text = corrected_text.replace(wrong, correct)
-
-            candidate_names.append(corrected_text)
-
-    return candidate_names[0] if candidate_names else None
-
-# 6️⃣ 정보 종합 추출
-def extract_info(results):
-    full_text = " ".join([clean_company_text(text) for _, text, _ in results])
-
-    phone_match = re.search(r'\d{2,3}-\d{3,4}-\d{4}', full_text)
-    phone = phone_match.group() if phone_match else None
-
-    email_match = re.search(r'[\w\.-]+@[\w\.-]+', full_text)
-    email = email_match.group() if email_match else None
-
-    company_from_pattern = extract_company_from_patterns(results)
-    company_from_email = extract_company_from_email(email) if email else None
-    company = company_from_pattern if company_from_pattern else company_from_email
-
-    exclude_texts = set()
-    if company:
-        exclude_texts.add(company)
-    if email:
-        exclude_texts.add(email)
-    if phone:
-        exclude_texts.add(phone)
-
-    name = extract_name_from_patterns(results, exclude_texts)
-
-    return {
-        'name': name,
-        'phone': phone,
-        'email': email,
-        'company': company
+def resolve_mode(mode=None):
+    mode = mode or getattr(settings, 'OCR_DEFAULT_MODE', 'full')
+    if mode not in MODES:
+        raise ValueError(f"지원하지 않는 인식 모드입니다: {mode}")
+    return mode
+
+def _box_area(box, free):
+    if free:
+        return cv2.contourArea(np.asarray(box, dtype=np.float32))
+    x_min, x_max, y_min, y_max = box
+    return (x_max - x_min) * (y_max - y_min)
+
+def _recognize_boxes(reader, image, boxes):
+    if not boxes:
+        return []
+    return reader.recognize(
+        image,
+        horizontal_list=[box for box, free in boxes if not free],
+        free_list=[box for box, free in boxes if free],
+    )
+
+def _missing_fields(results):
+    info = extract_info(results)
+    return [field for field in getattr(settings, 'OCR_FAST_REQUIRED_FIELDS', ()) if not info.get(field)]
+
+def extract_texts_two_phase(image, languages=None, first_boxes=None):
+    """1단계: 글자 박스 검출 후 면적이 큰 박스 first_boxes개만 인식해서 파싱
+    2단계: 필수 필드(OCR_FAST_REQUIRED_FIELDS)가 하나라도 비어 있으면 나머지 박스도 인식
+
+    EasyOCR 검출기는 박스별 신뢰도를 주지 않으므로 면적(글자 크기 × 길이)을 우선순위로 쓴다.
+    반환: (readtext와 같은 형식의 결과, 박스 통계 dict)
+    """
+    first_boxes = first_boxes or getattr(settings, 'OCR_FAST_FIRST_BOXES', 8)
+    with readers.checkout(languages) as reader:
+        horizontal_list, free_list = reader.detect(image)
+        boxes = [(box, False) for box in horizontal_list[0]] + [(box, True) for box in free_list[0]]
+        boxes.sort(key=lambda item: _box_area(*item), reverse=True)
+
+        results = list(_recognize_boxes(reader, image, boxes[:first_boxes]))
+        recognized = min(first_boxes, len(boxes))
+        phases = 1
+        if len(boxes) > first_boxes and _missing_fields(results):
+            results += _recognize_boxes(reader, image, boxes[first_boxes:])
+            recognized = len(boxes)
+            phases = 2
+
+    # readtext와 같은 읽는 순서(위 → 아래, 왼쪽 → 오른쪽)로 정렬
+    results.sort(key=lambda result: (result[0][0][1], result[0][0][0]))
+    return results, {
+        'mode': 'fast',
+        'phases': phases,
+        'boxes_total': len(boxes),
+        'boxes_recognized': recognized,
+        'boxes_skipped': len(boxes) - recognized,
     }
 
 # 7️⃣ 최종 프로세스 함수
-def process_business_card(image_path):
-    img = preprocess_image(image_path)
-    results = extract_texts_with_boxes(img)
+def process_business_card(source, mode=None):
+    """mode='fast' 이면 2단계 인식을 쓰고, 결과에 인식/생략한 박스 수(ocr_stats)를 함께 담음"""
+    mode = resolve_mode(mode)
+    with stage('decode'):
+        img = load_image(source)
+    with stage('preprocess'):
+        img = preprocess_image(img)
+    if mode == 'fast':
+        return _process_two_phase(img)
+    with stage('ocr') as logger:
+        results = extract_texts_with_boxes(img)
+        logger.debug("OCR results: %s", results)
+    with stage('parse'):
+        info = extract_info(results)
+    return info
 
-    print("===== OCR Results =====")
-    for r in results:
-        print(r)
+def _process_two_phase(img):
+    with stage('ocr') as logger:
+        results, ocr_stats = extract_texts_two_phase(img)
+        logger.debug("OCR results: %s (%s)", results, ocr_stats)
+    with stage('parse'):
+        info = extract_info(results)
+    info['ocr_stats'] = ocr_stats
+    return info
 
-    info = extract_info(results)
-    return info
\ No newline at end of file
+# 8️⃣ 여러 장 일괄 처리 (전처리는 병렬, OCR은 묶음 단위)
+def process_business_cards(sources, batch_size=None, mode=None):
+    """각 이미지에 대해 info dict 또는 실패 원인(Exception)을 같은 순서로 반환
+
+    mode='fast' 이면 묶음 인식 대신 이미지마다 2단계 인식을 한다.
+    """
+    batch_size = batch_size or getattr(settings, 'OCR_BATCH_SIZE', 8)
+    mode = resolve_mode(mode)
+    outcomes = [None] * len(sources)
+
+    def _preprocess(source):
+        try:
+            return preprocess_image(source)
+        except Exception as e:
+            return e
+
+    # OpenCV 연산은 GIL을 놓기 때문에 스레드로 병렬 전처리
+    with stage('preprocess'), ThreadPoolExecutor(max_workers=getattr(settings, 'OCR_PREPROCESS_WORKERS', 4)) as pool:
+        images = list(pool.map(_preprocess, sources))
+
+    ready = []
+    for index, img in enumerate(images):
+        if isinstance(img, Exception):
+            outcomes[index] = img
+        else:
+            ready.append((index, img))
+
+    if mode == 'fast':
+        for index, img in ready:
+            try:
+                outcomes[index] = _process_two_phase(img)
+            except Exception as e:
+                outcomes[index] = e
+        return outcomes
+
+    # 가로/세로 명함을 한 크기로 맞추면 한쪽이 찌그러지거나 너무 작아지므로 방향별로 묶음
+    chunks = []
+    for canvas in {batch_canvas(img) for _, img in ready}:
+        same = [(index, img) for index, img in ready if batch_canvas(img) == canvas]
+        chunks += [same[start:start + batch_size] for start in range(0, len(same), batch_size)]
+
+    for chunk in chunks:
+        try:
+            with stage('ocr'):
+                batch_results = extract_texts_batched([img for _, img in chunk])
+        except Exception as e:
+            for index, _ in chunk:
+                outcomes[index] = e
+            continue
+        with stage('parse'):
+            for (index, _), results in zip(chunk, batch_results):
+                try:
+                    outcomes[index] = extract_info(results)
+                except Exception as e:
+                    outcomes[index] = e
+
+    return outcomes
@@ -0,0 +1,188 @@
+import re
+
+# === 0️⃣ 공통 교정 사전 ===
+COMMON_OCR_ERRORS = {
+    '콩': '홍',
+    '훙': '홍',
+    '굉': '홍',
+    '곡': '홍'
+    # 필요시 추가 확장 가능
+}
+
+# 모든 패턴은 import 시점에 한 번만 컴파일
+COMPANY_PATTERNS = [
+    re.compile(p, re.IGNORECASE) for p in (
+        r'\(주\).*',
+        r'주식회사.*',
+        r'\bInc\b\s*\S+',
+        r'\bInc\.\b\s*\S+',
+        r'\bCo\.\b\s*\S+',
+        r'\bLtd\b\s*\S+',
+        r'\bLLC\b\s*\S+',
+        r'유한회사.*'
+    )
+]
+# 회사 패턴 중 하나라도 맞는 줄만 개별 패턴을 순서대로 확인하기 위한 사전 필터
+_ANY_COMPANY = re.compile('|'.join(f'(?:{p.pattern})' for p in COMPANY_PATTERNS), re.IGNORECASE)
+
+HANGUL_NAME_PATTERNS = [
+    re.compile(p) for p in (
+        r'이름[:：]?\s*([가-힣\s]{2,8})',
+        r'^([가-힣\s]{2,8})$',
+        r'([가-힣]{2,4})\s+[A-Za-z]{2,}'
+    )
+]
+
+ENGLISH_NAME_PATTERNS = [
+    re.compile(p) for p in (
+        r'Name[:：]?\s*([A-Za-z]{2,}\s+[A-Za-z]{2,})',
+        r'^([A-Za-z]{2,}\s+[A-Za-z]{2,})$'
+    )
+]
+
+PHONE_PATTERN = re.compile(r'\d{2,3}-\d{3,4}-\d{4}')
+EMAIL_PATTERN = re.compile(r'[\w\.-]+@[\w\.-]+')
+EMAIL_DOMAIN_PATTERN = re.compile(r'@([A-Za-z0-9\-]+)\.')
+_DIGIT = re.compile(r'\d')
+_LETTER = re.compile(r'[가-힣A-Za-z]')
+
+# 따옴표 제거 + 유니코드 괄호 → ASCII 괄호
+_CLEAN_TABLE = str.maketrans({
+    "'": None, "‘": None, "’": None,
+    "（": "(", "）": ")", "【": "(", "】": ")",
+})
+# (쥐 / (주 / (쥬 → (주),  쥐식회사 / 쥬식회사 → 주식회사
+_COMPANY_FIXES = re.compile(r'\([쥐주쥬]\)?|[쥐쥬](?=식회사)')
+
+
+def _compile_corrections():
+    keys = sorted(COMMON_OCR_ERRORS, key=len, reverse=True)
+    return re.compile('|'.join(map(re.escape, keys))) if keys else None
+
+_CORRECTIONS = _compile_corrections()
+
+
+def correct_name(text):
+    """교정 사전을 한 번의 치환으로 적용"""
+    if _CORRECTIONS is None:
+        return text
+    return _CORRECTIONS.sub(lambda m: COMMON_OCR_ERRORS[m.group()], text)
+
+
+# 💡 OCR 오류 교정 + 괄호 정규화
+def clean_company_text(text):
+    text = text.translate(_CLEAN_TABLE)
+    text = _COMPANY_FIXES.sub(lambda m: '(주)' if m.group().startswith('(') else '주', text)
+    return text.strip()
+
+
+# 3️⃣ 이메일 기반 회사명 추출
+def extract_company_from_email(email):
+    match = EMAIL_DOMAIN_PATTERN.search(email)
+    if match:
+        return match.group(1).replace('-', '').upper()
+    return None
+
+
+def _first_match(patterns, text):
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return match
+    return None
+
+
+def parse_lines(texts):
+    """OCR 줄 목록을 한 번만 훑으면서 회사/이름 후보를 분류
+
+    각 줄은 정확히 한 번 정규화되고, 필드별로 가장 먼저 맞은 줄만 기록한다.
+    """
+    cleaned = [clean_company_text(text) for text in texts]
+    company = hangul_name = english_name = None
+    fallback = []  # (stripped_text, no_space_text)
+
+    for text, clean in zip(texts, cleaned):
+        if company is None and _ANY_COMPANY.search(clean):
+            company = _first_match(COMPANY_PATTERNS, clean).group().strip()
+
+        if hangul_name is None:
+            match = _first_match(HANGUL_NAME_PATTERNS, text)
+            if match:
+                hangul_name = match.group(1).replace(" ", "").strip()
+                continue
+            if english_name is None:
+                match = _first_match(ENGLISH_NAME_PATTERNS, text)
+                if match:
+                    english_name = match.group(1).strip()
+                    continue
+            if english_name is None:
+                stripped_text = text.strip()
+                no_space_text = stripped_text.replace(" ", "")
+                if (
+                    2 <= len(no_space_text) <= 10
+                    and not _DIGIT.search(stripped_text)
+                    and '@' not in stripped_text
+                    and _LETTER.search(stripped_text)
+                ):
+                    fallback.append((stripped_text, no_space_text))
+
+    return {
+        'full_text': " ".join(cleaned),
+        'company': company,
+        'hangul_name': hangul_name,
+        'english_name': english_name,
+        'fallback_names': fallback,
+    }
+
+
+def _pick_company(parsed):
+    if parsed['company']:
+        return parsed['company']
+    # 줄 단위로 못 찾으면 줄을 이어붙인 전체 텍스트에서 확인
+    match = _first_match(COMPANY_PATTERNS, parsed['full_text'])
+    return match.group().strip() if match else None
+
+
+def _pick_name(parsed, exclude_texts):
+    if parsed['hangul_name']:
+        return correct_name(parsed['hangul_name'])
+    if parsed['english_name']:
+        return parsed['english_name']
+    for stripped_text, no_space_text in parsed['fallback_names']:
+        if stripped_text not in exclude_texts:
+            return correct_name(no_space_text)
+    return None
+
+
+# 4️⃣ 패턴 기반 회사명 추출
+def extract_company_from_patterns(results):
+    return _pick_company(parse_lines([text for _, text, _ in results]))
+
+
+# 5️⃣ 이름 추출 (한글 우선 + 교정 적용)
+def extract_name_from_patterns(results, exclude_texts):
+    return _pick_name(parse_lines([text for _, text, _ in results]), exclude_texts)
+
+
+# 6️⃣ 정보 종합 추출
+def extract_info(results):
+    parsed = parse_lines([text for _, text, _ in results])
+    full_text = parsed['full_text']
+
+    phone_match = PHONE_PATTERN.search(full_text)
+    phone = phone_match.group() if phone_match else None
+
+    email_match = EMAIL_PATTERN.search(full_text)
+    email = email_match.group() if email_match else None
+
+    company = _pick_company(parsed) or (extract_company_from_email(email) if email else None)
+
+    exclude_texts = {value for value in (company, email, phone) if value}
+    name = _pick_name(parsed, exclude_texts)
+
+    return {
+        'name': name,
+        'phone': phone,
+        'email': email,
+        'company': company
+    }
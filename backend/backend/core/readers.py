@@ -0,0 +1,172 @@
+import threading
+import time
+from contextlib import contextmanager
+from queue import Queue, Empty
+
+from django.conf import settings
+
+from .metrics import READER_POOL
+
+DEFAULT_LANGUAGES = ('ko', 'en')
+
+
+class ReaderTimeout(Exception):
+    """풀에서 정해진 시간 안에 Reader를 받지 못한 경우"""
+
+
+class ReaderPool:
+    """언어 조합 하나에 대한 EasyOCR Reader 풀 (프로세스 전역 공유)
+
+    Reader는 처음 필요할 때 로드되고, 최대 ``size``개까지만 만들어진다.
+    한 Reader는 한 번에 한 스레드만 사용하도록 checkout/반납 방식으로 관리한다.
+    """
+
+    def __init__(self, languages, size=1, gpu=False):
+        self.languages = tuple(languages)
+        self.size = max(1, int(size))
+        self.gpu = gpu
+        self._idle = Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+        # 통계
+        self.loads = 0
+        self.load_seconds = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.timeouts = 0
+
+    def _load(self):
+        import easyocr  # torch 포함 무거운 import 이므로 실제 로드 시점까지 지연
+
+        started = time.perf_counter()
+        reader = easyocr.Reader(list(self.languages), gpu=self.gpu)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.loads += 1
+            self.load_seconds += elapsed
+        return reader
+
+    def acquire(self, timeout=None):
+        try:
+            reader = self._idle.get_nowait()
+        except Empty:
+            reader = None
+        if reader is not None:
+            with self._lock:
+                self.hits += 1
+            return reader
+
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+                self.misses += 1
+        if can_create:
+            try:
+                return self._load()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        # 풀이 가득 찼으면 다른 요청이 반납할 때까지 대기
+        try:
+            reader = self._idle.get(timeout=timeout)
+        except Empty:
+            with self._lock:
+                self.timeouts += 1
+            raise ReaderTimeout(
+                f"OCR Reader({'+'.join(self.languages)})를 {timeout}초 안에 할당받지 못했습니다."
+            )
+        with self._lock:
+            self.hits += 1
+        return reader
+
+    def release(self, reader):
+        self._idle.put(reader)
+
+    def preload(self):
+        """풀 크기만큼 Reader를 미리 로드"""
+        while True:
+            with self._lock:
+                if self._created >= self.size:
+                    return
+                self._created += 1
+            try:
+                self._idle.put(self._load())
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+    def stats(self):
+        with self._lock:
+            return {
+                'languages': list(self.languages),
+                'size': self.size,
+                'loaded': self._created,
+                'idle': self._idle.qsize(),
+                'loads': self.loads,
+                'load_seconds': round(self.load_seconds, 3),
+                'hits': self.hits,
+                'misses': self.misses,
+                'timeouts': self.timeouts,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _languages(languages=None):
+    return tuple(languages or getattr(settings, 'OCR_LANGUAGES', DEFAULT_LANGUAGES))
+
+
+def get_pool(languages=None):
+    """언어 조합별 풀을 반환 (없으면 생성)"""
+    key = _languages(languages)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = ReaderPool(
+                    key,
+                    size=getattr(settings, 'OCR_READER_POOL_SIZE', 1),
+                    gpu=getattr(settings, 'OCR_USE_GPU', False),
+                )
+                _pools[key] = pool
+    return pool
+
+
+@contextmanager
+def checkout(languages=None, timeout=None):
+    """``with checkout() as reader:`` 형태로 Reader를 빌려 쓰고 자동 반납"""
+    if timeout is None:
+        timeout = getattr(settings, 'OCR_READER_TIMEOUT', 30.0)
+    pool = get_pool(languages)
+    reader = pool.acquire(timeout=timeout)
+    try:
+        yield reader
+    finally:
+        pool.release(reader)
+
+
+def preload(languages=None):
+    get_pool(languages).preload()
+
+
+def stats():
+    return [pool.stats() for pool in list(_pools.values())]
+
+
+def _reader_pool_samples():
+    samples = []
+    for pool_stats in stats():
+        languages = '+'.join(pool_stats['languages'])
+        for stat in ('loaded', 'idle', 'loads', 'load_seconds', 'hits', 'misses', 'timeouts'):
+            samples.append(({'languages': languages, 'stat': stat}, pool_stats[stat]))
+    return samples
+
+
+READER_POOL.set_function(_reader_pool_samples)
@@ -0,0 +1,225 @@
+import hashlib
+import hmac
+import math
+import re
+import unicodedata
+
+from django.conf import settings
+from pymongo import UpdateOne
+
+from .crypto import decrypt_documents, get_index_key
+from .normalize import normalize_company, normalize_email, normalize_name, normalize_phone
+
+# 고객 검색 (GET /api/business-card/search/?q=)
+# 저장할 때 이름/회사명을 검색 토큰으로 쪼개 고객 문서의 search 배열에 넣고 (멀티키 인덱스),
+# 질의도 같은 방식으로 쪼개서 겹치는 토큰 수로 순위를 매긴다.
+# - 한글: 음절 2-gram + 자모(초/중/종성)로 분해한 3-gram (한 글자를 잘못 인식해도 대부분 겹침) + 초성
+# - 영문/숫자: 3-gram + 단어 전체
+# - 전화번호 뒷자리(4자리 이상 접미사)와 이메일은 암호화 필드라 HMAC 토큰으로만 저장
+# 회사명은 normalize_company 로 (쥐/(주)/주식회사 같은 표기 차이를 없앤 뒤 토큰화한다.
+
+_HANGUL_BASE, _HANGUL_LAST = 0xAC00, 0xD7A3
+_CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+_JUNGSEONG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+_JONGSEONG = ' ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ'
+# 한글 음절 / 호환 자모(초성 검색) / 영문·숫자 덩어리
+_RUNS = re.compile(r'[가-힣]+|[ㄱ-ㅎ]+|[a-z0-9]+')
+_PHONE_QUERY = re.compile(r'[\d\s()+-]*\d[\d\s()+-]*')
+MIN_PHONE_SUFFIX = 4
+FIELDS = ('name', 'company', 'email', 'phone')
+
+
+def decompose(text):
+    """한글 음절 → 호환 자모 문자열: '홍길동' → 'ㅎㅗㅇㄱㅣㄹㄷㅗㅇ'"""
+    jamo = []
+    for char in text:
+        code = ord(char) - _HANGUL_BASE
+        if 0 <= code <= _HANGUL_LAST - _HANGUL_BASE:
+            jamo.append(_CHOSEONG[code // 588])
+            jamo.append(_JUNGSEONG[code % 588 // 28])
+            if code % 28:
+                jamo.append(_JONGSEONG[code % 28])
+        else:
+            jamo.append(char)
+    return ''.join(jamo)
+
+
+def choseong(text):
+    return ''.join(_CHOSEONG[(ord(char) - _HANGUL_BASE) // 588] for char in text)
+
+
+def ngrams(text, n):
+    if len(text) <= n:
+        return [text]
+    return [text[i:i + n] for i in range(len(text) - n + 1)]
+
+
+def text_tokens(value):
+    """이름/회사명(정규화한 값) 하나의 검색 토큰 집합"""
+    tokens = set()
+    if not value:
+        return tokens
+    for run in _RUNS.findall(unicodedata.normalize('NFC', value).lower()):
+        tokens.add(run)
+        if '가' <= run[0] <= '힣':
+            tokens.update(ngrams(run, 2))
+            tokens.update(ngrams(decompose(run), 3))
+            initials = choseong(run)
+            tokens.add(initials)
+            tokens.update(ngrams(initials, 2))
+        elif 'ㄱ' <= run[0] <= 'ㅎ':
+            # 초성만 입력한 질의 ('ㅎㄱㄷ')
+            tokens.update(ngrams(run, 2))
+        else:
+            tokens.update(ngrams(run, 3))
+    return tokens
+
+
+def secret_token(kind, value):
+    """암호화 필드용 토큰: HMAC 16진수 (Mongo 텍스트 인덱스가 '-', '_'에서 단어를 자르지 않도록)"""
+    digest = hmac.new(get_index_key(), f'search-{kind}:{value}'.encode(), hashlib.sha256).hexdigest()
+    return f'{kind[0]}{digest[:24]}'
+
+
+def phone_tokens(phone):
+    """전화번호 뒷자리 검색용: 숫자 4자리 이상의 모든 접미사 ('5678', '45678', ..., 전체)"""
+    digits = normalize_phone(phone)
+    if not digits:
+        return set()
+    return {secret_token('phone', digits[start:]) for start in range(len(digits) - MIN_PHONE_SUFFIX + 1)}
+
+
+def search_tokens(customer):
+    """고객 정보(평문) → search 필드에 저장할 토큰 목록"""
+    tokens = text_tokens(normalize_name(customer.get('name')))
+    tokens |= text_tokens(normalize_company(customer.get('company')))
+    tokens |= phone_tokens(customer.get('phone'))
+    email = normalize_email(customer.get('email'))
+    if email:
+        tokens.add(secret_token('email', email))
+    return sorted(tokens)
+
+
+def query_tokens(query):
+    """검색어 → 토큰 목록
+
+    숫자(와 - + 공백 괄호)만 있으면 전화번호 뒷자리, '@'가 있으면 이메일 토큰 하나만 쓰고
+    (n-gram이 섞이면 최소 일치 비율을 못 넘음) 그 밖에는 이름과 회사명 양쪽 규칙으로 쪼갬
+    """
+    query = (query or '').strip()
+    if not query:
+        return []
+    if _PHONE_QUERY.fullmatch(query):
+        digits = normalize_phone(query)
+        return [secret_token('phone', digits)] if len(digits) >= MIN_PHONE_SUFFIX else []
+    if '@' in query:
+        return [secret_token('email', normalize_email(query))]
+    return sorted(text_tokens(normalize_name(query)) | text_tokens(normalize_company(query)))
+
+
+def rarest_tokens(collection, tokens, count, cap):
+    """tokens 중 포함한 문서가 적은 count개 (문서 수는 인덱스로 cap+1 건까지만 셈)"""
+    frequency = {token: collection.count_documents({'search': token}, limit=cap + 1) for token in tokens}
+    return sorted(tokens, key=lambda token: (frequency[token], token))[:count]
+
+
+def search_customers(collection, query, company=None, offset=0, limit=20):
+    """겹치는 토큰이 많은 순 (같으면 먼저 저장된 순)으로 limit개 (+ 다음 페이지 여부용 1개)
+
+    반환: (복호화된 고객 목록 (각 문서에 score 포함), truncated), 질의 토큰이 없으면 ([], False)
+    truncated: 조건에 맞는 고객이 SEARCH_MAX_CANDIDATES 를 넘어 상한 안의 후보만으로 순위를 매김
+    """
+    tokens = query_tokens(query)
+    if not tokens:
+        return [], False
+    match = {}
+    if company and company != "전체":
+        match['company'] = company
+    projection = dict.fromkeys(FIELDS, 1)
+    cap = getattr(settings, 'SEARCH_MAX_CANDIDATES', 5000)
+
+    if getattr(settings, 'SEARCH_ENGINE', 'tokens') == 'text':
+        # 같은 토큰 배열에 만든 텍스트 인덱스 (textScore 로 순위)
+        match['$text'] = {'$search': ' '.join(tokens)}
+        results, matched = _ranked_page(collection, match, {**projection, 'score': {'$meta': 'textScore'}}, cap, offset, limit + 1)
+        return results, matched > cap
+
+    # 질의 토큰의 일정 비율 이상 겹쳐야 결과에 포함 (흔한 2-gram 하나만 겹치는 문서 제외)
+    minimum = max(1, math.ceil(len(tokens) * getattr(settings, 'SEARCH_MIN_MATCH', 0.3)))
+    # search 는 중복 없는 토큰 배열
+    overlap = {'$size': {'$filter': {'input': '$search', 'cond': {'$in': ['$$this', tokens]}}}}
+    rarest = rarest_tokens(collection, tokens, len(tokens) - minimum + 1, cap)
+    # 질의 토큰이 모두 겹치는 고객부터 찾고, 페이지를 못 채우면 최소 일치 수까지 넓혀서 그 뒤를 채움
+    # 토큰이 required개 이상 겹치는 문서는 가장 드문 len(tokens) - required + 1개 중 하나는 반드시 가지므로
+    # 그 토큰들로만 인덱스를 조회해도 빠지는 문서가 없고, 상한은 실제로 조건에 맞는 문서에만 적용된다.
+    results, truncated = [], False
+    wanted, upper = limit + 1, None
+    for required in sorted({len(tokens), minimum}, reverse=True):
+        condition = [{'$gte': [overlap, required]}]
+        if upper:
+            # 앞 단계에서 찾은 (더 많이 겹치는) 문서 제외
+            condition.append({'$lt': [overlap, upper]})
+        stage = {**match, 'search': {'$in': rarest[:len(tokens) - required + 1]}, '$expr': {'$and': condition}}
+        page, matched = _ranked_page(collection, stage, {**projection, 'score': overlap}, cap, offset, wanted)
+        results += page
+        truncated = truncated or matched > cap
+        wanted -= len(page)
+        if not wanted:
+            break
+        # 이 단계의 문서 수만큼 다음 단계에서 건너뛸 수가 줄어듦
+        offset = max(0, offset - min(matched, cap))
+        upper = required
+    return results, truncated
+
+
+def _ranked_page(collection, match, projection, cap, offset, limit):
+    """match 에 맞는 문서 중 cap개까지를 점수 순으로 정렬한 offset 이후 limit개
+
+    반환: (복호화된 문서 목록, match 에 맞는 문서 수 (cap + 1 까지만 셈))
+    """
+    pipeline = [
+        {'$match': match},
+        # 조건에 맞는 후보 수 상한 (지연시간 보장, 넘으면 truncated)
+        {'$limit': cap + 1},
+        {'$project': projection},
+        {'$facet': {
+            'page': [
+                {'$limit': cap},
+                {'$sort': {'score': -1, '_id': 1}},
+                {'$skip': offset},
+                {'$limit': limit},
+            ],
+            'total': [{'$count': 'count'}],
+        }},
+    ]
+    facet = next(collection.aggregate(pipeline))
+    matched = facet['total'][0]['count'] if facet['total'] else 0
+    return decrypt_documents(facet['page']), matched
+
+
+def reindex(collection, batch_size=1000, missing_only=False):
+    """저장된 고객의 검색 토큰을 (다시) 계산, 갱신한 문서 수 반환
+
+    missing_only: 검색 도입 전에 저장되어 search 필드가 없는 문서만
+    """
+    updated = 0
+    batch = []
+    query = {'search': {'$exists': False}} if missing_only else {}
+    projection = dict.fromkeys(FIELDS, 1)
+    for customer in collection.find(query, projection).sort('_id', 1).batch_size(batch_size):
+        batch.append(customer)
+        if len(batch) >= batch_size:
+            updated += _reindex_batch(collection, batch)
+            batch = []
+    if batch:
+        updated += _reindex_batch(collection, batch)
+    return updated
+
+
+def _reindex_batch(collection, customers):
+    # 토큰은 평문으로 계산해야 하므로 묶음 단위로 복호화
+    operations = [
+        UpdateOne({'_id': customer['_id']}, {'$set': {'search': search_tokens(customer)}})
+        for customer in decrypt_documents(customers)
+    ]
+    return collection.bulk_write(operations, ordered=False).modified_count
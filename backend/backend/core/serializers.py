@@ -1,17 +1,19 @@
 from rest_framework import serializers
-from .models import Customer
 from .crypto import decrypt
 
-class CustomerSerializer(serializers.ModelSerializer):
+class CustomerSerializer(serializers.Serializer):
+    """Mongo 고객 문서(dict) 직렬화 (email/phone은 저장 시 암호화되므로 복호화해서 반환)"""
+    id = serializers.SerializerMethodField()
+    name = serializers.CharField(allow_blank=True, allow_null=True, required=False)
+    company = serializers.CharField(allow_blank=True, allow_null=True, required=False)
     email = serializers.SerializerMethodField()
     phone = serializers.SerializerMethodField()
 
-    class Meta:
-        model = Customer
-        fields = ['id', 'name', 'company', 'email', 'phone']
+    def get_id(self, obj):
+        return str(obj['_id'])
 
     def get_email(self, obj):
-        return decrypt(obj.email)
+        return decrypt(obj.get('email'))
 
     def get_phone(self, obj):
-        return decrypt(obj.phone)
\ No newline at end of file
+        return decrypt(obj.get('phone'))
@@ -0,0 +1,100 @@
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+
+from .metrics import STARTUP_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# 서버 시작 후 첫 요청이 모델 로드를 기다리지 않도록 하는 워밍업 + 준비 상태(readiness)
+# AppConfig.ready (OCR_PRELOAD=1) 에서 백그라운드로 실행되고, 끝나기 전까지 /readyz 는 503을 반환한다.
+
+
+def _process_age():
+    """프로세스가 시작된 뒤 지난 시간(초) (리눅스 /proc 기준, 알 수 없으면 0)"""
+    try:
+        with open('/proc/self/stat') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf('SC_CLK_TCK'))
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0.0
+
+
+_started = time.perf_counter() - _process_age()
+_lock = threading.Lock()
+_done = threading.Event()
+_error = None
+timings = {}  # 단계 -> 초
+
+
+def _record(phase, elapsed):
+    timings[phase] = round(elapsed, 3)
+    STARTUP_SECONDS.set(elapsed, phase=phase)
+
+
+def mark_booted():
+    """프로세스 시작부터 Django 설정/앱 로드가 끝날 때까지"""
+    _record('boot', time.perf_counter() - _started)
+
+
+def warm_up():
+    """OCR 스택 import → Reader 로드 → 빈 이미지로 추론 1회 (여러 번 호출해도 한 번만 실행)
+
+    반환: 단계별 소요 시간(초)
+    """
+    global _error
+    with _lock:
+        if _done.is_set():
+            return timings
+        try:
+            started = time.perf_counter()
+            import numpy as np
+            from . import ocr, readers
+            _record('import', time.perf_counter() - started)
+
+            started = time.perf_counter()
+            readers.preload()
+            _record('model_load', time.perf_counter() - started)
+
+            started = time.perf_counter()
+            with readers.checkout() as reader:
+                reader.readtext(ocr.preprocess_image(np.full((64, 256, 3), 255, dtype=np.uint8), normalize=False))
+            _record('first_inference', time.perf_counter() - started)
+        except Exception as e:
+            _error = e
+            logger.exception("OCR warm-up failed")
+            raise
+        _record('ready', time.perf_counter() - _started)
+        _error = None
+        _done.set()
+        logger.info("OCR warm-up finished", extra={'startup': dict(timings)})
+    return timings
+
+
+def warm_up_in_background():
+    def _run():
+        try:
+            warm_up()
+        except Exception:
+            pass  # warm_up에서 기록함, /readyz 가 오류를 보고
+    threading.Thread(target=_run, name='ocr-warmup', daemon=True).start()
+
+
+def readiness():
+    """(준비 여부, 상태 dict): 워밍업이 필요한데 끝나지 않았거나 Mongo에 연결할 수 없으면 준비 안 됨"""
+    checks = {}
+    if getattr(settings, 'OCR_PRELOAD', False):
+        checks['ocr'] = 'ok' if _done.is_set() else ('error: %s' % _error if _error else 'warming_up')
+    try:
+        from .mongo import client
+        client.admin.command('ping')
+        checks['mongo'] = 'ok'
+    except Exception as e:
+        checks['mongo'] = f'error: {e}'
+    ready = all(value == 'ok' for value in checks.values())
+    return ready, {'status': 'ready' if ready else 'starting', 'checks': checks, 'startup_seconds': dict(timings)}
@@ -0,0 +1,102 @@
+import os
+import random
+
+# 벤치마크용 가상 명함 생성 (manage.py make_bench_corpus)
+# 정답(name/phone/email/company)과 명함에 적힌 텍스트 줄(lines)을 함께 만들고,
+# Pillow가 있으면 이미지로도 그린다. 한글 명함은 한글 글꼴(TTF/OTF)이 있어야 그릴 수 있다.
+
+SURNAMES = ['김', '이', '박', '최', '정', '강', '조', '윤', '장', '임', '한', '오', '서', '신', '권', '황', '홍']
+GIVEN_SYLLABLES = ['민', '서', '지', '현', '준', '영', '수', '우', '은', '하', '도', '윤', '예', '진', '성', '길', '동', '희']
+ROMANIZED = {
+    '김': 'kim', '이': 'lee', '박': 'park', '최': 'choi', '정': 'jung', '강': 'kang', '조': 'cho', '윤': 'yoon',
+    '장': 'jang', '임': 'lim', '한': 'han', '오': 'oh', '서': 'seo', '신': 'shin', '권': 'kwon', '황': 'hwang', '홍': 'hong',
+}
+ENGLISH_FIRST = ['John', 'Emily', 'Michael', 'Sarah', 'David', 'Grace', 'Daniel', 'Olivia', 'James', 'Sophia']
+ENGLISH_LAST = ['Smith', 'Johnson', 'Brown', 'Miller', 'Davis', 'Wilson', 'Taylor', 'Clark', 'Lewis', 'Walker']
+COMPANY_STEMS = [('한빛소프트', 'hanbit'), ('가나다전자', 'ganada'), ('미래물산', 'mirae'), ('푸른바다', 'blue-sea'),
+                 ('새솔테크', 'saesol'), ('다온식품', 'daon'), ('누리건설', 'nuri')]
+ENGLISH_COMPANIES = [('Acme', 'acme'), ('Globex', 'globex'), ('Initech', 'initech'), ('Umbrella', 'umbrella'),
+                     ('Stark', 'stark'), ('Wayne', 'wayne')]
+KOREAN_TITLES = ['영업팀 과장', '개발팀 팀장', '대표이사', '마케팅 대리', '연구소 선임연구원', '경영지원 부장']
+ENGLISH_TITLES = ['Sales Manager', 'Software Engineer', 'CEO', 'Marketing Lead', 'Product Designer']
+ADDRESSES = ['서울특별시 강남구 테헤란로 123', '경기도 성남시 분당구 판교역로 45', '부산광역시 해운대구 센텀중앙로 7',
+             '서울특별시 서초구 헌릉로 12']
+TLDS = ['co.kr', 'com', 'kr', 'net']
+
+# 자주 쓰이는 한글 글꼴 위치 (--font 를 주지 않았을 때 차례로 찾음)
+FONT_CANDIDATES = [
+    '/usr/share/fonts/truetype/nanum/NanumGothic.ttf',
+    '/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc',
+    '/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc',
+    '/System/Library/Fonts/AppleSDGothicNeo.ttc',
+    'C:/Windows/Fonts/malgun.ttf',
+]
+
+
+def _mobile(rng):
+    return f'010-{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}'
+
+
+def _office(rng):
+    return f'02-{rng.randint(100, 9999)}-{rng.randint(1000, 9999)}'
+
+
+def korean_card(rng):
+    surname = rng.choice(SURNAMES)
+    name = surname + ''.join(rng.sample(GIVEN_SYLLABLES, 2))
+    stem, domain = rng.choice(COMPANY_STEMS)
+    company = rng.choice([f'(주){stem}', f'주식회사 {stem}', f'유한회사 {stem}'])
+    email = f'{ROMANIZED[surname]}{rng.randint(1, 99)}@{domain}.{rng.choice(TLDS)}'
+    phone = _mobile(rng)
+    lines = [company, name, rng.choice(KOREAN_TITLES), f'M {phone}', email, rng.choice(ADDRESSES)]
+    if rng.random() < 0.5:
+        lines.insert(4, f'Tel {_office(rng)}')
+    return {'name': name, 'phone': phone, 'email': email, 'company': company, 'lines': lines}
+
+
+def english_card(rng):
+    first, last = rng.choice(ENGLISH_FIRST), rng.choice(ENGLISH_LAST)
+    stem, domain = rng.choice(ENGLISH_COMPANIES)
+    suffix = rng.choice(['Inc', 'Co.', 'Ltd', 'LLC'])
+    company = f'{stem} {suffix} Korea'
+    email = f'{first.lower()}.{last.lower()}@{domain}.com'
+    phone = _mobile(rng)
+    lines = [f'{first} {last}', rng.choice(ENGLISH_TITLES), company, phone, email, f'www.{domain}.com']
+    return {'name': f'{first} {last}', 'phone': phone, 'email': email, 'company': company, 'lines': lines}
+
+
+def generate_cards(count, seed=0, languages=('ko', 'en')):
+    """정답 + 텍스트 줄이 담긴 가상 명함 count개 (seed가 같으면 항상 같은 결과)"""
+    rng = random.Random(seed)
+    makers = [maker for language, maker in (('ko', korean_card), ('en', english_card)) if language in languages]
+    return [rng.choice(makers)(rng) for _ in range(count)]
+
+
+def find_font(path=None):
+    for candidate in ([path] if path else FONT_CANDIDATES):
+        if candidate and os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def render_card(lines, font_path=None, size=(900, 500), seed=0):
+    """텍스트 줄을 흰 배경 명함 이미지(PNG 바이트)로 그림 (약간의 기울기/잡음 포함)"""
+    import io
+    from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+    rng = random.Random(seed)
+    image = Image.new('RGB', size, 'white')
+    draw = ImageDraw.Draw(image)
+    y = 40
+    for index, text in enumerate(lines):
+        font_size = 44 if index < 2 else 28
+        font = ImageFont.truetype(font_path, font_size) if font_path else ImageFont.load_default()
+        draw.text((50 + rng.randint(0, 20), y), text, fill=(20, 20, 20), font=font)
+        y += font_size + 20
+    image = image.rotate(rng.uniform(-2, 2), expand=True, fillcolor='white')
+    if rng.random() < 0.5:
+        image = image.filter(ImageFilter.GaussianBlur(radius=0.8))
+
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
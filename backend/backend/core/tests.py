@@ -1,3 +1,965 @@
-from django.test import TestCase
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+import zipfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from bson import ObjectId
+from mongomock.collection import BulkOperationBuilder
+from cryptography.fernet import Fernet, InvalidToken
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import AsyncRequestFactory, Client, SimpleTestCase, override_settings
+from django.utils import timezone
+
+from . import async_models, async_views, bench, cache, crypto, dedup, events, jobs, metrics, models, ocr, search, transfer
+from .mongo import db
+from .normalize import annotate, email_key, index_fields, normalize_company, normalize_name, normalize_phone, phone_key
+from .parser import extract_info
+from .workers import PoolSaturated
+from .views import decode_cursor, encode_cursor, stream_page
+
+
+def ocr_lines(*lines):
+    """readtext 결과와 같은 (box, text, confidence) 형태"""
+    return [(None, line, 1.0) for line in lines]
+
+
+def streamed_json(response):
+    return json.loads(b''.join(response.streaming_content))
+
+
+# manage.py test 는 settings.TESTING 으로 mongomock 을 쓰므로 mongod 없이 실행된다.
+class MongoTestCase(SimpleTestCase):
+    def setUp(self):
+        db.customers.drop()
+        models.invalidate_company_facets()
+
+    def store(self, **customer):
+        """save_customers 의 중복 검사 없이 저장된 형태 그대로 넣음"""
+        return db.customers.insert_one(models.stored_document(annotate(customer))).inserted_id
+
+    def allow_bulk_update_sort(self):
+        """pymongo 4.9+ 가 bulk_write 의 UpdateOne 에 넘기는 sort 인자를 mongomock 이 받지 못하므로 뺌"""
+        add_update = BulkOperationBuilder.add_update
+
+        def without_sort(builder, *args, sort=None, **kwargs):
+            return add_update(builder, *args, **kwargs)
+
+        patcher = mock.patch.object(BulkOperationBuilder, 'add_update', without_sort)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class ParserTests(SimpleTestCase):
+    def test_korean_card(self):
+        info = extract_info(ocr_lines(
+            '(주)한빛소프트', '홍길동', 'Gildong Hong', '영업팀 과장', '010-1234-5678',
+            'gildong@hanbit.co.kr', '서울특별시 강남구 테헤란로 123',
+        ))
+        self.assertEqual(info, {
+            'name': '홍길동', 'phone': '010-1234-5678', 'email': 'gildong@hanbit.co.kr', 'company': '(주)한빛소프트',
+        })
+
+    def test_contacts_and_company_suffix(self):
+        info = extract_info(ocr_lines('대표이사', '박영희 Park', '유한회사 테스트', '031-555-1234', 'park@test.kr'))
+        self.assertEqual(info['phone'], '031-555-1234')
+        self.assertEqual(info['email'], 'park@test.kr')
+        self.assertEqual(info['company'], '유한회사 테스트')
+
+    def test_empty_result(self):
+        info = extract_info([])
+        self.assertFalse(any(info.values()))
+
+
+class CursorTests(SimpleTestCase):
+    def test_cursor_round_trip(self):
+        object_id = ObjectId()
+        self.assertEqual(decode_cursor(encode_cursor(object_id)), object_id)
+        self.assertIsNone(decode_cursor(''))
+
+    def test_stream_page(self):
+        ids = [ObjectId() for _ in range(3)]
+        # find_customers 는 limit+1 건을 조회하므로 마지막 문서는 다음 페이지 존재 표시로만 쓰임
+        page = json.loads(''.join(stream_page(({'_id': object_id, 'name': '홍길동'} for object_id in ids), 2)))
+        self.assertEqual([customer['_id'] for customer in page['results']], [str(object_id) for object_id in ids[:2]])
+        self.assertEqual(decode_cursor(page['next']), ids[1])
+
+        page = json.loads(''.join(stream_page(iter([{'_id': ids[0]}]), 2)))
+        self.assertEqual(len(page['results']), 1)
+        self.assertIsNone(page['next'])
+
+    def test_invalid_cursor(self):
+        response = Client().get('/api/business-card/list/', {'cursor': '!!'})
+        self.assertEqual(response.status_code, 400)
+
+
+class CustomerListTests(MongoTestCase):
+    def test_pages_cover_every_customer_once(self):
+        ids = [self.store(name=f'고객{index}', company='한빛', email=f'c{index}@x.com') for index in range(5)]
+        client = Client()
+        seen, cursor = [], None
+        while True:
+            params = {'limit': 2, **({'cursor': cursor} if cursor else {})}
+            response = client.get('/api/business-card/list/', params)
+            self.assertEqual(response.status_code, 200)
+            page = streamed_json(response)
+            seen += [customer['_id'] for customer in page['results']]
+            cursor = page['next']
+            if cursor is None:
+                break
+        self.assertEqual(seen, [str(object_id) for object_id in ids])
+        # 응답에는 내부용 필드가 없고 개인정보는 복호화되어 있음
+        customer = streamed_json(client.get('/api/business-card/list/', {'limit': 1}))['results'][0]
+        self.assertEqual(customer['email'], 'c0@x.com')
+        self.assertNotIn('norm', customer)
+        self.assertNotIn('search', customer)
+
+    def test_company_filter_and_fields(self):
+        self.store(name='홍길동', company='한빛', email='gd@hanbit.co.kr')
+        self.store(name='김민수', company='삼성', email='ms@samsung.com')
+        page = streamed_json(Client().get('/api/business-card/list/', {'company': '한빛', 'fields': 'name,unknown'}))
+        self.assertEqual([set(customer) for customer in page['results']], [{'_id', 'name'}])
+
+
+class AsyncModelsTests(MongoTestCase):
+    """mongomock 에서는 동기 함수를 스레드에서 실행하는 경로를 탄다"""
+
+    def test_insert_list_delete(self):
+        async_to_sync(async_models.insert_customer)({'name': '홍길동', 'company': '한빛'})
+
+        async def collect():
+            return [customer async for customer in async_models.iter_customers('한빛', fields=['name'])]
+
+        customers = async_to_sync(collect)()
+        self.assertEqual([customer['name'] for customer in customers], ['홍길동'])
+        self.assertEqual(async_to_sync(async_models.delete_customer)(str(customers[0]['_id'])), 1)
+        self.assertEqual(db.customers.count_documents({}), 0)
+
+
+class AsyncViewTests(MongoTestCase):
+    """CORE_ASYNC_VIEWS 로 연결되는 비동기 뷰 (URLconf 는 기본 설정으로 로드되므로 뷰를 직접 호출)"""
+    card = {'name': '홍길동', 'company': '한빛', 'email': 'gd@hanbit.co.kr', 'phone': '010-1234-5678'}
+
+    def upload(self, pool, path='/api/business-card/?no_cache=1'):
+        request = AsyncRequestFactory().post(path, {'image': SimpleUploadedFile('card.png', b'image bytes')})
+        with mock.patch.object(async_views, 'get_pool', return_value=pool):
+            response = async_to_sync(async_views.AsyncBusinessCardUploadView.as_view())(request)
+        return response, json.loads(response.content)
+
+    def pool(self, **kwargs):
+        pool = mock.Mock()
+        pool.arecognize = mock.AsyncMock(**kwargs)
+        return pool
+
+    def test_upload_and_upsert(self):
+        pool = self.pool(side_effect=lambda source, mode: {**self.card, 'ocr_stats': None})
+        response, customer = self.upload(pool)
+        self.assertEqual((response.status_code, customer['action']), (201, 'inserted'))
+        self.assertEqual(pool.arecognize.call_args.args, (b'image bytes', 'full'))
+        self.assertNotIn('norm', customer)
+
+        response, again = self.upload(pool, '/api/business-card/?no_cache=1&upsert=1')
+        self.assertEqual((response.status_code, again['action'], again['_id']), (200, 'updated', customer['_id']))
+        self.assertEqual(len(models.get_customers()), 1)
+
+    def test_saturated_pool_and_failure(self):
+        response, body = self.upload(self.pool(side_effect=PoolSaturated()))
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        response, body = self.upload(self.pool(side_effect=ValueError('bad image')))
+        self.assertEqual((response.status_code, body['error']), (422, '명함 인식 실패: bad image'))
+        self.assertEqual(db.customers.count_documents({}), 0)
+
+    def test_list_and_delete(self):
+        ids = [self.store(name=f'고객{index}', company='한빛', email=f'c{index}@x.com') for index in range(3)]
+        view = async_views.AsyncCustomerListView.as_view()
+
+        async def page(params):
+            response = await view(AsyncRequestFactory().get('/api/business-card/list/', params))
+            return json.loads(''.join([chunk.decode() async for chunk in response.streaming_content]))
+
+        first = async_to_sync(page)({'limit': 2})
+        self.assertEqual([customer['_id'] for customer in first['results']], [str(object_id) for object_id in ids[:2]])
+        self.assertEqual(first['results'][0]['email'], 'c0@x.com')
+        second = async_to_sync(page)({'limit': 2, 'cursor': first['next']})
+        self.assertEqual(([customer['_id'] for customer in second['results']], second['next']), ([str(ids[2])], None))
+        self.assertEqual(async_to_sync(view)(AsyncRequestFactory().get('/', {'limit': 'x'})).status_code, 400)
+
+        delete = async_views.AsyncCustomerDeleteView.as_view()
+        request = AsyncRequestFactory().delete(f'/api/business-card/{ids[0]}/')
+        self.assertEqual(async_to_sync(delete)(request, customer_id=str(ids[0])).status_code, 204)
+        self.assertEqual(async_to_sync(delete)(request, customer_id=str(ids[0])).status_code, 404)
+        self.assertEqual(async_to_sync(delete)(request, customer_id='invalid').status_code, 404)
+
+class NormalizeTests(SimpleTestCase):
+    def test_phone(self):
+        self.assertEqual(normalize_phone('+82 10-1234-5678'), '01012345678')
+        self.assertEqual(normalize_phone('010.1234.5678'), '01012345678')
+        self.assertIsNone(normalize_phone(''))
+
+    def test_company_legal_suffixes(self):
+        for company in ('(주)한빛소프트', '(쥐한빛소프트', '주식회사 한빛소프트', '(주) 한빛 소프트'):
+            self.assertEqual(normalize_company(company), '한빛소프트', company)
+
+    def test_name(self):
+        self.assertEqual(normalize_name('홍 길동'), '홍길동')
+
+    def test_blind_index_is_stable_across_formats(self):
+        self.assertEqual(phone_key('010-1234-5678'), phone_key('+82 10 1234 5678'))
+        self.assertEqual(email_key('GD@Hanbit.co.kr '), email_key('gd@hanbit.co.kr'))
+        # 필드마다 다른 키 (같은 값이라도 이메일/전화번호 인덱스가 겹치지 않음)
+        self.assertNotEqual(crypto.blind_index('x', 'email'), crypto.blind_index('x', 'phone'))
+
+    def test_index_fields_never_store_plain_contacts(self):
+        norm = index_fields({'name': '홍길동', 'company': '(주)한빛', 'email': 'gd@hanbit.co.kr', 'phone': '010-1234-5678'})
+        self.assertEqual(norm['email'], email_key('gd@hanbit.co.kr'))
+        self.assertNotIn('01012345678', norm.values())
+
+
+class CryptoRotationTests(SimpleTestCase):
+    old_key = Fernet.generate_key()
+    new_key = Fernet.generate_key()
+
+    def tearDown(self):
+        crypto.reset_keys()
+
+    def use_keys(self, *keys, blind_index_key='test-index'):
+        override = override_settings(FIELD_ENCRYPTION_KEYS=list(keys), BLIND_INDEX_KEY=blind_index_key)
+        override.enable()
+        self.addCleanup(override.disable)
+        crypto.reset_keys()
+
+    def test_rotate_to_new_key(self):
+        self.use_keys(self.old_key)
+        token = crypto.encrypt('010-1234-5678')
+        index = phone_key('010-1234-5678')
+
+        self.use_keys(self.new_key, self.old_key)
+        self.assertEqual(crypto.decrypt(token), '010-1234-5678')
+        rotated = crypto.rotate(token)
+        # 블라인드 인덱스는 암호화 키와 무관 (키를 바꿔도 중복 판별/검색이 그대로 동작)
+        self.assertEqual(phone_key('010-1234-5678'), index)
+
+        self.use_keys(self.new_key)
+        self.assertEqual(crypto.decrypt(rotated), '010-1234-5678')
+        with self.assertRaises(InvalidToken):
+            crypto.decrypt(token)
+
+    def test_plaintext_is_encrypted_on_rotate(self):
+        self.use_keys(self.new_key)
+        rotated = crypto.rotate('gd@hanbit.co.kr')
+        self.assertTrue(crypto.is_encrypted(rotated))
+        self.assertEqual(crypto.decrypt('gd@hanbit.co.kr'), 'gd@hanbit.co.kr')
+
+    def test_blind_index_changes_with_its_key(self):
+        self.use_keys(self.new_key, blind_index_key='first')
+        first = email_key('gd@hanbit.co.kr')
+        self.use_keys(self.new_key, blind_index_key='second')
+        self.assertNotEqual(email_key('gd@hanbit.co.kr'), first)
+
+
+class SaveCustomersTests(MongoTestCase):
+    def setUp(self):
+        super().setUp()
+        models.ensure_indexes()
+        self.allow_bulk_update_sort()
+        subscription = events.subscribe()
+        self.addCleanup(events.unsubscribe, subscription)
+        self.events = subscription
+
+    def published(self):
+        received = []
+        while (event := self.events.get(0)) is not None:
+            received.append(event)
+        return [(event['type'], event['_id']) for event in received]
+
+    def test_insert_and_duplicates_in_batch(self):
+        documents = [
+            {'name': '홍길동', 'company': '한빛', 'email': 'gd@hanbit.co.kr', 'phone': '010-1234-5678'},
+            {'name': '홍길동', 'company': None, 'email': None, 'phone': '+82 10-1234-5678'},
+            {'name': '김민수', 'company': '삼성', 'email': 'ms@samsung.com', 'phone': None},
+        ]
+        self.assertEqual(models.save_customers(documents), ['inserted', 'duplicate', 'inserted'])
+        self.assertEqual(documents[1]['_id'], documents[0]['_id'])
+        stored = db.customers.find_one({'_id': documents[0]['_id']})
+        self.assertTrue(crypto.is_encrypted(stored['email']))
+        self.assertIn('홍길동', stored['search'])
+        self.assertEqual(self.published(), [('insert', str(documents[0]['_id'])), ('insert', str(documents[2]['_id']))])
+
+        # 다시 저장하면 기존 문서와 중복
+        again = [{'name': '김민수', 'company': '삼성', 'email': 'MS@samsung.com', 'phone': None}]
+        self.assertEqual(models.save_customers(again), ['duplicate'])
+        self.assertEqual(db.customers.count_documents({}), 2)
+
+    def test_upsert_updates_existing_and_pending(self):
+        existing = self.store(name='홍길동', company='한빛', email='gd@hanbit.co.kr', phone=None)
+        documents = [
+            {'name': None, 'company': '한빛소프트', 'email': 'gd@hanbit.co.kr', 'phone': '010-1234-5678'},
+            {'name': '김민수', 'company': '삼성', 'email': 'ms@samsung.com', 'phone': None},
+            # 같은 배치에서 앞서 새로 저장할 문서를 갱신
+            {'name': None, 'company': None, 'email': 'ms@samsung.com', 'phone': '010-9999-8888'},
+        ]
+        self.assertEqual(models.save_customers(documents, upsert=True), ['updated', 'inserted', 'updated'])
+        self.assertEqual(documents[0]['_id'], existing)
+
+        customers = {customer['email']: customer for customer in models.get_customers()}
+        self.assertEqual(len(customers), 2)
+        # 값이 있는 필드만 덮어씀
+        self.assertEqual(
+            {field: customers['gd@hanbit.co.kr'][field] for field in ('name', 'company', 'phone')},
+            {'name': '홍길동', 'company': '한빛소프트', 'phone': '010-1234-5678'},
+        )
+        self.assertEqual(customers['ms@samsung.com']['phone'], '010-9999-8888')
+        # 검색 토큰은 합친 결과로 다시 계산
+        self.assertEqual([r['_id'] for r in models.search_customers('한빛소프트')[0]], [existing])
+        self.assertEqual(self.published()[0], ('update', str(existing)))
+
+    def test_concurrent_insert_is_reported_as_duplicate(self):
+        document = {'name': '홍길동', 'company': '한빛', 'email': 'gd@hanbit.co.kr', 'phone': None}
+        self.store(**dict(document))
+        # 기존 문서 조회 뒤 bulk_write 전에 다른 요청이 같은 연락처를 저장한 경우
+        with mock.patch.object(db.customers, 'find', return_value=iter([])):
+            self.assertEqual(models.save_customers([document]), ['duplicate'])
+        self.assertEqual(db.customers.count_documents({}), 1)
+        self.assertEqual(self.published(), [])
+
+    def test_save_customer_upsert(self):
+        existing = self.store(name='홍길동', company='한빛', email=None, phone='010-1234-5678')
+        self.assertEqual(
+            models.save_customer({'name': '홍길동', 'company': '한빛소프트', 'email': None, 'phone': '01012345678'}),
+            (existing, 'duplicate'),
+        )
+        self.assertEqual(
+            models.save_customer({'name': None, 'company': '한빛소프트', 'email': None, 'phone': '01012345678'}, upsert=True),
+            (existing, 'updated'),
+        )
+        self.assertEqual(models.get_customers()[0]['company'], '한빛소프트')
+        customer_id, action = models.save_customer({'name': '김민수', 'company': None, 'email': 'ms@x.com', 'phone': None})
+        self.assertEqual(action, 'inserted')
+        self.assertEqual(db.customers.count_documents({}), 2)
+
+class TransferTests(MongoTestCase):
+    customers = [
+        {'name': '홍길동', 'company': '한빛, Inc.', 'email': 'gd@hanbit.co.kr', 'phone': '010-1234-5678'},
+        {'name': 'Kim; Minsu', 'company': '삼성전자', 'email': None, 'phone': '02-555-1234'},
+        {'name': '이영희', 'company': None, 'email': 'yh@example.com', 'phone': None},
+    ]
+
+    def setUp(self):
+        super().setUp()
+        models.ensure_indexes()
+        self.allow_bulk_update_sort()
+
+    def exported(self, export_format):
+        response = Client().get('/api/business-card/export/', {'type': export_format})
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def import_file(self, filename, content, **params):
+        upload = SimpleUploadedFile(filename, content)
+        response = Client().post('/api/business-card/import/', {'file': upload, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def stored(self):
+        return sorted(
+            ({field: customer.get(field) or None for field in models.CUSTOMER_FIELDS} for customer in models.get_customers()),
+            key=lambda customer: customer['name'],
+        )
+
+    def test_round_trip(self):
+        expected = sorted(self.customers, key=lambda customer: customer['name'])
+        for export_format in ('csv', 'jsonl', 'vcf'):
+            # 작은 파일은 메모리, 큰 파일은 임시 파일로 받으므로 두 경우 모두 TextIOWrapper 로 읽혀야 함
+            for max_memory_size in (2 ** 20, 0):
+                with self.subTest(export_format=export_format, max_memory_size=max_memory_size):
+                    db.customers.drop()
+                    models.ensure_indexes()
+                    models.save_customers([dict(customer) for customer in self.customers])
+                    content = self.exported(export_format)
+                    db.customers.drop()
+                    models.ensure_indexes()
+                    with self.settings(FILE_UPLOAD_MAX_MEMORY_SIZE=max_memory_size):
+                        result = self.import_file(f'customers.{export_format}', content)
+                    self.assertEqual(result, {'read': 3, 'inserted': 3, 'updated': 0, 'duplicates': 0, 'invalid': 0})
+                    self.assertEqual(self.stored(), expected)
+
+    def test_csv_export_has_bom_and_header(self):
+        models.save_customers([dict(self.customers[0])])
+        lines = self.exported('csv').decode('utf-8').splitlines()
+        self.assertEqual(lines[0], '\ufeffid,name,company,email,phone')
+        self.assertIn('"한빛, Inc."', lines[1])
+
+    def test_import_skips_duplicates_and_invalid_records(self):
+        models.save_customers([dict(self.customers[0])])
+        content = '\n'.join([
+            json.dumps({'name': '홍길동', 'email': 'GD@hanbit.co.kr', 'company': '한빛소프트'}, ensure_ascii=False),
+            'not json',
+            json.dumps({'name': '', 'email': None}),
+            json.dumps({'name': '박민수', 'phone': '010-2222-3333'}, ensure_ascii=False),
+            json.dumps({'name': '박민수', 'phone': '+82 10 2222 3333'}, ensure_ascii=False),
+        ]).encode()
+        self.assertEqual(
+            transfer.import_records(transfer.parse_records(io.BytesIO(content), 'jsonl'), batch_size=2),
+            {'read': 5, 'inserted': 1, 'updated': 0, 'duplicates': 2, 'invalid': 2},
+        )
+        result = self.import_file('customers.jsonl', content, upsert='1')
+        self.assertEqual((result['inserted'], result['updated'], result['duplicates']), (0, 3, 0))
+        self.assertEqual(models.get_customers()[0]['company'], '한빛소프트')
+
+    def test_folded_vcard(self):
+        content = (
+            'BEGIN:VCARD\r\nVERSION:3.0\r\nFN:홍길\r\n 동\r\nORG:한빛\\, Inc.;영업팀\r\n'
+            'item1.EMAIL;TYPE=INTERNET:gd@hanbit.co.kr\r\nEND:VCARD\r\n'
+        ).encode()
+        self.assertEqual(list(transfer.parse_records(io.BytesIO(content), 'vcf')), [
+            {'name': '홍길동', 'company': '한빛, Inc.', 'email': 'gd@hanbit.co.kr', 'phone': None},
+        ])
+
+    def test_unknown_type(self):
+        response = Client().post('/api/business-card/import/', {'file': SimpleUploadedFile('customers.txt', b'')})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Client().get('/api/business-card/export/', {'type': 'xml'}).status_code, 400)
+
+class DedupTests(MongoTestCase):
+    def test_same_email_is_merged(self):
+        keep = self.store(name='홍길동', company='(주)한빛', email='gd@hanbit.co.kr', phone=None)
+        self.store(name='홍길동', company='한빛', email='GD@hanbit.co.kr', phone='010-1234-5678')
+
+        result = dedup.deduplicate(['email'])
+
+        self.assertEqual(result['removed'], 1)
+        merged = models.get_customers()
+        self.assertEqual(len(merged), 1)
+        self.assertEqual(merged[0]['_id'], keep)
+        # 비어 있던 전화번호는 병합된 문서 값으로 채워짐
+        self.assertEqual(merged[0]['phone'], '010-1234-5678')
+
+    def test_dry_run_keeps_documents(self):
+        self.store(name='홍길동', company='한빛', email=None, phone='010-1234-5678')
+        self.store(name='홍길동', company='한빛', email=None, phone='+82 10 1234 5678')
+        self.assertEqual(dedup.deduplicate(['phone'], dry_run=True)['duplicates'], 1)
+        self.assertEqual(len(models.get_customers()), 2)
+
+    def test_namesakes_with_different_contacts_are_kept(self):
+        self.store(name='김민수', company='(주)삼성전자', email='ms1@samsung.com', phone='010-1111-2222')
+        self.store(name='김민수', company='삼성전자', email='ms2@samsung.com', phone='010-3333-4444')
+
+        self.assertEqual(dedup.find_clusters(['email', 'phone', 'name_company']), [])
+        self.assertEqual(dedup.deduplicate(['name_company'])['removed'], 0)
+        self.assertEqual(len(models.get_customers()), 2)
+
+    def test_name_company_match_without_conflict(self):
+        first = self.store(name='김민수', company='(주)삼성전자', email='ms1@samsung.com', phone=None)
+        second = self.store(name='김민수', company='삼성전자', email=None, phone=None)
+        self.assertEqual(dedup.find_clusters(['name_company']), [[first, second]])
+
+    def test_name_company_does_not_bridge_conflicting_contacts(self):
+        # 연락처 없는 문서가 서로 다른 연락처의 두 동명이인을 하나로 잇지 않아야 함
+        self.store(name='김민수', company='삼성전자', email='ms1@samsung.com', phone=None)
+        self.store(name='김민수', company='삼성전자', email=None, phone=None)
+        self.store(name='김민수', company='삼성전자', email='ms2@samsung.com', phone=None)
+        clusters = dedup.find_clusters(['name_company'])
+        self.assertEqual([len(ids) for ids in clusters], [2])
+
+    def test_same_person(self):
+        self.assertTrue(dedup.same_person({'phone': 'p'}, {'phone': 'p', 'email': 'x'}))
+        self.assertFalse(dedup.same_person({'name': 'a', 'company': 'c', 'email': 'x'}, {'name': 'a', 'company': 'c', 'email': 'y'}))
+        self.assertTrue(dedup.same_person({'name': 'a', 'company': 'c', 'email': 'x'}, {'name': 'a', 'company': 'c'}))
+        self.assertFalse(dedup.same_person({'name': None, 'company': None}, {'name': None, 'company': None}))
+
+
+class BenchScoreTests(SimpleTestCase):
+    labels = {
+        'a.png': {'name': '홍길동', 'phone': '010-1234-5678', 'email': 'gd@hanbit.co.kr', 'company': ''},
+        'b.png': {'name': '김민수', 'phone': '02-555-1234'},
+    }
+
+    def test_field_scores(self):
+        predictions = {
+            'a.png': {'name': '홍 길동', 'phone': '+82 10 1234 5678', 'email': None, 'company': '한빛'},
+            'b.png': {'name': '김민서', 'phone': '02 555 1234'},
+        }
+        scores = bench.field_scores(predictions, self.labels)
+        self.assertEqual(scores['phone']['recall'], 1.0)
+        self.assertEqual((scores['name']['tp'], scores['name']['fp'], scores['name']['fn']), (1, 1, 1))
+        self.assertEqual((scores['email']['fn'], scores['email']['precision']), (1, None))
+        # 정답이 비어 있는데 값을 추출하면 FP 만
+        self.assertEqual((scores['company']['fp'], scores['company']['recall']), (1, None))
+
+    def test_field_accuracy_matches_recall_by_filename(self):
+        predictions = {'/data/a.png': {'name': '홍길동', 'phone': '01012345678'}, '/data/c.png': {'name': 'x'}}
+        accuracy = bench.field_accuracy(predictions, self.labels)
+        self.assertEqual(accuracy['name'], 1.0)
+        self.assertEqual(accuracy['phone'], 1.0)
+        self.assertEqual(accuracy['email'], 0.0)
+
+
+class SearchTokenTests(SimpleTestCase):
+    def test_decompose_and_choseong(self):
+        self.assertEqual(search.decompose('홍길동'), 'ㅎㅗㅇㄱㅣㄹㄷㅗㅇ')
+        self.assertEqual(search.choseong('홍길동'), 'ㅎㄱㄷ')
+
+    def tokens(self, **customer):
+        return set(search.search_tokens(customer))
+
+    def test_partial_name_and_initials_overlap(self):
+        stored = self.tokens(name='홍길동', company='(주)한빛소프트')
+        for query in ('길동', '홍길', 'ㅎㄱㄷ', '한빛', '(쥐한빛소프트'):
+            self.assertTrue(set(search.query_tokens(query)) & stored, query)
+
+    def test_one_misread_syllable_still_overlaps_mostly(self):
+        stored = self.tokens(name='홍길동')
+        query = set(search.query_tokens('홍길둥'))
+        self.assertGreaterEqual(len(query & stored) / len(query), 0.3)
+
+    def test_phone_suffix_and_email_are_keyed(self):
+        stored = self.tokens(phone='010-1234-5678', email='GD@hanbit.co.kr')
+        self.assertEqual(len(search.query_tokens('5678')), 1)
+        self.assertTrue(set(search.query_tokens('5678')) <= stored)
+        self.assertTrue(set(search.query_tokens('1234-5678')) <= stored)
+        self.assertTrue(set(search.query_tokens('gd@hanbit.co.kr')) <= stored)
+        # 세 자리 이하는 전화번호 토큰을 만들지 않고, 평문 번호/이메일은 저장하지 않음
+        self.assertEqual(search.query_tokens('678'), [])
+        self.assertFalse({'5678', '01012345678', 'gd@hanbit.co.kr'} & stored)
+
+    def test_stored_document_carries_tokens(self):
+        document = models.stored_document({'name': '홍길동', 'company': '한빛', 'email': 'gd@hanbit.co.kr', 'phone': None})
+        self.assertEqual(document['search'], search.search_tokens({'name': '홍길동', 'company': '한빛', 'email': 'gd@hanbit.co.kr'}))
+        self.assertTrue(crypto.is_encrypted(document['email']))
+
+
+class SearchTests(MongoTestCase):
+    url = '/api/business-card/search/'
+
+    def test_best_match_survives_the_candidate_cap(self):
+        for syllable in '가나다라마바사아자차카타파하':
+            self.store(name=f'홍길{syllable}', company='한빛', email=None, phone=None)
+        # 가장 나중에 저장되어 _id 순으로는 상한 밖에 있는 정확한 이름
+        exact = self.store(name='홍길동', company='한빛', email=None, phone=None)
+        with override_settings(SEARCH_MAX_CANDIDATES=5):
+            results, truncated = search.search_customers(db.customers, '홍길동')
+            self.assertEqual(results[0]['_id'], exact)
+            # 그 뒤의 부분 일치 14건은 상한(5건) 안에서만 순위를 매김
+            self.assertEqual(len(results), 6)
+            self.assertTrue(truncated)
+            # 부분 일치만 있는 질의는 상한을 넘으면 truncated 로 알림
+            response = Client().get(self.url, {'q': '홍길'})
+        self.assertTrue(response.data['truncated'])
+        self.assertEqual(len(response.data['results']), 5)
+        results, truncated = search.search_customers(db.customers, '홍길동')
+        self.assertEqual((len(results), truncated), (15, False))
+
+    def test_pages_are_ranked_and_stable(self):
+        self.store(name='김민수', company='삼성', email=None, phone=None)
+        self.store(name='홍길순', company='한빛', email=None, phone=None)
+        exact = self.store(name='홍길동', company='한빛', email=None, phone=None)
+        client = Client()
+        first = client.get(self.url, {'q': '홍길동', 'limit': 1}).data
+        second = client.get(self.url, {'q': '홍길동', 'limit': 1, 'cursor': first['next']}).data
+        self.assertEqual(first['results'][0]['_id'], str(exact))
+        self.assertEqual(second['results'][0]['name'], '홍길순')
+        self.assertIsNone(second['next'])
+        self.assertFalse(second['truncated'])
+
+    def test_phone_suffix_email_and_company_filter(self):
+        self.store(name='홍길동', company='한빛', email='gd@hanbit.co.kr', phone='010-1234-5678')
+        self.store(name='김민수', company='삼성', email='ms@samsung.com', phone='010-9999-5678')
+        names = lambda query, **params: [c['name'] for c in search.search_customers(db.customers, query, **params)[0]]
+        self.assertEqual(sorted(names('5678')), ['김민수', '홍길동'])
+        self.assertEqual(names('5678', company='삼성'), ['김민수'])
+        self.assertEqual(names('GD@hanbit.co.kr'), ['홍길동'])
+        self.assertEqual(names('678'), [])
+
+
+class EventTests(SimpleTestCase):
+    url = '/api/business-card/events/'
+
+    def poll(self, last_event_id=None):
+        """WSGI 폴링 한 번: (다음에 보낼 Last-Event-ID, 받은 이벤트 목록)"""
+        headers = {} if last_event_id is None else {'HTTP_LAST_EVENT_ID': str(last_event_id)}
+        response = Client().get(self.url, **headers)
+        self.assertEqual(response.status_code, 200)
+        body = b''.join(response.streaming_content).decode()
+        response.close()
+        received = [json.loads(line[len('data: '):]) for line in body.splitlines() if line.startswith('data: ')]
+        return max([int(response['X-Last-Event-Id'])] + [event['id'] for event in received]), received
+
+    def test_event_published_between_polls_is_delivered(self):
+        last_event_id, received = self.poll()
+        self.assertEqual(received, [])
+        customer_id = ObjectId()
+        events.publish('insert', customer_id, {'name': '홍길동', 'company': '한빛', 'norm': {}})
+
+        last_event_id, received = self.poll(last_event_id)
+        self.assertEqual([(event['type'], event['_id']) for event in received], [('insert', str(customer_id))])
+        self.assertEqual(received[0]['customer'], {'_id': str(customer_id), 'name': '홍길동', 'company': '한빛'})
+        self.assertEqual(self.poll(last_event_id)[1], [])
+        self.assertEqual(events.subscriber_count(), 0)
+
+    def test_replay_after_reconnect(self):
+        first = events.publish('insert', ObjectId(), {'company': '한빛'})
+        second = events.publish('delete', ObjectId(), company='한빛')
+        subscription = events.subscribe(None, first['id'] - 1)
+        self.addCleanup(events.unsubscribe, subscription)
+        self.assertEqual([subscription.get(0)['id'], subscription.get(0)['id']], [first['id'], second['id']])
+        self.assertIsNone(subscription.get(0))
+
+    def test_unknown_event_id_resyncs(self):
+        events.publish('insert', ObjectId(), {'company': '한빛'})
+        # 재시작 전 프로세스가 보낸 id, 다른 프로세스가 보낸 (아직 없는) id 모두 이어받을 수 없음
+        for last_event_id in (0, events._epoch - 1, events._last_id() + 1):
+            subscription = events.subscribe(None, last_event_id)
+            self.addCleanup(events.unsubscribe, subscription)
+            self.assertEqual(subscription.get(0)['type'], 'resync', last_event_id)
+            self.assertIsNone(subscription.get(0))
+
+    def test_company_filter(self):
+        subscription = events.subscribe('한빛')
+        self.addCleanup(events.unsubscribe, subscription)
+        events.publish('insert', ObjectId(), {'company': '삼성'})
+        events.publish('insert', ObjectId(), {'company': '한빛'})
+        self.assertEqual(subscription.get(0)['company'], '한빛')
+        self.assertIsNone(subscription.get(0))
+
+
+class JobTests(MongoTestCase):
+    card = {'name': '홍길동', 'company': '한빛', 'email': 'gd@hanbit.co.kr', 'phone': '010-1234-5678'}
+
+    def setUp(self):
+        super().setUp()
+        db.ocr_jobs.drop()
+
+    def wait(self, job_id):
+        for _ in range(200):
+            job = models.get_job(job_id)
+            if job['status'] not in ('queued', 'running'):
+                return job
+            time.sleep(0.01)
+        self.fail(f'job {job_id} did not finish')
+
+    def upload(self, **data):
+        image = SimpleUploadedFile('card.png', b'not decoded by the stub', content_type='image/png')
+        response = Client().post('/api/business-card/?no_cache=1', {'image': image, **data})
+        self.assertEqual(response.status_code, 202)
+        self.wait(response.data['job_id'])
+        return Client().get(response.data['status_url']).data
+
+    def test_upload_job_lifecycle(self):
+        with mock.patch('core.ocr.process_business_card', return_value=dict(self.card)) as recognize:
+            job = self.upload()
+        self.assertEqual(recognize.call_args.args[0], b'not decoded by the stub')
+        self.assertEqual(job['status'], 'done')
+        self.assertEqual(job['action'], 'inserted')
+        self.assertEqual(job['customer']['email'], 'gd@hanbit.co.kr')
+        self.assertEqual(models.get_customers()[0]['phone'], '010-1234-5678')
+        # 작업 문서에 남은 결과도 개인정보는 암호화되어 있음
+        stored = db.ocr_jobs.find_one({'_id': job['job_id']})
+        self.assertTrue(crypto.is_encrypted(stored['result']['email']))
+        self.assertEqual(stored['owner'], jobs.owner_id())
+
+    def test_fast_mode_job_reports_box_stats(self):
+        ocr_stats = {'mode': 'fast', 'phases': 1, 'boxes_total': 9, 'boxes_recognized': 8, 'boxes_skipped': 1}
+        with mock.patch('core.ocr.process_business_card', return_value={**self.card, 'ocr_stats': ocr_stats}) as recognize:
+            job = self.upload(mode='fast')
+        self.assertEqual(recognize.call_args.kwargs, {'mode': 'fast'})
+        self.assertEqual(job['ocr_stats'], ocr_stats)
+        self.assertNotIn('ocr_stats', job['customer'])
+
+    def test_failed_job(self):
+        with mock.patch('core.ocr.process_business_card', side_effect=ValueError('이미지를 읽을 수 없습니다.')):
+            job = self.upload()
+        self.assertEqual((job['status'], job['error']), ('failed', '이미지를 읽을 수 없습니다.'))
+        self.assertEqual(jobs.queue_depth(), 0)
+
+    def test_batch_job(self):
+        outcomes = [dict(self.card), ValueError('bad image')]
+        with mock.patch('core.ocr.process_business_cards', return_value=outcomes):
+            job = self.wait(jobs.submit_batch([b'a', b'b'], ['a.png', 'b.png'], use_cache=False))
+        result = job['result']
+        self.assertEqual((result['total'], result['succeeded'], result['failed']), (2, 1, 1))
+        self.assertEqual([item['status'] for item in result['items']], ['ok', 'failed'])
+        self.assertEqual(result['items'][0]['customer']['email'], 'gd@hanbit.co.kr')
+
+    def test_unknown_job(self):
+        self.assertEqual(Client().get('/api/business-card/jobs/missing/').status_code, 404)
+
+    def test_claim_requires_owner(self):
+        models.create_job('job', 'single', ['a.png'], [None], owner='other')
+        self.assertIsNone(models.claim_job('job', jobs.owner_id()))
+        self.assertEqual(models.claim_job('job', 'other')['_id'], 'job')
+        self.assertIsNone(models.claim_job('job', 'other'))
+
+    def create_stale_job(self, job_id, image_path=None, status='running', heartbeat_age=3600):
+        models.create_job(job_id, 'single', ['a.png'], [image_path], owner='stopped-process')
+        db.ocr_jobs.update_one({'_id': job_id}, {'$set': {
+            'status': status, 'heartbeat_at': timezone.now() - timedelta(seconds=heartbeat_age),
+        }})
+
+    def test_running_job_of_stopped_process_is_rerun(self):
+        fd, path = tempfile.mkstemp(suffix='.png')
+        os.close(fd)
+        self.addCleanup(lambda: os.path.exists(path) and os.remove(path))
+        self.create_stale_job('disk', path)
+        with mock.patch.object(jobs, '_dispatch') as dispatch:
+            jobs._recover('executor')
+        dispatch.assert_called_once_with('executor', 'disk')
+        job = db.ocr_jobs.find_one({'_id': 'disk'})
+        self.assertEqual((job['status'], job['owner']), ('queued', jobs.owner_id()))
+        self.assertIsNotNone(models.claim_job('disk', jobs.owner_id()))
+
+    def test_memory_job_of_stopped_process_fails(self):
+        self.create_stale_job('memory', status='queued')
+        # heartbeat_at 도입 전에 만든 작업은 created_at 기준
+        models.create_job('legacy', 'single', ['a.png'], [None])
+        db.ocr_jobs.update_one({'_id': 'legacy'}, {
+            '$unset': {'heartbeat_at': ''}, '$set': {'created_at': timezone.now() - timedelta(hours=1)},
+        })
+        with mock.patch.object(jobs, '_dispatch') as dispatch:
+            jobs._recover('executor')
+        dispatch.assert_not_called()
+        self.assertEqual({job['status'] for job in db.ocr_jobs.find()}, {'failed'})
+
+    def test_jobs_of_live_processes_are_left_alone(self):
+        # 오래 기다렸어도 heartbeat 가 최근이면 (다른 프로세스가 살아 있음) 건드리지 않음
+        self.create_stale_job('waiting', status='queued', heartbeat_age=1)
+        db.ocr_jobs.update_one({'_id': 'waiting'}, {'$set': {'created_at': timezone.now() - timedelta(hours=1)}})
+        with mock.patch.object(jobs, '_dispatch') as dispatch:
+            jobs._recover('executor')
+        dispatch.assert_not_called()
+        job = db.ocr_jobs.find_one({'_id': 'waiting'})
+        self.assertEqual((job['status'], job['owner']), ('queued', 'stopped-process'))
+
+    def test_heartbeat(self):
+        self.create_stale_job('mine', status='running')
+        db.ocr_jobs.update_one({'_id': 'mine'}, {'$set': {'owner': jobs.owner_id()}})
+        models.heartbeat_jobs(jobs.owner_id())
+        with mock.patch.object(jobs, '_dispatch') as dispatch:
+            jobs._recover('executor')
+        dispatch.assert_not_called()
+        self.assertEqual(db.ocr_jobs.find_one({'_id': 'mine'})['status'], 'running')
+
+
+def card_image(name):
+    """같은 양식에 이름만 다른 명함 이미지"""
+    import cv2
+    import numpy as np
+
+    image = np.full((300, 600, 3), 255, dtype=np.uint8)
+    cv2.rectangle(image, (20, 20), (580, 280), (40, 40, 40), 2)
+    cv2.putText(image, name, (50, 110), cv2.FONT_HERSHEY_SIMPLEX, 1.6, (0, 0, 0), 3)
+    cv2.putText(image, 'Hanbit Co., Ltd.', (50, 180), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 2)
+    cv2.putText(image, '010-1234-5678', (50, 240), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 2)
+    return image
+
+
+def recompress(image):
+    import cv2
+
+    return cv2.imdecode(cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 60])[1], cv2.IMREAD_COLOR)
+
+
+def fingerprint(image):
+    return cache.perceptual_hash(image), cache.detail_image(image)
+
+
+class ResultCacheTests(SimpleTestCase):
+    def setUp(self):
+        db.ocr_cache.drop()
+
+    def test_perceptual_hit_for_recompressed_card(self):
+        result_cache = cache.ResultCache(perceptual=True)
+        original = card_image('Hong Gildong')
+        result_cache.put('original', {'name': '홍길동'}, fingerprint(original))
+        self.assertEqual(result_cache.get('other', fingerprint(recompress(original))), {'name': '홍길동'})
+        self.assertEqual(result_cache.stats()['hits']['perceptual'], 1)
+
+    def test_same_layout_different_card_is_verified_away(self):
+        result_cache = cache.ResultCache(perceptual=True)
+        first, second = card_image('Hong Gildong'), card_image('Kong Gildong')
+        # 9x8 dHash 만으로는 구분되지 않는 경우를 검증 이미지로 걸러냄
+        distance = bin((cache.perceptual_hash(first) ^ cache.perceptual_hash(second)) & 0xFFFFFFFFFFFFFFFF).count('1')
+        self.assertLessEqual(distance, result_cache.max_distance)
+        result_cache.put('first', {'name': '홍길동'}, fingerprint(first))
+        self.assertIsNone(result_cache.get('second', fingerprint(second)))
+        self.assertEqual(result_cache.stats()['misses'], 1)
+
+    def test_persistent_perceptual_hit_is_verified(self):
+        original, other = card_image('Hong Gildong'), card_image('Kong Gildong')
+        self.assertEqual(cache.perceptual_hash(original), cache.perceptual_hash(other))
+        cache.ResultCache(persistent=True, perceptual=True).put('original', {'email': 'gd@hanbit.co.kr'}, fingerprint(original))
+        # 다른 프로세스 (메모리 캐시가 빈 상태): phash 가 같은 후보를 검증 이미지로 확인
+        result_cache = cache.ResultCache(persistent=True, perceptual=True)
+        self.assertIsNone(result_cache.get('other', fingerprint(other)))
+        self.assertEqual(result_cache.get('copy', fingerprint(original.copy())), {'email': 'gd@hanbit.co.kr'})
+        self.assertEqual(result_cache.stats()['hits']['persistent'], 1)
+        self.assertTrue(crypto.is_encrypted(db.ocr_cache.find_one({'_id': 'original'})['result']['email']))
+
+    def test_lookups_are_exposed_as_counter(self):
+        before = metrics.CACHE_LOOKUPS.value(result='miss')
+        result_cache = cache.ResultCache()
+        result_cache.get('missing')
+        result_cache.note_bypass()
+        self.assertEqual(metrics.CACHE_LOOKUPS.value(result='miss'), before + 1)
+        self.assertIn('# TYPE business_card_ocr_cache_lookups_total counter\n', metrics.render())
+
+
+
+def zip_archive(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+class BatchUploadTests(SimpleTestCase):
+    url = '/api/business-card/batch/'
+
+    def post(self, **files):
+        with mock.patch.object(jobs, 'submit_batch', return_value='job') as submit:
+            response = Client().post(self.url, files)
+        for source in submit.call_args.args[0] if submit.called else ():
+            if isinstance(source, str):
+                self.addCleanup(os.remove, source)
+        return response, submit
+
+    def test_images_and_archive(self):
+        archive = zip_archive({'cards/a.png': b'a' * 10, 'cards/b.JPG': b'b' * 100, 'cards/': b'', 'readme.txt': b'x'})
+        with self.settings(FILE_UPLOAD_MAX_MEMORY_SIZE=50):
+            response, submit = self.post(
+                images=[SimpleUploadedFile('c.png', b'c')], archive=SimpleUploadedFile('cards.zip', archive),
+            )
+        self.assertEqual((response.status_code, response.data['total']), (202, 3))
+        sources, filenames = submit.call_args.args
+        self.assertEqual(filenames, ['c.png', 'cards/a.png', 'cards/b.JPG'])
+        # 요청이 커서 디스크로 받은 업로드와 큰 압축 파일 멤버는 임시 파일 경로로, 작은 멤버는 bytes로 넘김
+        self.assertEqual([type(source) for source in sources], [str, bytes, str])
+        self.assertEqual(sources[1], b'a' * 10)
+        for source, data in ((sources[0], b'c'), (sources[2], b'b' * 100)):
+            with open(source, 'rb') as f:
+                self.assertEqual(f.read(), data)
+
+    @override_settings(OCR_BATCH_MAX_IMAGES=2)
+    def test_too_many_images_are_rejected_before_extracting(self):
+        archive = zip_archive({f'{index}.png': b'x' for index in range(2)})
+        response, submit = self.post(images=[SimpleUploadedFile('c.png', b'c')], archive=SimpleUploadedFile('cards.zip', archive))
+        self.assertEqual(response.status_code, 400)
+        submit.assert_not_called()
+        response, submit = self.post(archive=SimpleUploadedFile('cards.zip', archive))
+        self.assertEqual(response.status_code, 202)
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.post()[0].status_code, 400)
+        self.assertEqual(self.post(archive=SimpleUploadedFile('cards.zip', b'not a zip'))[0].status_code, 400)
+        self.assertEqual(self.post(archive=SimpleUploadedFile('cards.zip', zip_archive({'a.txt': b'x'})))[0].status_code, 400)
+
+
+class BatchOcrTests(SimpleTestCase):
+    def test_letterbox_keeps_aspect_ratio(self):
+        import numpy as np
+
+        image = np.full((200, 400, 3), 255, dtype=np.uint8)
+        image[:, :10] = 0
+        boxed = ocr.letterbox(image, (1280, 720))
+        self.assertEqual(boxed.shape, (720, 1280, 3))
+        # 2:1 비율 그대로 1280x640 으로 키우고 아래쪽만 배경색(흰색)으로 채움
+        self.assertEqual(boxed[:640, :28].max(), 0)
+        self.assertEqual(boxed[:640, 40:].min(), 255)
+        self.assertEqual(boxed[640:].min(), 255)
+        self.assertEqual(ocr.batch_canvas(np.zeros((400, 200, 3), dtype=np.uint8)), (720, 1280))
+
+    @override_settings(OCR_BATCH_SIZE=2)
+    def test_batches_by_orientation(self):
+        import numpy as np
+
+        landscape, portrait = np.zeros((100, 200, 3), dtype=np.uint8), np.zeros((200, 100, 3), dtype=np.uint8)
+        sources = [landscape, portrait, b'broken', landscape, landscape]
+        calls = []
+
+        def extract(images):
+            calls.append([image.shape[:2] for image in images])
+            return [ocr_lines('홍길동', '010-1234-5678') for _ in images]
+
+        with mock.patch.object(ocr, 'preprocess_image', side_effect=ocr.load_image), \
+                mock.patch.object(ocr, 'extract_texts_batched', side_effect=extract):
+            outcomes = ocr.process_business_cards(sources)
+        self.assertIsInstance(outcomes[2], ValueError)
+        self.assertEqual([outcome['phone'] for index, outcome in enumerate(outcomes) if index != 2], ['010-1234-5678'] * 4)
+        self.assertEqual(sorted(calls), [[(100, 200)], [(100, 200), (100, 200)], [(200, 100)]])
+
+
+class FakeReader:
+    """detect/recognize 만 흉내 내는 EasyOCR Reader (가로 박스 [x_min, x_max, y_min, y_max] → 글자)"""
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.recognized = []
+
+    def detect(self, image):
+        return [[list(box) for box in self.texts]], [[]]
+
+    def recognize(self, image, horizontal_list, free_list):
+        self.recognized += [tuple(box) for box in horizontal_list]
+        return [
+            ([[box[0], box[2]], [box[1], box[2]], [box[1], box[3]], [box[0], box[3]]], self.texts[tuple(box)], 0.9)
+            for box in horizontal_list
+        ]
+
+
+class FastModeTests(SimpleTestCase):
+    # 큰 글자(이름/회사)부터 인식하므로 작은 박스는 필수 필드가 모두 나오면 건너뜀
+    texts = {
+        (10, 300, 10, 70): '홍길동',
+        (10, 400, 80, 130): '(주)한빛소프트',
+        (10, 300, 140, 170): '010-1234-5678',
+        (10, 300, 180, 210): 'gd@hanbit.co.kr',
+        (10, 100, 220, 230): '영업팀',
+    }
+
+    def run_two_phase(self, texts, first_boxes):
+        reader = FakeReader(texts)
+
+        @contextlib.contextmanager
+        def checkout(languages=None):
+            yield reader
+
+        with mock.patch.object(ocr.readers, 'checkout', checkout):
+            results, stats = ocr.extract_texts_two_phase(None, first_boxes=first_boxes)
+        return reader, extract_info(results), stats
+
+    def test_small_boxes_are_skipped_when_fields_are_found(self):
+        reader, info, stats = self.run_two_phase(self.texts, 4)
+        self.assertEqual(info['email'], 'gd@hanbit.co.kr')
+        self.assertEqual(info['company'], '(주)한빛소프트')
+        self.assertEqual(
+            {key: stats[key] for key in ('phases', 'boxes_total', 'boxes_recognized', 'boxes_skipped')},
+            {'phases': 1, 'boxes_total': 5, 'boxes_recognized': 4, 'boxes_skipped': 1},
+        )
+        self.assertNotIn((10, 100, 220, 230), reader.recognized)
+
+    def test_second_phase_when_a_field_is_missing(self):
+        texts = dict(self.texts)
+        # 이메일을 가장 작은 박스로
+        texts[(10, 50, 240, 250)] = texts.pop((10, 300, 180, 210))
+        reader, info, stats = self.run_two_phase(texts, 3)
+        self.assertEqual(info['email'], 'gd@hanbit.co.kr')
+        self.assertEqual((stats['phases'], stats['boxes_recognized'], stats['boxes_skipped']), (2, 5, 0))
+
+    def test_mode_validation(self):
+        self.assertEqual(ocr.resolve_mode(), 'full')
+        with self.assertRaises(ValueError):
+            ocr.resolve_mode('slow')
+        response = Client().post('/api/business-card/?mode=slow', {'image': SimpleUploadedFile('card.png', b'x')})
+        self.assertEqual(response.status_code, 400)
+
+    def test_box_stats_are_counted(self):
+        before = metrics.OCR_BOXES.value(result='skipped')
+        metrics.observe_boxes({'boxes_recognized': 4, 'boxes_skipped': 3})
+        metrics.observe_boxes(None)
+        self.assertEqual(metrics.OCR_BOXES.value(result='skipped'), before + 3)
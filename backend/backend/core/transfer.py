@@ -0,0 +1,221 @@
+import csv
+import io
+import json
+
+from django.conf import settings
+
+from .models import CUSTOMER_FIELDS, find_customers, save_customers
+
+# 고객 정보 내보내기/가져오기 (CSV / JSONL / vCard)
+# 내보내기는 _id 기준 페이지 단위로 읽으면서 바로 문자열로 만들고,
+# 가져오기는 파일을 한 줄(한 레코드)씩 읽어 일정 개수마다 insert_many로 저장해서
+# 파일 크기와 관계없이 메모리 사용량이 일정하다.
+
+FORMATS = ('csv', 'jsonl', 'vcf')
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'vcf': 'text/vcard; charset=utf-8',
+}
+EXTENSIONS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.vcf': 'vcf', '.vcard': 'vcf'}
+
+
+def format_from_filename(filename, default=None):
+    for extension, format in EXTENSIONS.items():
+        if filename and filename.lower().endswith(extension):
+            return format
+    return default
+
+
+# === 내보내기 ===
+def iter_customers(company=None, page_size=None):
+    """_id 기준 keyset 페이지로 모든 고객을 차례로 반환 (한 번에 한 페이지만 메모리에 유지)"""
+    page_size = page_size or getattr(settings, 'CUSTOMER_EXPORT_PAGE_SIZE', 1000)
+    after = None
+    while True:
+        page = list(find_customers(company, after=after, limit=page_size, fields=CUSTOMER_FIELDS))
+        if not page:
+            return
+        # 소비하는 쪽이 문서를 바꿔도 되도록 다음 페이지 기준을 먼저 기록
+        after = page[-1]['_id']
+        yield from page
+        if len(page) < page_size:
+            return
+
+
+def export_rows(format, company=None):
+    """고객 목록을 format 형식의 문자열 조각으로 생성 (StreamingHttpResponse / 파일 쓰기용)"""
+    customers = iter_customers(company)
+    if format == 'csv':
+        return _export_csv(customers)
+    if format == 'jsonl':
+        return _export_jsonl(customers)
+    if format == 'vcf':
+        return _export_vcard(customers)
+    raise ValueError(f"지원하지 않는 형식입니다: {format}")
+
+
+def _export_csv(customers):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+    yield '\ufeff'
+    writer.writerow(('id',) + CUSTOMER_FIELDS)
+    for customer in customers:
+        writer.writerow([str(customer['_id'])] + [customer.get(field) or '' for field in CUSTOMER_FIELDS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _export_jsonl(customers):
+    for customer in customers:
+        customer['_id'] = str(customer['_id'])
+        yield json.dumps(customer, ensure_ascii=False, default=str) + '\n'
+
+
+def _vcard_escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace(',', '\\,').replace(';', '\\;')
+
+
+def _export_vcard(customers):
+    for customer in customers:
+        lines = ['BEGIN:VCARD', 'VERSION:3.0']
+        name = _vcard_escape(customer.get('name') or '')
+        lines.append(f'FN:{name}')
+        lines.append(f'N:{name};;;;')
+        if customer.get('company'):
+            lines.append(f"ORG:{_vcard_escape(customer['company'])}")
+        if customer.get('phone'):
+            lines.append(f"TEL;TYPE=WORK,VOICE:{_vcard_escape(customer['phone'])}")
+        if customer.get('email'):
+            lines.append(f"EMAIL;TYPE=INTERNET:{_vcard_escape(customer['email'])}")
+        lines.append(f"UID:{customer['_id']}")
+        lines.append('END:VCARD')
+        yield '\r\n'.join(lines) + '\r\n'
+
+
+# === 가져오기 ===
+def parse_records(stream, format):
+    """바이너리 파일 객체에서 고객 레코드(dict)를 하나씩 읽어서 반환"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        if format == 'csv':
+            yield from _parse_csv(text)
+        elif format == 'jsonl':
+            yield from _parse_jsonl(text)
+        elif format == 'vcf':
+            yield from _parse_vcard(text)
+        else:
+            raise ValueError(f"지원하지 않는 형식입니다: {format}")
+    finally:
+        # 호출한 쪽의 파일 객체는 닫지 않음
+        text.detach()
+
+
+def _parse_csv(text):
+    for row in csv.DictReader(text):
+        yield {field: row.get(field) for field in CUSTOMER_FIELDS}
+
+
+def _parse_jsonl(text):
+    for line in text:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield None
+            continue
+        yield {field: record.get(field) for field in CUSTOMER_FIELDS} if isinstance(record, dict) else None
+
+
+def _vcard_unescape(value):
+    result = []
+    chars = iter(value)
+    for char in chars:
+        if char == '\\':
+            char = next(chars, '')
+            char = '\n' if char in ('n', 'N') else char
+        result.append(char)
+    return ''.join(result)
+
+
+def _vcard_lines(text):
+    """접힌 줄(공백/탭으로 시작하는 다음 줄)을 이어 붙여서 논리적인 한 줄씩 반환"""
+    current = None
+    for line in text:
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def _parse_vcard(text):
+    record = None
+    for line in _vcard_lines(text):
+        key, _, value = line.partition(':')
+        # "item1.EMAIL;TYPE=INTERNET" → "EMAIL"
+        name = key.split(';', 1)[0].rsplit('.', 1)[-1].upper()
+        if name == 'BEGIN':
+            record = {}
+        elif name == 'END':
+            if record is not None:
+                yield {field: record.get(field) for field in CUSTOMER_FIELDS}
+            record = None
+        elif record is not None:
+            if name == 'FN':
+                record.setdefault('name', _vcard_unescape(value))
+            elif name == 'ORG':
+                # ORG:회사;부서 → 회사
+                record.setdefault('company', _vcard_unescape(value.replace('\\;', '\0').split(';')[0].replace('\0', ';')))
+            elif name == 'TEL':
+                record.setdefault('phone', _vcard_unescape(value))
+            elif name == 'EMAIL':
+                record.setdefault('email', _vcard_unescape(value))
+
+
+def _clean(record):
+    if not record:
+        return None
+    document = {field: str(record.get(field) or '').strip() for field in CUSTOMER_FIELDS}
+    if not any(document.values()):
+        return None
+    return document
+
+
+def import_records(records, batch_size=None, upsert=False):
+    """레코드를 batch_size개씩 묶어 저장 (정규화한 이메일/전화번호가 이미 있거나 파일 안에서 중복이면
+    건너뛰고, upsert=True면 기존 고객을 갱신)
+
+    반환: {'read', 'inserted', 'updated', 'duplicates', 'invalid'}
+    """
+    batch_size = batch_size or getattr(settings, 'CUSTOMER_IMPORT_BATCH_SIZE', 1000)
+    stats = {'read': 0, 'inserted': 0, 'updated': 0, 'duplicates': 0, 'invalid': 0}
+    batch = []
+    for record in records:
+        stats['read'] += 1
+        document = _clean(record)
+        if document is None:
+            stats['invalid'] += 1
+            continue
+        batch.append(document)
+        if len(batch) >= batch_size:
+            _import_batch(batch, stats, upsert)
+            batch = []
+    if batch:
+        _import_batch(batch, stats, upsert)
+    return stats
+
+
+def _import_batch(batch, stats, upsert):
+    # 앞선 배치는 이미 저장되었으므로 배치마다 한 번씩 조회해도 파일 전체 기준으로 중복이 걸러짐
+    for action in save_customers(batch, upsert=upsert):
+        stats['duplicates' if action == 'duplicate' else action] += 1
@@ -1,8 +1,32 @@
+from django.conf import settings
 from django.urls import path
-from .views import BusinessCardUploadView, CustomerListView, CustomerDeleteView
+from .views import BusinessCardUploadView, BusinessCardBatchUploadView, CustomerListView, CustomerSearchView, CustomerDeleteView, CompanyListView, JobStatusView, CustomerExportView, CustomerImportView, customer_events_view, healthz_view, readyz_view, metrics_view
+
+# ASGI로 서비스할 때는 업로드/목록/삭제를 비동기 뷰로 연결
+if getattr(settings, 'CORE_ASYNC_VIEWS', False):
+    from .async_views import AsyncBusinessCardUploadView, AsyncCustomerListView, AsyncCustomerDeleteView, async_customer_events_view
+    upload_view = AsyncBusinessCardUploadView.as_view()
+    list_view = AsyncCustomerListView.as_view()
+    delete_view = AsyncCustomerDeleteView.as_view()
+    events_view = async_customer_events_view
+else:
+    upload_view = BusinessCardUploadView.as_view()
+    list_view = CustomerListView.as_view()
+    delete_view = CustomerDeleteView.as_view()
+    events_view = customer_events_view
 
 urlpatterns = [
-    path('api/business-card/', BusinessCardUploadView.as_view()),
-    path('api/business-card/list/', CustomerListView.as_view()),
-    path('api/business-card/<str:customer_id>/', CustomerDeleteView.as_view()),
-]
\ No newline at end of file
+    path('metrics', metrics_view),
+    path('healthz', healthz_view),
+    path('readyz', readyz_view),
+    path('api/business-card/', upload_view),
+    path('api/business-card/batch/', BusinessCardBatchUploadView.as_view()),
+    path('api/business-card/list/', list_view),
+    path('api/business-card/search/', CustomerSearchView.as_view()),
+    path('api/business-card/companies/', CompanyListView.as_view()),
+    path('api/business-card/events/', events_view),
+    path('api/business-card/export/', CustomerExportView.as_view()),
+    path('api/business-card/import/', CustomerImportView.as_view()),
+    path('api/business-card/jobs/<str:job_id>/', JobStatusView.as_view()),
+    path('api/business-card/<str:customer_id>/', delete_view),
+]
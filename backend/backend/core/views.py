@@ -2,10 +2,96 @@ from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework import status
-from .models import insert_customer, get_customers, delete_customer
+from .models import CUSTOMER_FIELDS, find_customers, delete_customer, get_job, get_company_facets, search_customers
 from bson import ObjectId
-from .ocr import process_business_card
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from bson.errors import InvalidId
+import base64
+import csv
+import json
+from . import events, jobs, metrics, startup, transfer
+import os
+import shutil
 import tempfile
+import time
+import zipfile
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+def encode_cursor(object_id):
+    return base64.urlsafe_b64encode(object_id.binary).decode().rstrip('=')
+
+def decode_cursor(token):
+    if not token:
+        return None
+    return ObjectId(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+
+def list_params(params):
+    """목록 API 쿼리 파라미터 → (company, after, limit, fields, contact) (잘못된 값이면 ValueError)
+
+    contact: email / phone 필터 (암호화된 필드라 블라인드 인덱스로 정확히 일치하는 고객만 찾음)
+    """
+    try:
+        limit = int(params.get('limit', settings.CUSTOMER_LIST_DEFAULT_LIMIT))
+        after = decode_cursor(params.get('cursor'))
+    except (TypeError, InvalidId) as e:
+        raise ValueError(str(e))
+    limit = max(1, min(limit, settings.CUSTOMER_LIST_MAX_LIMIT))
+    fields = params.get('fields')
+    if fields:
+        fields = [field for field in fields.split(',') if field in CUSTOMER_FIELDS]
+    contact = {field: params.get(field) for field in ('email', 'phone') if params.get(field)}
+    return params.get('company'), after, limit, fields, contact
+
+def stream_page(cursor, limit):
+    """커서에서 문서를 하나씩 꺼내며 {"results": [...], "next": ...} JSON 조각을 생성"""
+    yield '{"results":['
+    last_id = None
+    for count, customer in enumerate(cursor):
+        if count == limit:
+            # limit+1 번째 문서가 있으면 다음 페이지 존재
+            yield '],"next":' + json.dumps(encode_cursor(last_id)) + '}'
+            return
+        last_id = customer['_id']
+        customer['_id'] = str(last_id)
+        yield (',' if count else '') + json.dumps(customer, ensure_ascii=False, default=str)
+    yield '],"next":null}'
+
+def _flag(params, data, name):
+    value = (data or {}).get(name) or params.get(name)
+    return str(value).lower() in ('1', 'true', 'yes')
+
+def use_cache(request):
+    """no_cache=1 (form 필드 또는 쿼리 파라미터)이면 OCR 결과 캐시를 건너뜀"""
+    return not _flag(request.query_params, request.data, 'no_cache')
+
+def upsert_mode(params, data=None):
+    """upsert=1 이면 이메일/전화번호가 같은 기존 고객을 갱신 (기본: CUSTOMER_UPSERT_DEFAULT)"""
+    if (data or {}).get('upsert') is None and params.get('upsert') is None:
+        return getattr(settings, 'CUSTOMER_UPSERT_DEFAULT', False)
+    return _flag(params, data, 'upsert')
+
+def ocr_mode(params, data=None):
+    """mode=fast|full (form 필드 또는 쿼리 파라미터), 없으면 OCR_DEFAULT_MODE (잘못된 값이면 ValueError)"""
+    from .ocr import resolve_mode  # cv2 import를 첫 업로드 시점으로 미룸
+
+    mode = (data or {}).get('mode') or params.get('mode')
+    return resolve_mode(mode)
+
+def upload_source(upload):
+    """업로드 파일을 OCR 작업에 넘길 형태로 변환
+
+    메모리에 올라온 업로드는 bytes로 읽어 바로 디코딩하고, FILE_UPLOAD_MAX_MEMORY_SIZE를
+    넘어 Django가 디스크에 받은 업로드만 임시 파일을 복사 없이 옮겨서 경로로 넘긴다.
+    (요청이 끝나면 Django가 업로드 파일을 닫고 지우기 때문)
+    """
+    if hasattr(upload, 'temporary_file_path'):
+        fd, path = tempfile.mkstemp(suffix=os.path.splitext(upload.name)[1])
+        os.close(fd)
+        shutil.move(upload.temporary_file_path(), path)
+        return path
+    return upload.read()
 
 class BusinessCardUploadView(APIView):
     parser_classes = [MultiPartParser]
@@ -14,24 +100,23 @@ class BusinessCardUploadView(APIView):
         image_file = request.FILES.get('image')
         if not image_file:
             return Response({'error': '이미지 파일이 필요합니다.'}, status=status.HTTP_400_BAD_REQUEST)
-        # 1. OCR로 텍스트 추출 (bytes로 변환)
-        # image_file.seek(0)
-        # text = process_business_card(image_file.read())
-         # 1. 임시 파일에 저장
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as tmp:
-            for chunk in image_file.chunks():
-                tmp.write(chunk)
-            tmp_path = tmp.name
-        # 2. OCR로 텍스트 추출 (경로 전달)
-        customer_data = process_business_card(tmp_path)
-        # 2. 정보 파싱
-        # customer_data = self.parse_ocr_text(text)
-        # customer_data = self.parse_ocr_text(text['text'])
-        # 3. 암호화/복호화 없이 바로 저장
-        inserted = insert_customer(customer_data)
-        # 4. ObjectId를 문자열로 변환해서 응답에 포함
-        customer_data['_id'] = str(inserted.inserted_id)
-        return Response(customer_data, status=status.HTTP_201_CREATED)
+        try:
+            mode = ocr_mode(request.query_params, request.data)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        # 1. 작은 파일은 메모리(bytes)로, 큰 파일은 Django 임시 파일을 그대로 넘겨받음
+        source = upload_source(image_file)
+        # 2. OCR 작업 큐에 등록 (OCR + 파싱 + 저장은 워커가 처리)
+        job_id = jobs.submit(
+            source, image_file.name,
+            use_cache=use_cache(request), mode=mode, upsert=upsert_mode(request.query_params, request.data),
+        )
+        # 3. 작업 id와 상태 조회 URL을 바로 응답
+        return Response({
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': f'/api/business-card/jobs/{job_id}/',
+        }, status=status.HTTP_202_ACCEPTED)
 
     def parse_ocr_text(self, text):
         """명함 텍스트에서 정보 추출"""
@@ -52,15 +137,172 @@ class BusinessCardUploadView(APIView):
             'phone': phone
         }
 
+class BusinessCardBatchUploadView(APIView):
+    """명함 일괄 업로드 API (images 여러 개 또는 zip 압축파일)"""
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, format=None):
+        image_files = request.FILES.getlist('images')
+        archive = request.FILES.get('archive')
+        if not image_files and not archive:
+            return Response({'error': 'images 또는 archive 파일이 필요합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            mode = ocr_mode(request.query_params, request.data)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        max_images = getattr(settings, 'OCR_BATCH_MAX_IMAGES', 500)
+        sources, filenames = [], []
+        try:
+            members = self.archive_members(archive) if archive else []
+            # 압축을 풀거나 임시 파일을 만들기 전에 장수부터 확인 (넘치면 일부만 처리하지 않고 거절)
+            if len(image_files) + len(members) > max_images:
+                return Response({'error': f'한 번에 최대 {max_images}장까지 업로드할 수 있습니다.'}, status=status.HTTP_400_BAD_REQUEST)
+            for image_file in image_files:
+                sources.append(upload_source(image_file))
+                filenames.append(image_file.name)
+            if members:
+                with zipfile.ZipFile(archive) as zf:
+                    for info in members:
+                        sources.append(self.archive_source(zf, info))
+                        filenames.append(info.filename)
+        except zipfile.BadZipFile:
+            self.cleanup(sources)
+            return Response({'error': '올바른 zip 파일이 아닙니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not sources:
+            return Response({'error': '처리할 이미지가 없습니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        job_id = jobs.submit_batch(
+            sources, filenames,
+            use_cache=use_cache(request), mode=mode, upsert=upsert_mode(request.query_params, request.data),
+        )
+        return Response({
+            'job_id': job_id,
+            'status': 'queued',
+            'total': len(sources),
+            'status_url': f'/api/business-card/jobs/{job_id}/',
+        }, status=status.HTTP_202_ACCEPTED)
+
+    def archive_members(self, archive):
+        """zip 안의 이미지 파일 목록 (중앙 디렉터리만 읽음)"""
+        with zipfile.ZipFile(archive) as zf:
+            return [
+                info for info in zf.infolist()
+                if not info.is_dir() and info.filename.lower().endswith(IMAGE_EXTENSIONS)
+            ]
+
+    def archive_source(self, zf, info):
+        """zip 안의 이미지: 작은 파일은 bytes, 큰 파일만 임시 파일로 풀어서 경로 반환"""
+        if info.file_size <= settings.FILE_UPLOAD_MAX_MEMORY_SIZE:
+            return zf.read(info)
+        suffix = os.path.splitext(info.filename)[1]
+        with zf.open(info) as member, tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+            shutil.copyfileobj(member, tmp)
+            return tmp.name
+
+    def cleanup(self, sources):
+        for source in sources:
+            if isinstance(source, str):
+                os.remove(source)
+
+class JobStatusView(APIView):
+    """OCR 작업 상태 조회 API (완료 시 저장된 고객 정보 포함)"""
+    def get(self, request, job_id):
+        job = get_job(job_id)
+        if job is None:
+            return Response({'error': '해당 작업을 찾을 수 없습니다.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            'job_id': job['_id'],
+            'status': job['status'],
+            'customer': job.get('result'),
+            'error': job.get('error'),
+            'action': job.get('action'),
+            'ocr_stats': job.get('ocr_stats'),
+            'created_at': job.get('created_at'),
+            'finished_at': job.get('finished_at'),
+        })
+
 class CustomerListView(APIView):
-    """고객 정보 목록/필터 API (회사명 기준)"""
+    """고객 정보 목록/필터 API (회사명 기준)
+
+    _id 기준 커서 페이지네이션: ?limit=50&cursor=<이전 응답의 next>&fields=name,company
+    email / phone 으로 정확히 일치하는 고객만 찾을 수 있다 (블라인드 인덱스).
+    Mongo 커서에서 묶음 단위로 복호화하면서 JSON으로 직렬화해서 스트리밍한다.
+    """
     def get(self, request):
-        company = request.query_params.get('company')
-        customers = get_customers(company)
-        # ObjectId만 문자열로 변환
-        for customer in customers:
+        try:
+            company, after, limit, fields, contact = list_params(request.query_params)
+        except ValueError:
+            return Response({'error': '잘못된 limit 또는 cursor 값입니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        # 다음 페이지가 있는지 알기 위해 한 건 더 조회
+        cursor = find_customers(company, after=after, limit=limit + 1, fields=fields, **contact)
+        return StreamingHttpResponse(stream_page(cursor, limit), content_type='application/json')
+
+class CustomerSearchView(APIView):
+    """고객 검색 API: ?q=<이름/회사명 일부, 초성, 전화번호 뒷자리, 이메일>&company=...&limit=20&cursor=<이전 응답의 next>
+
+    점수(겹치는 검색 토큰 수) 순으로 정렬하므로 커서는 건너뛸 결과 수다.
+    """
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'q가 필요합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.query_params.get('limit', settings.SEARCH_PAGE_LIMIT))
+            offset = int(request.query_params.get('cursor') or 0)
+        except ValueError:
+            return Response({'error': '잘못된 limit 또는 cursor 값입니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, settings.CUSTOMER_LIST_MAX_LIMIT))
+        offset = max(0, offset)
+        results, truncated = search_customers(query, request.query_params.get('company'), offset=offset, limit=limit)
+        for customer in results:
             customer['_id'] = str(customer['_id'])
-        return Response(customers)
+        # 다음 페이지가 있는지 알기 위해 한 건 더 조회
+        next_cursor = str(offset + limit) if len(results) > limit else None
+        # truncated: 결과가 너무 많아 일부 후보만으로 순위를 매김 (검색어를 더 구체적으로)
+        return Response({'results': results[:limit], 'next': next_cursor, 'truncated': truncated})
+
+class CustomerExportView(APIView):
+    """고객 정보 내보내기 API: ?type=csv|jsonl|vcf&company=... (페이지 단위로 읽으며 스트리밍)
+
+    DRF가 ?format= 을 응답 형식 지정에 쓰기 때문에 파일 형식은 type 으로 받는다.
+    """
+    def get(self, request):
+        export_format = request.query_params.get('type', 'csv')
+        if export_format not in transfer.FORMATS:
+            return Response({'error': f'type은 {", ".join(transfer.FORMATS)} 중 하나여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        response = StreamingHttpResponse(
+            transfer.export_rows(export_format, request.query_params.get('company')),
+            content_type=transfer.CONTENT_TYPES[export_format],
+        )
+        response['Content-Disposition'] = f'attachment; filename="customers.{export_format}"'
+        return response
+
+class CustomerImportView(APIView):
+    """고객 정보 가져오기 API (file: CSV/JSONL/vCard, 이메일/전화번호가 이미 있으면 건너뜀, upsert=1이면 갱신)"""
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, format=None):
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response({'error': 'file이 필요합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        import_format = request.data.get('type') or transfer.format_from_filename(upload.name)
+        if import_format not in transfer.FORMATS:
+            return Response({'error': f'type은 {", ".join(transfer.FORMATS)} 중 하나여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            result = transfer.import_records(
+                transfer.parse_records(upload, import_format),
+                upsert=upsert_mode(request.query_params, request.data),
+            )
+        except (UnicodeDecodeError, csv.Error) as e:
+            return Response({'error': f'파일을 읽을 수 없습니다: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+class CompanyListView(APIView):
+    """회사별 고객 수 API (대시보드 회사 필터용)"""
+    def get(self, request):
+        return Response(get_company_facets())
 
 class CustomerDeleteView(APIView):
     """고객 정보 삭제 API"""
@@ -72,6 +314,71 @@ class CustomerDeleteView(APIView):
             return Response({'error': '해당 고객을 찾을 수 없습니다.'}, status=status.HTTP_404_NOT_FOUND)
 
 
+def event_params(request):
+    """SSE 구독 파라미터 → (company, last_event_id): 재접속 시 브라우저/클라이언트가 Last-Event-ID 헤더를 보냄"""
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    return request.GET.get('company'), last_event_id
+
+
+class EventStreamResponse(StreamingHttpResponse):
+    """SSE 응답: 연결이 끊겨 서버가 응답을 닫을 때 구독도 해제"""
+
+    def __init__(self, stream, subscription, poll=False):
+        super().__init__(stream, content_type='text/event-stream; charset=utf-8')
+        self.subscription = subscription
+        self['Cache-Control'] = 'no-cache'
+        self['X-Last-Event-Id'] = str(subscription.start_id)
+        if poll:
+            # 스트림이 곧 끝나므로 이 시간 뒤에 Last-Event-ID 로 다시 요청하라는 뜻
+            self['X-Events-Retry-Ms'] = str(getattr(settings, 'CUSTOMER_EVENTS_RETRY_MS', 3000))
+        # nginx 등 프록시가 이벤트를 모아서 보내지 않도록
+        self['X-Accel-Buffering'] = 'no'
+
+    def close(self):
+        events.unsubscribe(self.subscription)
+        super().close()
+
+
+def customer_events_view(request):
+    """고객 저장/수정/삭제 이벤트 (SSE, ?company= 로 회사 필터) — WSGI용 짧은 폴링
+
+    동기 뷰에서 스트림을 계속 열어두면 대시보드마다 워커 스레드를 하나씩 잡으므로,
+    Last-Event-ID 이후 밀린 이벤트(최대 CUSTOMER_EVENTS_SYNC_WAIT_SECONDS 동안 기다림)만 보내고 닫는다.
+    클라이언트는 X-Events-Retry-Ms(SSE retry) 뒤에 다시 요청한다. 계속 열린 스트림은 ASGI의 비동기 뷰가 제공한다.
+    """
+    company, last_event_id = event_params(request)
+    try:
+        subscription = events.subscribe(company, last_event_id)
+    except events.TooManySubscribers:
+        return JsonResponse({'error': '실시간 구독자 수가 너무 많습니다.'}, status=503, json_dumps_params={'ensure_ascii': False})
+
+    def stream():
+        deadline = time.monotonic() + getattr(settings, 'CUSTOMER_EVENTS_SYNC_WAIT_SECONDS', 0)
+        yield f'retry: {getattr(settings, "CUSTOMER_EVENTS_RETRY_MS", 3000)}\n\n'
+        while True:
+            event = subscription.get(timeout=max(0, deadline - time.monotonic()))
+            if event is None:
+                return
+            yield events.format_sse(event)
+
+    return EventStreamResponse(stream(), subscription, poll=True)
+
+
+def healthz_view(request):
+    """liveness: 프로세스가 요청을 받을 수 있는지만 확인"""
+    return JsonResponse({'status': 'ok'})
+
 
+def readyz_view(request):
+    """readiness: OCR 워밍업(OCR_PRELOAD=1일 때)과 Mongo 연결이 끝났을 때만 200"""
+    ready, state = startup.readiness()
+    return JsonResponse(state, status=200 if ready else 503)
 
 
+def metrics_view(request):
+    """Prometheus 수집용 지표 (텍스트 형식)"""
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+from django.conf import settings
+
+from .metrics import WORKER_PENDING
+
+logger = logging.getLogger(__name__)
+
+
+class PoolSaturated(Exception):
+    """대기열까지 가득 차서 더 이상 작업을 받을 수 없는 경우"""
+
+
+def _init_worker(threads, warmup):
+    """워커 프로세스 초기화: Django 설정, 연산 스레드 수 고정, Reader 미리 로드"""
+    # torch/OpenMP는 import 시점에 스레드 수를 정하므로 import 전에 환경변수로 지정
+    for name in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[name] = str(threads)
+
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    django.setup()
+
+    import cv2
+    cv2.setNumThreads(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
+    except (ImportError, RuntimeError):
+        pass
+
+    if warmup:
+        _warmup()
+
+
+def _warmup():
+    """Reader를 로드하고 빈 이미지로 한 번 추론해서 첫 요청 지연을 없앰"""
+    from . import startup
+    startup.warm_up()
+
+
+def _process_shared(name, size, mode=None):
+    """부모 프로세스가 공유 메모리에 써둔 이미지 바이트를 복사 없이 읽어서 처리"""
+    import numpy as np
+
+    from .ocr import process_business_card
+
+    shm = SharedMemory(name=name)
+    try:
+        buffer = np.ndarray((size,), dtype=np.uint8, buffer=shm.buf)
+        result = process_business_card(buffer, mode)
+        del buffer  # 공유 메모리를 닫기 전에 참조 해제
+        return result
+    finally:
+        shm.close()
+
+
+def _process_path(path, mode=None):
+    from .ocr import process_business_card
+    return process_business_card(path, mode)
+
+
+class OcrProcessPool:
+    """OCR 전용 워커 프로세스 풀
+
+    워커마다 Reader를 미리 로드해 두고 torch/OpenCV 스레드 수를 고정해서 코어를 나눠 쓴다.
+    이미지는 pickle로 복사하지 않고 공유 메모리로 넘긴다. 실행 중 + 대기 중 작업 수가
+    max_pending을 넘으면 큐에 쌓지 않고 PoolSaturated를 발생시켜 호출한 쪽(비동기 뷰)이
+    429로 응답할 수 있게 한다.
+    """
+
+    def __init__(self, workers, max_pending, threads_per_worker=1, warmup=False, start_method='spawn'):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.threads_per_worker = threads_per_worker
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_init_worker,
+            initargs=(threads_per_worker, warmup),
+        )
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def submit(self, source, check_capacity=True, mode=None):
+        """이미지 하나를 워커에 넘기고 concurrent.futures.Future 반환"""
+        import numpy as np  # URLconf 로드 시점에 NumPy를 읽지 않도록 사용 시점에 import
+
+        with self._lock:
+            if check_capacity and self._pending >= self.max_pending:
+                raise PoolSaturated(f"OCR 처리 대기열이 가득 찼습니다. ({self._pending}/{self.max_pending})")
+            self._pending += 1
+
+        shm = None
+        try:
+            if isinstance(source, (str, os.PathLike)):
+                future = self._executor.submit(_process_path, os.fspath(source), mode)
+            elif isinstance(source, np.ndarray) and source.ndim != 1:
+                raise TypeError("워커 풀에는 인코딩된 이미지 바이트나 경로만 넘길 수 있습니다.")
+            else:
+                data = memoryview(source).cast('B')
+                shm = SharedMemory(create=True, size=max(1, data.nbytes))
+                shm.buf[:data.nbytes] = data
+                future = self._executor.submit(_process_shared, shm.name, data.nbytes, mode)
+        except Exception:
+            self._done(shm)
+            raise
+        future.add_done_callback(lambda _: self._done(shm))
+        return future
+
+    def _done(self, shm):
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+        with self._lock:
+            self._pending -= 1
+
+    def recognize(self, source, mode=None):
+        """동기 호출 (작업 큐 스레드에서 사용): 결과가 나올 때까지 대기"""
+        return self.submit(source, check_capacity=False, mode=mode).result()
+
+    async def arecognize(self, source, mode=None):
+        """비동기 호출 (비동기 뷰에서 사용): 가득 찼으면 PoolSaturated"""
+        return await asyncio.wrap_future(self.submit(source, mode=mode))
+
+    def warmup(self):
+        """모든 워커 프로세스를 띄우고 초기화(모델 로드)가 끝날 때까지 대기"""
+        for future in [self._executor.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_pool(workers=None, threads_per_worker=None):
+    cpus = os.cpu_count() or 1
+    workers = workers or getattr(settings, 'OCR_PROCESS_WORKERS', 0) or cpus
+    threads = threads_per_worker or getattr(settings, 'OCR_WORKER_THREADS', 0) or max(1, cpus // workers)
+    return OcrProcessPool(
+        workers=workers,
+        max_pending=workers + getattr(settings, 'OCR_PROCESS_QUEUE_SIZE', workers),
+        threads_per_worker=threads,
+        warmup=getattr(settings, 'OCR_WORKER_WARMUP', True),
+        start_method=getattr(settings, 'OCR_WORKER_START_METHOD', 'spawn'),
+    )
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = create_pool()
+    return _pool
+
+
+WORKER_PENDING.set_function(lambda: _pool.pending if _pool is not None else 0)
@@ -0,0 +1,114 @@
+"""대시보드 렌더링 벤치마크 (고객 10,000명 기준)
+
+1) 상태 전송량: 전체 목록을 상태에 둘 때와 페이지 창(DASHBOARD_PAGE_SIZE × DASHBOARD_WINDOW_PAGES)만 둘 때
+   웹소켓으로 보내는 상태 JSON 크기와 직렬화 시간 비교 (항상 실행, 백엔드 불필요)
+2) 브라우저 렌더링: --url 로 실행 중인 프론트엔드를 열어 첫 명함 카드가 그려질 때까지의 시간과 DOM 노드 수 측정
+   (playwright 필요, --seed 를 주면 먼저 백엔드 가져오기 API로 가상 고객을 저장)
+
+    python bench_dashboard.py
+    python bench_dashboard.py --url http://localhost:3000 --seed 10000
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from frontend.frontend import PAGE_SIZE, WINDOW_PAGES  # noqa: E402
+
+
+def synthetic_customers(count):
+    return [
+        {
+            "_id": f"{index:024x}",
+            "name": f"고객{index}",
+            "company": f"회사{index % 200}",
+            "email": f"user{index}@example.com",
+            "phone": f"010-{index // 10000:04d}-{index % 10000:04d}",
+        }
+        for index in range(count)
+    ]
+
+
+def measure_payload(customers, repeat=20):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        payload = json.dumps({"state.customers": customers}, ensure_ascii=False)
+        samples.append(time.perf_counter() - started)
+    return {
+        "cards": len(customers),
+        "bytes": len(payload.encode()),
+        "encode_ms_p50": round(statistics.median(samples) * 1000, 3),
+    }
+
+
+def seed_backend(backend_url, count):
+    import httpx
+
+    lines = "\n".join(json.dumps({k: v for k, v in c.items() if k != "_id"}, ensure_ascii=False)
+                      for c in synthetic_customers(count))
+    response = httpx.post(
+        f"{backend_url}/api/business-card/import/",
+        data={"type": "jsonl"},
+        files={"file": ("customers.jsonl", io.BytesIO(lines.encode()), "application/json")},
+        timeout=600.0,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def measure_browser(url, repeat):
+    from playwright.sync_api import sync_playwright
+
+    results = []
+    with sync_playwright() as p:
+        browser = p.chromium.launch()
+        page = browser.new_page()
+        for _ in range(repeat):
+            started = time.perf_counter()
+            page.goto(f"{url.rstrip('/')}/dashboard")
+            page.get_by_text("📧", exact=False).first.wait_for(timeout=120000)
+            first_card = time.perf_counter() - started
+            page.wait_for_load_state("networkidle")
+            results.append({
+                "first_card_ms": round(first_card * 1000, 1),
+                "settled_ms": round((time.perf_counter() - started) * 1000, 1),
+                "dom_nodes": page.evaluate("document.getElementsByTagName('*').length"),
+                "cards": page.get_by_text("📧", exact=False).count(),
+            })
+        browser.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contacts", type=int, default=10000)
+    parser.add_argument("--url", help="실행 중인 프론트엔드 주소 (브라우저 렌더링 측정)")
+    parser.add_argument("--backend", default=os.environ.get("BACKEND_URL", "http://localhost:8000"))
+    parser.add_argument("--seed", type=int, default=0, help="측정 전에 백엔드에 저장할 가상 고객 수")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    customers = synthetic_customers(args.contacts)
+    window = PAGE_SIZE * WINDOW_PAGES
+    report = {
+        "state_payload": {
+            "full_list": measure_payload(customers),
+            "window": measure_payload(customers[:window]),
+            "page": measure_payload(customers[:PAGE_SIZE]),
+        },
+    }
+    if args.seed:
+        report["seeded"] = seed_backend(args.backend.rstrip("/"), args.seed)
+    if args.url:
+        report["browser"] = measure_browser(args.url, args.repeat)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import asyncio
+import base64
+import json
+import os
+import weakref
+
+import httpx
+
+# 백엔드 API 호출 공용 모듈
+# - 프로세스 전체에서 연결 풀(keep-alive, h2 패키지가 있으면 HTTP/2)을 쓰는 AsyncClient 하나를 재사용
+# - 같은 목록 페이지 요청이 동시에 여러 번 오면 (여러 대시보드, 연속 클릭) 백엔드 호출은 한 번만
+# - 필터를 빠르게 바꾸면 이전 선택의 조회는 취소하고 마지막 선택만 반영
+
+BACKEND_URL = os.environ.get("BACKEND_URL", "http://localhost:8000").rstrip("/")
+API_URL = f"{BACKEND_URL}/api/business-card"
+TIMEOUT = float(os.environ.get("BACKEND_TIMEOUT", "10"))
+MAX_CONNECTIONS = int(os.environ.get("BACKEND_MAX_CONNECTIONS", "20"))
+
+try:
+    import h2  # noqa: F401
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+
+class _LoopResources:
+    """이벤트 루프마다 클라이언트와 진행 중인 요청을 따로 관리 (httpx 연결과 Task는 루프에 묶임)"""
+
+    def __init__(self):
+        self.client = httpx.AsyncClient(
+            base_url=API_URL,
+            timeout=TIMEOUT,
+            http2=HTTP2,
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+        )
+        self.inflight = {}  # key -> [Task, 기다리는 호출 수]
+        self.latest = {}  # key -> Task
+
+
+_resources = weakref.WeakKeyDictionary()
+
+
+def _get_resources():
+    loop = asyncio.get_running_loop()
+    resources = _resources.get(loop)
+    if resources is None:
+        resources = _resources[loop] = _LoopResources()
+    return resources
+
+
+def client():
+    return _get_resources().client
+
+
+async def close():
+    """앱 종료 시 연결 풀 정리"""
+    resources = _resources.pop(asyncio.get_running_loop(), None)
+    if resources is not None:
+        await resources.client.aclose()
+
+
+async def coalesce(key, factory):
+    """key가 같은 요청이 진행 중이면 새로 보내지 않고 그 결과를 같이 받음
+
+    기다리던 호출이 모두 취소되면 백엔드 요청도 취소한다.
+    """
+    inflight = _get_resources().inflight
+    entry = inflight.get(key)
+    if entry is None:
+        task = asyncio.ensure_future(factory())
+        entry = inflight[key] = [task, 0]
+        task.add_done_callback(lambda _: inflight.pop(key, None) if inflight.get(key) is entry else None)
+    entry[1] += 1
+    try:
+        return await asyncio.shield(entry[0])
+    except asyncio.CancelledError:
+        if entry[1] == 1:
+            entry[0].cancel()
+        raise
+    finally:
+        entry[1] -= 1
+
+
+async def latest(key, awaitable):
+    """key가 같은 새 호출이 오면 이전 호출을 취소 (예: 대시보드 세션별 목록 조회)
+
+    반환: (취소되지 않았는지, 결과)
+    """
+    running = _get_resources().latest
+    task = asyncio.ensure_future(awaitable)
+    previous, running[key] = running.get(key), task
+    if previous is not None and not previous.done():
+        previous.cancel()
+    try:
+        return True, await task
+    except asyncio.CancelledError:
+        if running.get(key) is task:
+            raise  # 새 호출 때문이 아니라 호출한 쪽이 취소됨
+        return False, None
+    finally:
+        if running.get(key) is task:
+            del running[key]
+
+
+CARD_FIELDS = "name,company,email,phone"
+
+
+async def _fetch_page(company, cursor, limit):
+    params = {"limit": limit, "fields": CARD_FIELDS}
+    if company != "전체":
+        params["company"] = company
+    if cursor:
+        params["cursor"] = cursor
+    response = await client().get("/list/", params=params)
+    if response.status_code != 200:
+        return None, None
+    page = response.json()
+    return page["results"], page["next"]
+
+
+async def fetch_page(company, cursor=None, limit=50):
+    """목록 한 페이지 (keyset 커서) → (고객 목록, 다음 페이지 커서), 실패하면 (None, None)"""
+    customers, next_cursor = await coalesce(
+        ("page", company, cursor, limit), lambda: _fetch_page(company, cursor, limit)
+    )
+    # 같은 결과를 여러 State가 받으므로 목록은 복사해서 넘김
+    return (list(customers) if customers is not None else None), next_cursor
+
+
+async def _search(query, company, cursor, limit):
+    params = {"q": query, "limit": limit}
+    if company != "전체":
+        params["company"] = company
+    if cursor:
+        params["cursor"] = cursor
+    response = await client().get("/search/", params=params)
+    if response.status_code != 200:
+        return None, None
+    page = response.json()
+    return page["results"], page["next"]
+
+
+async def search(query, company, cursor=None, limit=50):
+    """고객 검색 한 페이지 (점수순, 커서는 건너뛸 결과 수) → (고객 목록, 다음 페이지 커서), 실패하면 (None, None)"""
+    customers, next_cursor = await coalesce(
+        ("search", query, company, cursor, limit), lambda: _search(query, company, cursor, limit)
+    )
+    return (list(customers) if customers is not None else None), next_cursor
+
+
+def to_cursor(customer_id):
+    """_id 문자열 → 목록 API 커서 (이 고객 다음부터 조회)"""
+    return base64.urlsafe_b64encode(bytes.fromhex(customer_id)).decode().rstrip("=")
+
+
+def cursor_id(cursor):
+    """목록 API 커서(ObjectId 12바이트의 base64) → _id 문자열 (16진수 문자열 비교 = _id 순서 비교)"""
+    return base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).hex()
+
+
+async def _fetch_companies():
+    # 회사 드롭다운은 백엔드 집계 API 사용 (전체 고객 목록에서 계산하지 않음)
+    response = await client().get("/companies/")
+    if response.status_code != 200:
+        return ["전체"]
+    return ["전체"] + [c["company"] for c in response.json()]
+
+
+async def fetch_companies():
+    return list(await coalesce(("companies",), _fetch_companies))
+
+
+async def iter_events(response):
+    """SSE 응답 → 이벤트 dict (연결 유지용 주석 줄마다 None)"""
+    data = []
+    async for line in response.aiter_lines():
+        if line.startswith(":"):
+            yield None
+        elif line.startswith("data:"):
+            data.append(line[5:].strip())
+        elif not line and data:
+            yield json.loads("\n".join(data))
+            data = []
@@ -1,38 +1,282 @@
+import asyncio
+import contextlib
+import os
+
 import reflex as rx
 import httpx
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from . import api, images
+
+# 대시보드는 전체 고객이 아니라 페이지 단위로 불러온 "창"만 상태/화면에 둠
+# (최대 DASHBOARD_WINDOW_PAGES 페이지, 넘치면 반대쪽 끝 페이지를 내려놓고 이전/더 보기로 다시 불러옴)
+PAGE_SIZE = int(os.environ.get("DASHBOARD_PAGE_SIZE", "48"))
+WINDOW_PAGES = int(os.environ.get("DASHBOARD_WINDOW_PAGES", "3"))
+# 검색어 입력이 이 시간(초) 동안 멈추면 검색 (그 전의 입력은 api.latest 로 취소되어 백엔드까지 가지 않음)
+SEARCH_DEBOUNCE = float(os.environ.get("DASHBOARD_SEARCH_DEBOUNCE", "0.3"))
+
+
+async def first_page(company, query):
+    """검색어가 있으면 검색 결과 첫 페이지, 없으면 목록 첫 페이지"""
+    if query:
+        await asyncio.sleep(SEARCH_DEBOUNCE)
+        return await api.search(query, company, limit=PAGE_SIZE)
+    return await api.fetch_page(company, limit=PAGE_SIZE)
+
 
 # 1. 상태 클래스
 class State(rx.State):
     filter_company: str = "전체"
-    customers: List[Dict] = []
+    search_query: str = ""
+    customers: List[Dict] = []  # 현재 창에 있는 고객 (_id 오름차순)
+    has_more: bool = False
+    has_previous: bool = False
     companies: List[str] = ["전체"]
     upload_result: str = ""
     preview_url: str = ""
+    # 실시간 반영(SSE) 구독 상태 (백엔드 전용 변수)
+    _watching: bool = False
+    # 마지막으로 반영한 이벤트 id (한 번도 연결하지 않았으면 None)
+    _last_event_id: Optional[int] = None
+    # 창에 있는 페이지마다 그 페이지를 불러온 커서 (첫 페이지는 None), 창 다음 페이지 커서, 창 앞에서 내려놓은 페이지 커서
+    _cursors: List[Optional[str]] = [None]
+    _next_cursor: Optional[str] = None
+    _before: List[Optional[str]] = []
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         object.__setattr__(self, "_upload_files", None)
 
+    @rx.event
     async def set_filter_company(self, company: str):
+        # 필터가 바뀌면 고객 목록만 다시 조회 (회사 목록은 이벤트로 갱신됨)
         self.filter_company = company
-        await self.get_customers()
+        return State.load_customers
 
+    @rx.event
+    async def set_search_query(self, query: str):
+        # 검색 중에는 목록 대신 검색 결과를 보여주고, 검색어를 지우면 목록 첫 페이지로 돌아감
+        self.search_query = query
+        return State.load_customers
+
+    @rx.event(background=True)
+    async def load_customers(self):
+        """필터/검색어를 연달아 바꾸면 이전 조회는 취소하고 마지막 선택의 첫 페이지만 반영"""
+        async with self:
+            company, query = self.filter_company, self.search_query.strip()
+            session = self.router.session.client_token
+        current, (customers, next_cursor) = await api.latest(
+            ("customers", session), first_page(company, query)
+        )
+        if not current:
+            return
+        async with self:
+            if self.filter_company == company and self.search_query.strip() == query:
+                self._reset_window(customers, next_cursor)
 
     async def get_customers(self):
-        url = "http://localhost:8000/api/business-card/list/"
-        params = {}
-        if self.filter_company != "전체":
-            params["company"] = self.filter_company
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url, params=params)
-        if response.status_code == 200:
-            self.customers = response.json()
-            all_companies = {c["company"] for c in self.customers if c.get("company")}
-            self.companies = ["전체"] + sorted(all_companies)
+        (customers, next_cursor), companies = await asyncio.gather(
+            first_page(self.filter_company, self.search_query.strip()), api.fetch_companies()
+        )
+        self._reset_window(customers, next_cursor)
+        self.companies = companies
+
+    def _reset_window(self, customers, next_cursor):
+        self.customers = customers or []
+        self._cursors = [None]
+        self._next_cursor = next_cursor if customers is not None else None
+        self._before = []
+        self._update_paging()
+
+    def _update_paging(self):
+        self.has_more = self._next_cursor is not None
+        self.has_previous = bool(self._before)
+
+    def _page_start(self, index):
+        """검색 결과 창에서 index번째 페이지가 customers 안에서 시작하는 위치
+
+        검색 결과는 _id 순서가 아니라 점수순이므로 _id 경계 대신 커서(건너뛸 결과 수)의 차이로 셈
+        """
+        return int(self._cursors[index] or 0) - int(self._cursors[0] or 0)
+
+    def _trim_front(self):
+        """창이 WINDOW_PAGES를 넘으면 앞쪽 페이지를 내려놓음 (커서는 '이전 보기'용으로 보관)"""
+        while len(self._cursors) > WINDOW_PAGES:
+            if self.search_query.strip():
+                self.customers = self.customers[self._page_start(1):]
+            else:
+                boundary = api.cursor_id(self._cursors[1])
+                self.customers = [c for c in self.customers if c["_id"] > boundary]
+            self._before = self._before + [self._cursors[0]]
+            self._cursors = self._cursors[1:]
+        self._update_paging()
+
+    def _trim_back(self):
+        while len(self._cursors) > WINDOW_PAGES:
+            if self.search_query.strip():
+                self.customers = self.customers[:self._page_start(len(self._cursors) - 1)]
+            else:
+                boundary = api.cursor_id(self._cursors[-1])
+                self.customers = [c for c in self.customers if c["_id"] <= boundary]
+            self._next_cursor = self._cursors[-1]
+            self._cursors = self._cursors[:-1]
+        self._update_paging()
+
+    @rx.event(background=True)
+    async def load_more(self):
+        """창 뒤에 다음 페이지를 붙임"""
+        async with self:
+            company, query, cursor = self.filter_company, self.search_query.strip(), self._next_cursor
+        if cursor is None:
+            return
+        if query:
+            customers, next_cursor = await api.search(query, company, cursor, PAGE_SIZE)
+        else:
+            customers, next_cursor = await api.fetch_page(company, cursor, PAGE_SIZE)
+        async with self:
+            # 그 사이 필터/검색어가 바뀌었거나 이미 불러왔으면 버림
+            if customers is None or company != self.filter_company or query != self.search_query.strip() \
+                    or cursor != self._next_cursor:
+                return
+            if query:
+                # 그 사이 삭제로 결과가 당겨졌을 수 있으므로 창에 이미 있는 고객은 빼고 붙임
+                shown = {c["_id"] for c in self.customers}
+                customers = [c for c in customers if c["_id"] not in shown]
+            self.customers = self.customers + customers
+            self._next_cursor = next_cursor
+            self._cursors = self._cursors + [cursor]
+            self._trim_front()
+
+    @rx.event(background=True)
+    async def load_previous(self):
+        """창 앞에 내려놓았던 페이지를 다시 붙임"""
+        async with self:
+            if not self._before:
+                return
+            company, query, cursor = self.filter_company, self.search_query.strip(), self._before[-1]
+        if query:
+            customers, _ = await api.search(query, company, cursor, PAGE_SIZE)
         else:
-            self.customers = []
-            self.companies = ["전체"]
+            customers, _ = await api.fetch_page(company, cursor, PAGE_SIZE)
+        async with self:
+            if customers is None or company != self.filter_company or query != self.search_query.strip() \
+                    or not self._before or cursor != self._before[-1]:
+                return
+            if query:
+                # 검색 결과 페이지는 커서 사이의 결과 수만큼만 (창에 이미 있는 고객은 빼고)
+                shown = {c["_id"] for c in self.customers}
+                size = int(self._cursors[0] or 0) - int(cursor or 0)
+                customers = [c for c in customers[:size] if c["_id"] not in shown]
+            elif self._cursors[0] is not None:
+                # 삭제로 페이지가 줄었을 수 있으므로 현재 창의 첫 커서까지만
+                boundary = api.cursor_id(self._cursors[0])
+                customers = [c for c in customers if c["_id"] <= boundary]
+            self.customers = customers + self.customers
+            self._cursors = [cursor] + self._cursors
+            self._before = self._before[:-1]
+            self._trim_back()
+
+    def _matches_filter(self, customer):
+        return self.filter_company == "전체" or customer.get("company") == self.filter_company
+
+    def _add_company(self, company):
+        if company and company not in self.companies:
+            self.companies = ["전체"] + sorted(self.companies[1:] + [company])
+
+    def _apply_event(self, event):
+        """저장/수정/삭제 이벤트 한 건을 customers / companies 에 반영 (전체 목록을 다시 받지 않음)"""
+        self._last_event_id = max(self._last_event_id or 0, event.get("id", 0))
+        kind, customer_id = event["type"], event.get("_id")
+        if kind == "insert":
+            customer = event["customer"]
+            self._add_company(customer.get("company"))
+            # 목록은 _id(저장 순서) 오름차순이므로 새 고객은 맨 뒤: 창이 마지막 페이지까지 와 있을 때만 붙임
+            # (검색 중에는 검색어와 맞는지 알 수 없으므로 붙이지 않음)
+            if self._next_cursor is None and not self.search_query.strip() and self._matches_filter(customer) \
+                    and all(c["_id"] != customer_id for c in self.customers):
+                if len(self.customers) < PAGE_SIZE * WINDOW_PAGES:
+                    self.customers = self.customers + [customer]
+                elif self.customers:
+                    # 창이 가득 차면 붙이지 않고 '더 보기'로 불러오게 함
+                    self._next_cursor = api.to_cursor(self.customers[-1]["_id"])
+                    self._update_paging()
+        elif kind == "update":
+            changes = event["customer"]
+            self._add_company(changes.get("company"))
+            customers = []
+            for customer in self.customers:
+                if customer["_id"] == customer_id:
+                    customer = {**customer, **changes}
+                    if not self._matches_filter(customer):
+                        continue
+                customers.append(customer)
+            self.customers = customers
+        elif kind == "delete":
+            self.customers = [c for c in self.customers if c["_id"] != customer_id]
+            company = event.get("company")
+            if event.get("company_empty") and company in self.companies and company != self.filter_company:
+                self.companies = [c for c in self.companies if c != company]
+
+    @rx.event(background=True)
+    async def watch_events(self):
+        """대시보드에 있는 동안 백엔드 이벤트(SSE)를 받아 변경분만 반영 (끊기면 이어서 다시 연결)
+
+        ASGI 백엔드는 연결을 계속 열어두고, WSGI 백엔드는 밀린 이벤트만 보내고 닫으므로 X-Events-Retry-Ms 마다 다시 요청한다.
+        """
+        async with self:
+            if self._watching:
+                return
+            self._watching = True
+        try:
+            while True:
+                async with self:
+                    if self.router.page.path != "/dashboard":
+                        return
+                    # 한 번이라도 받은 적이 있으면 그 id부터 이어받음 (폴링 사이에 발행된 이벤트를 놓치지 않도록)
+                    headers = {} if self._last_event_id is None else {"Last-Event-ID": str(self._last_event_id)}
+                try:
+                    # 이벤트가 없어도 백엔드가 15초마다 keepalive를 보내므로 읽기 제한 시간은 그보다 길게
+                    timeout = httpx.Timeout(api.TIMEOUT, read=60.0)
+                    async with api.client().stream("GET", "/events/", headers=headers, timeout=timeout) as response:
+                        if response.status_code != 200:
+                            raise httpx.HTTPError(f"events: {response.status_code}")
+                        # WSGI 백엔드는 밀린 이벤트만 보내고 닫음 (폴링): 다음 요청까지 기다릴 시간
+                        retry_ms = response.headers.get("X-Events-Retry-Ms")
+                        start_id = int(response.headers.get("X-Last-Event-Id") or 0)
+                        if not headers:
+                            # 처음 연결: 다시 보내줄 이벤트가 없으므로 구독 시점 id부터 이어받음
+                            async with self:
+                                self._last_event_id = max(self._last_event_id or 0, start_id)
+                        async for event in api.iter_events(response):
+                            if event is not None and event["type"] == "resync":
+                                # 놓친 이벤트가 있음: 목록을 새로 받음
+                                async with self:
+                                    company, query = self.filter_company, self.search_query.strip()
+                                (customers, next_cursor), companies = await asyncio.gather(
+                                    first_page(company, query), api.fetch_companies()
+                                )
+                                async with self:
+                                    self._last_event_id = event["id"]
+                                    if customers is not None and company == self.filter_company \
+                                            and query == self.search_query.strip():
+                                        self._reset_window(customers, next_cursor)
+                                    self.companies = companies
+                                continue
+                            async with self:
+                                if self.router.page.path != "/dashboard":
+                                    return
+                                if event is not None:
+                                    self._apply_event(event)
+                        async with self:
+                            # 스트림을 끝까지 받았으면 구독 시점까지의 이벤트는 모두 반영됨
+                            self._last_event_id = max(self._last_event_id or 0, start_id)
+                    if retry_ms:
+                        await asyncio.sleep(int(retry_ms) / 1000)
+                except httpx.HTTPError:
+                    await asyncio.sleep(3.0)
+        finally:
+            async with self:
+                self._watching = False
 
     @rx.event
     async def handle_drop(self, files: Any):
@@ -40,18 +284,35 @@ class State(rx.State):
             self.upload_result = "파일을 선택해주세요."
             return
 
-        object.__setattr__(self, "_upload_files", files)
+        # 파일은 여기서 한 번만 읽고, 업로드할 크기로 줄인 사본만 서버 메모리에 보관
+        files_data = []
+        for file in files:
+            if hasattr(file, "read"):
+                data = await file.read()
+                filename = getattr(file, "filename", "uploaded_file")
+                content_type = getattr(file, "content_type", "application/octet-stream")
+            else:
+                data = file
+                filename = "uploaded_file"
+                content_type = "application/octet-stream"
+            files_data.append((filename, data, content_type))
+
+        loop = asyncio.get_running_loop()
+        # 미리보기는 원본 대신 작은 썸네일 (상태로 브라우저에 전송되는 값)
+        self.preview_url = await loop.run_in_executor(None, images.thumbnail_url, files_data[0][1])
+        yield
+        prepared = await loop.run_in_executor(None, images.prepare_all, files_data)
+        object.__setattr__(self, "_upload_files", prepared)
 
-        file = files[0]
-        if hasattr(file, "read"):
-            update_file = await file.read()
-            mime = getattr(file, "content_type", "application/octet-stream")
-        else:
-            update_file = file
-            mime = "application/octet-stream"
-        import base64
-        encoded = base64.b64encode(update_file).decode("utf-8")
-        self.preview_url = f"data:{mime};base64,{encoded}"
+    async def _wait_for_job(self, status_url):
+        """백엔드 OCR 작업이 끝날 때까지 상태 조회 (최대 약 2분)"""
+        job = {}
+        for _ in range(120):
+            await asyncio.sleep(1.0)
+            job = (await api.client().get(api.BACKEND_URL + status_url)).json()
+            if job.get("status") in ("done", "failed"):
+                break
+        return job
 
     @rx.event
     async def handle_upload(self):
@@ -59,39 +320,62 @@ class State(rx.State):
         if not upload_files:
             self.upload_result = "파일이 선택되지 않았습니다."
             return
-        file = upload_files[0]
         try:
-            if hasattr(file, "read"):
-                upload_data = await file.read()
-                filename = getattr(file, "filename", "uploaded_file")
-                content_type = getattr(file, "content_type", "application/octet-stream")
-            else:
-                upload_data = file
-                filename = "uploaded_file"
-                content_type = "application/octet-stream"
+            # handle_drop 에서 줄여둔 (파일명, bytes, MIME) 목록
+            files_data = upload_files
 
-            url = "http://localhost:8000/api/business-card/"
-            files_data = {'image': (filename, upload_data, content_type)}
+            # 한 장이면 단건 업로드, 여러 장이면 일괄 업로드 API 사용
+            if len(files_data) == 1:
+                url = "/"
+                request_files = {'image': files_data[0]}
+                label = files_data[0][0]
+            else:
+                url = "/batch/"
+                request_files = [('images', f) for f in files_data]
+                label = f"명함 {len(files_data)}장"
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(url, files=files_data)
+            response = await api.client().post(url, files=request_files, timeout=30.0)
 
-            if response.status_code == 201:
-                self.upload_result = f"{filename} 업로드 및 저장 성공!"
-                await self.get_customers()
+            if response.status_code in (200, 201):
+                # 비동기(ASGI) 백엔드는 OCR까지 끝낸 뒤 바로 응답 (이미 있는 연락처면 200)
+                job = {"status": "done", "customer": response.json()}
+            elif response.status_code == 202:
+                # OCR은 백엔드 작업 큐에서 처리되므로 완료될 때까지 상태 조회
+                self.upload_result = f"{label} 업로드 완료, 명함 인식 중..."
+                yield
+                job = await self._wait_for_job(response.json()["status_url"])
+            elif response.status_code == 429:
+                retry_after = response.headers.get("Retry-After", "잠시")
+                self.upload_result = f"요청이 많아 처리할 수 없습니다. {retry_after}초 후 다시 시도해주세요."
+                return
             else:
                 self.upload_result = f"업로드 실패! ({response.status_code})"
+                return
+
+            if job.get("status") == "done":
+                summary = job["customer"]
+                if len(files_data) == 1:
+                    self.upload_result = f"{label} 업로드 및 저장 성공!"
+                else:
+                    self.upload_result = (
+                        f"{label} 처리 완료: 성공 {summary['succeeded']}건, 실패 {summary['failed']}건 "
+                        f"({summary['images_per_sec']}장/초)"
+                    )
+                # 대시보드는 저장 이벤트(SSE)로 갱신되므로 목록을 다시 조회하지 않음
+            elif job.get("status") == "failed":
+                self.upload_result = f"명함 인식 실패! ({job.get('error')})"
+            else:
+                self.upload_result = "명함 인식이 지연되고 있습니다. 잠시 후 대시보드를 확인해주세요."
 
         except Exception as e:
             self.upload_result = f"업로드 중 예외 발생: {str(e)}"
 
     @rx.event
     async def delete_customer(self, customer_id: str):
-        url = f"http://localhost:8000/api/business-card/{customer_id}/"
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.delete(url)
+        response = await api.client().delete(f"/{customer_id}/")
         if response.status_code == 204:
-            await self.get_customers()
+            # 다른 대시보드에는 삭제 이벤트로 전달되고, 현재 화면에서는 바로 제거
+            self.customers = [c for c in self.customers if c["_id"] != customer_id]
 
     @rx.event
     async def reset_upload_state(self):
@@ -167,9 +451,9 @@ def upload_page():
                     ),
                     id=upload_id,
                     key=State.preview_url,
-                    multiple=False,
+                    multiple=True,
                     accept={"image/png": [".png"], "image/jpeg": [".jpg", ".jpeg"]},
-                    max_files=1,
+                    max_files=500,
                     min_height="186px",
                     min_width="404px",
                     border="3px dashed #2c7a7b",
@@ -234,7 +518,7 @@ def upload_page():
     )
 
 # 4. 대시보드 페이지
-@rx.page(route="/dashboard", on_load=State.get_customers)
+@rx.page(route="/dashboard", on_load=[State.get_customers, State.watch_events])
 def dashboard_page():
     def customer_card(c):
         return rx.box(
@@ -297,12 +581,29 @@ def dashboard_page():
                 margin_bottom="32px",
                 color="#2b6cb0"
             ),
+            rx.input(
+                placeholder="🔍 이름, 회사명, 전화번호 뒷자리, 이메일로 검색",
+                value=State.search_query,
+                on_change=State.set_search_query,
+                size="3",
+                width="320px",
+                margin_bottom="32px",
+            ),
+            # 창(최대 DASHBOARD_WINDOW_PAGES 페이지)에 있는 고객만 그림
+            rx.cond(
+                State.has_previous,
+                rx.button("⬆️ 이전 고객 보기", on_click=State.load_previous, color_scheme="gray", variant="soft", border_radius="full"),
+            ),
             rx.grid(
                 rx.foreach(State.customers, customer_card),
                 columns="3",
                 spacing="6",
                 justify_content="center"
             ),
+            rx.cond(
+                State.has_more,
+                rx.button("⬇️ 더 보기", on_click=State.load_more, color_scheme="cyan", variant="soft", border_radius="full"),
+            ),
             spacing="8",
             padding="60px",
             border_radius="20px",
@@ -314,7 +615,13 @@ def dashboard_page():
     )
 
 # 5. 앱 생성 및 페이지 등록
+@contextlib.asynccontextmanager
+async def close_api_client():
+    yield
+    await api.close()
+
 app = rx.App()
+app.register_lifespan_task(close_api_client)
 app.add_page(main_page, route="/")
 app.add_page(upload_page, route="/upload")
 app.add_page(dashboard_page, route="/dashboard")
\ No newline at end of file
@@ -0,0 +1,73 @@
+import base64
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# 업로드 이미지 준비 (파일을 고를 때 한 번만 읽어서)
+# - 미리보기: 긴 변 PREVIEW_LONG_EDGE px JPEG 썸네일 (State로 브라우저에 동기화되는 값이므로 작게)
+# - 업로드: 긴 변 UPLOAD_LONG_EDGE px 로 줄여 JPEG 로 다시 인코딩 (OCR 전처리가 어차피 이 정도로 줄임)
+PREVIEW_LONG_EDGE = int(os.environ.get("UPLOAD_PREVIEW_LONG_EDGE", "480"))
+UPLOAD_LONG_EDGE = int(os.environ.get("UPLOAD_LONG_EDGE", "1600"))
+UPLOAD_JPEG_QUALITY = int(os.environ.get("UPLOAD_JPEG_QUALITY", "85"))
+PREPARE_WORKERS = int(os.environ.get("UPLOAD_PREPARE_WORKERS", "4"))
+
+_executor = ThreadPoolExecutor(max_workers=PREPARE_WORKERS, thread_name_prefix="image-prepare")
+
+
+def _open(data, size):
+    image = Image.open(io.BytesIO(data))
+    width, height = image.size
+    scale = size / max(width, height)
+    if scale < 1:
+        # JPEG는 필요한 크기 이상인 가장 작은 배율(1/2, 1/4, 1/8)로 디코딩 (큰 휴대폰 사진도 빠르게)
+        image.draft("RGB", (int(width * scale), int(height * scale)))
+    # 휴대폰 사진의 회전 정보(EXIF)를 픽셀에 반영 (다시 인코딩하면 EXIF가 빠지므로)
+    image = ImageOps.exif_transpose(image)
+    return image.convert("RGB")
+
+
+def _encode_jpeg(image, quality):
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def _jpeg_name(filename):
+    return os.path.splitext(filename)[0] + ".jpg"
+
+
+def prepare_upload(filename, data, content_type):
+    """(파일명, 원본 bytes, MIME) → 업로드할 (파일명, bytes, MIME)
+
+    이미 충분히 작은 이미지나 읽을 수 없는 파일은 원본 그대로 보낸다 (백엔드가 오류를 알려줌).
+    """
+    try:
+        # 이미 작은 JPEG는 다시 인코딩하지 않음 (헤더만 읽음)
+        if max(Image.open(io.BytesIO(data)).size) <= UPLOAD_LONG_EDGE and content_type == "image/jpeg":
+            return filename, data, content_type
+        image = _open(data, UPLOAD_LONG_EDGE)
+    except (UnidentifiedImageError, OSError):
+        return filename, data, content_type
+    image.thumbnail((UPLOAD_LONG_EDGE, UPLOAD_LONG_EDGE), Image.LANCZOS)
+    encoded = _encode_jpeg(image, UPLOAD_JPEG_QUALITY)
+    if len(encoded) >= len(data):
+        return filename, data, content_type
+    return _jpeg_name(filename), encoded, "image/jpeg"
+
+
+def thumbnail_url(data):
+    """미리보기용 작은 JPEG data URL (읽을 수 없으면 빈 문자열)"""
+    try:
+        image = _open(data, PREVIEW_LONG_EDGE)
+    except (UnidentifiedImageError, OSError):
+        return ""
+    image.thumbnail((PREVIEW_LONG_EDGE, PREVIEW_LONG_EDGE))
+    encoded = base64.b64encode(_encode_jpeg(image, 70)).decode("ascii")
+    return f"data:image/jpeg;base64,{encoded}"
+
+
+def prepare_all(files):
+    """여러 장을 스레드 풀에서 병렬로 준비 (Pillow 디코딩/리사이즈는 GIL을 놓음)"""
+    return list(_executor.map(lambda file: prepare_upload(*file), files))